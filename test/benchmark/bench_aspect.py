@@ -0,0 +1,168 @@
+"""Detection of the content aspect ratio of videos, moviepy against keyframes.
+
+Compares the former detector of VideoElement (five full RGB frames decoded by
+moviepy, detect_moviepy) with util.media.content_aspect_ratio (scaled down keyframes
+decoded by ffmpeg) on generated letterboxed (21:9) and full frame (16:9) clips.
+Wall time and peak of the memory allocated in Python (tracemalloc) are
+reported, both detectors must agree with the generated content.
+
+Run as script:
+
+    $ python -m test.benchmark.bench_aspect --size 3840x2160 --duration 20
+
+or with pytest (uses pytest-benchmark if installed, the file must be named
+explicitly since it is not collected by default):
+
+    $ pytest test/benchmark/bench_aspect.py
+
+"""
+
+import argparse
+import os
+import subprocess
+import tempfile
+import time
+import tracemalloc
+
+import pytest
+from moviepy.video.io.VideoFileClip import VideoFileClip
+from moviepy.video.io.ffmpeg_reader import ffmpeg_parse_infos
+from numpy import arange, array
+
+from viewcontrol.util.media import content_aspect_ratio, ffmpeg_binary
+
+
+def make_clip(path, width, height, duration, letterbox):
+    """encode a test clip, letterboxed clips have scope (2.39:1) content in 16:9"""
+    content_height = int(width / 2.39) // 2 * 2 if letterbox else height
+    subprocess.run(
+        [
+            ffmpeg_binary(),
+            "-v",
+            "error",
+            "-y",
+            "-f",
+            "lavfi",
+            "-i",
+            f"testsrc2=size={width}x{content_height}:rate=25:duration={duration}",
+            "-vf",
+            f"pad={width}:{height}:0:(oh-ih)/2:black",
+            "-c:v",
+            "libx264",
+            "-preset",
+            "ultrafast",
+            "-g",
+            "50",
+            path,
+        ],
+        check=True,
+    )
+    return path
+
+
+def aspect_from_frames(video_file_clip):
+    """aspect ratio of the content from five full frames decoded by moviepy"""
+    vfc = video_file_clip
+    samples = 5
+    sample_time_step = video_file_clip.duration / samples
+    w = []
+    for t in arange(0, video_file_clip.duration, sample_time_step):
+        frame = video_file_clip.get_frame(t)
+
+        w.append(
+            frame[
+                [int(vfc.h * 0.125), int(vfc.h * 0.5), int(vfc.h * 0.875)],
+                0 : vfc.w,
+            ]
+            .mean(axis=2)
+            .mean(axis=1)
+        )
+    w = array(w)
+    wm = w.mean(axis=0)
+
+    if wm[0] < 1 and wm[2] < 1 and wm[1] >= 1:
+        return "21:9"
+    else:
+        return "16:9"
+
+
+def detect_moviepy(path):
+    clip = VideoFileClip(path)
+    try:
+        return aspect_from_frames(clip)
+    finally:
+        clip.close()
+
+
+def detect_keyframes(path):
+    duration = ffmpeg_parse_infos(path)["duration"]
+    return content_aspect_ratio(path, 0, duration)
+
+
+DETECTORS = {"moviepy": detect_moviepy, "keyframes": detect_keyframes}
+
+
+def measure(detector, path):
+    """run detector on path
+
+    Returns:
+        tuple: detected aspect ratio, wall time in s, peak Python allocation in MB
+
+    """
+    tracemalloc.start()
+    start = time.perf_counter()
+    try:
+        aspect = DETECTORS[detector](path)
+        elapsed = time.perf_counter() - start
+        peak = tracemalloc.get_traced_memory()[1] / 2**20
+    finally:
+        tracemalloc.stop()
+    return aspect, elapsed, peak
+
+
+@pytest.fixture(scope="module")
+def clips(tmp_path_factory):
+    folder = tmp_path_factory.mktemp("aspect")
+    return {
+        aspect: make_clip(str(folder / f"{aspect[:2]}.mp4"), 1920, 1080, 6, letterbox)
+        for aspect, letterbox in (("16:9", False), ("21:9", True))
+    }
+
+
+@pytest.mark.parametrize("aspect", ["16:9", "21:9"])
+@pytest.mark.parametrize("detector", sorted(DETECTORS))
+def test_detect(request, clips, detector, aspect):
+    try:
+        benchmark = request.getfixturevalue("benchmark")
+    except pytest.FixtureLookupError:
+        result = measure(detector, clips[aspect])
+        print(f"\n{detector} {aspect}: {result[1]:.3f}s {result[2]:.1f}MB")
+        assert result[0] == aspect
+        return
+    assert benchmark(DETECTORS[detector], clips[aspect]) == aspect
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size", default="3840x2160", help="WIDTHxHEIGHT (16:9)")
+    parser.add_argument("--duration", type=int, default=20)
+    parser.add_argument("--rounds", type=int, default=3)
+    options = parser.parse_args(args)
+    width, height = map(int, options.size.split("x"))
+
+    print(f"{'clip':<7}{'detector':<11}{'aspect':<8}{'time/s':>8}{'peak/MB':>9}")
+    with tempfile.TemporaryDirectory() as folder:
+        for aspect, letterbox in (("16:9", False), ("21:9", True)):
+            path = os.path.join(folder, f"{aspect[:2]}.mp4")
+            make_clip(path, width, height, options.duration, letterbox)
+            for detector in sorted(DETECTORS):
+                results = [measure(detector, path) for _ in range(options.rounds)]
+                detected, elapsed, peak = min(results, key=lambda r: r[1])
+                print(
+                    f"{aspect:<7}{detector:<11}{detected:<8}{elapsed:>8.3f}"
+                    f"{peak:>9.1f}"
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,265 @@
+"""Latency and throughput of the command path from show to device socket and back.
+
+Measures the way of a command as send by ViewControl.send_command:
+cmd_control_queue -> CommandProcess -> blinker signal -> device queue -> socket,
+and of the answer of the local stand-in server (see servers.py):
+device _analyse -> answer queue -> listener thread -> event queue -> event
+thread (EventIndex.match), the same way as in ViewControl.
+
+Run as script:
+
+    $ python -m test.benchmark.bench_commandpath --rounds 200
+
+or with pytest (uses pytest-benchmark if installed, the file must be named
+explicitly since it is not collected by default):
+
+    $ pytest test/benchmark/bench_commandpath.py
+
+The minimal send interval of the devices (20ms Denon, 500ms Atlona) is reduced to
+2ms by default to measure the overhead of the path and not the pacing of the
+devices, use --keep-interval to measure with the intervals.
+
+"""
+
+import argparse
+import itertools
+import multiprocessing
+import queue
+import threading
+import time
+
+import pytest
+
+from viewcontrol.remotecontrol import supported_devices
+from viewcontrol.remotecontrol.commanditem import CommandSendItem
+from viewcontrol.remotecontrol.processcmd import ProcessCmd, ThreadCmd
+from viewcontrol.remotecontrol.threadcommunicationbase import ComType
+from viewcontrol.show import ComEventModule, EventIndex
+from .servers import StandInServers
+
+COMMANDS = {
+    "Denon DN-500BD": [
+        CommandSendItem("Denon DN-500BD", "Play", request=False),
+        CommandSendItem("Denon DN-500BD", "Status", request=True),
+    ],
+    "Atlona AT-OME-SW32": [
+        CommandSendItem("Atlona AT-OME-SW32", "Set Output", (3, 1), request=False),
+        CommandSendItem("Atlona AT-OME-SW32", "Set Output", (2, 1), request=False),
+    ],
+    "Behringer X32": [
+        CommandSendItem(
+            "Behringer X32", "Set Mix Fader Level", (3, 0.5), request=False
+        ),
+    ],
+}
+"""dict: commands send alternating per device, the Denon driver drops an answer
+identical to the previous one."""
+
+
+def percentile(values, percent):
+    """nearest-rank percentile of values"""
+    ordered = sorted(values)
+    index = max(0, -(-len(ordered) * percent // 100) - 1)
+    return ordered[int(index)]
+
+
+class CommandPath:
+    """Command process and listener threads set up as in ViewControl.
+
+    Args:
+        addresses (dict): device_name:(ip, port) of the devices to start.
+        mode (str): "thread" (ThreadCmd) or "process" (ProcessCmd).
+        engine (str): "thread" or "asyncio", see CommandProcess.
+
+    """
+
+    def __init__(self, addresses, mode="thread", engine="thread"):
+        if mode == "process":
+            self.control_queue = multiprocessing.Queue()
+            self.status_queue = multiprocessing.Queue()
+            self.stop_event = multiprocessing.Event()
+            self.process = ProcessCmd(
+                self.status_queue,
+                self.control_queue,
+                addresses,
+                self.stop_event,
+                None,
+                engine=engine,
+            )
+        else:
+            self.control_queue = queue.Queue()
+            self.status_queue = queue.Queue()
+            self.stop_event = threading.Event()
+            self.process = ThreadCmd(
+                self.status_queue,
+                self.control_queue,
+                addresses,
+                self.stop_event,
+                engine=engine,
+            )
+        self.event_queue = queue.Queue()
+        self.done_queue = queue.Queue()
+        self.event_index = EventIndex(
+            [
+                ComEventModule(name, ComType.command_success, None, ".*")
+                for name in addresses
+            ]
+        )
+        self._threads = [
+            threading.Thread(target=self._listen, daemon=True),
+            threading.Thread(target=self._events, daemon=True),
+        ]
+
+    def _listen(self):
+        """as ViewControl.thread_listen_process_cmd"""
+        while True:
+            data = self.status_queue.get(block=True)
+            if data is None:
+                self.event_queue.put(None)
+                return
+            self.event_queue.put(data)
+
+    def _events(self):
+        """as ViewControl.thread_event_system"""
+        while True:
+            data = self.event_queue.get(block=True)
+            if data is None:
+                return
+            self.event_index.match(data)
+            self.done_queue.put((time.perf_counter(), data))
+
+    def start(self):
+        self.process.start()
+        for thread in self._threads:
+            thread.start()
+        return self
+
+    def stop(self):
+        self.stop_event.set()
+        self.process.join(timeout=10)
+        self.status_queue.put(None)
+        for thread in self._threads:
+            thread.join(timeout=5)
+
+    def roundtrip(self, command_item, timeout=5):
+        """send command and return time in seconds until its answer was handled"""
+        start = time.perf_counter()
+        self.control_queue.put(command_item)
+        self._wait_answers(command_item.device, 1, timeout)
+        return time.perf_counter() - start
+
+    def burst(self, command_items, timeout=30):
+        """send all commands at once and return answers per second"""
+        start = time.perf_counter()
+        for command_item in command_items:
+            self.control_queue.put(command_item)
+        self._wait_answers(command_items[0].device, len(command_items), timeout)
+        return len(command_items) / (time.perf_counter() - start)
+
+    def _wait_answers(self, device, count, timeout):
+        deadline = time.perf_counter() + timeout
+        while count:
+            _, data = self.done_queue.get(
+                timeout=max(0, deadline - time.perf_counter())
+            )
+            if data.device == device and data.command is not None:
+                count -= 1
+
+
+def run(addresses, device, mode, engine, rounds):
+    """measure round trip latency and throughput of one device.
+
+    Returns:
+        dict: p50 and p99 latency in ms and throughput in answers per second
+
+    """
+    path = CommandPath({device: addresses[device]}, mode, engine).start()
+    try:
+        commands = itertools.cycle(COMMANDS[device])
+        # first command waits for connection to device
+        path.roundtrip(next(commands), timeout=30)
+        latencies = [path.roundtrip(next(commands)) for _ in range(rounds)]
+        throughput = path.burst([next(commands) for _ in range(rounds)])
+    finally:
+        path.stop()
+    return {
+        "p50": percentile(latencies, 50) * 1000,
+        "p99": percentile(latencies, 99) * 1000,
+        "throughput": throughput,
+    }
+
+
+def set_send_interval(interval):
+    for device in COMMANDS:
+        supported_devices[device].send_interval = interval
+
+
+@pytest.fixture(scope="module")
+def addresses():
+    intervals = {name: supported_devices[name].send_interval for name in COMMANDS}
+    set_send_interval(0.002)
+    with StandInServers() as servers:
+        yield servers.addresses
+    for name, interval in intervals.items():
+        supported_devices[name].send_interval = interval
+
+
+@pytest.mark.parametrize("engine", ["thread", "asyncio"])
+@pytest.mark.parametrize("mode", ["thread", "process"])
+@pytest.mark.parametrize("device", sorted(COMMANDS))
+def test_roundtrip(request, addresses, device, mode, engine):
+    rounds = 50
+    try:
+        benchmark = request.getfixturevalue("benchmark")
+    except pytest.FixtureLookupError:
+        result = run(addresses, device, mode, engine, rounds)
+        print(f"\n{device} {mode} {engine}: {result}")
+        return
+    path = CommandPath({device: addresses[device]}, mode, engine).start()
+    try:
+        commands = itertools.cycle(COMMANDS[device])
+        path.roundtrip(next(commands), timeout=30)
+        benchmark.pedantic(
+            lambda: path.roundtrip(next(commands)), rounds=rounds, iterations=1
+        )
+    finally:
+        path.stop()
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rounds", type=int, default=100)
+    parser.add_argument(
+        "--mode",
+        choices=["thread", "process"],
+        nargs="+",
+        default=["thread", "process"],
+    )
+    parser.add_argument(
+        "--engine",
+        choices=["thread", "asyncio"],
+        nargs="+",
+        default=["thread", "asyncio"],
+    )
+    parser.add_argument("--device", choices=sorted(COMMANDS), nargs="+")
+    parser.add_argument("--keep-interval", action="store_true")
+    options = parser.parse_args(args)
+    if not options.keep_interval:
+        set_send_interval(0.002)
+
+    print(f"{'device':<20}{'mode':<9}{'engine':<9}{'p50/ms':>8}{'p99/ms':>8}{'1/s':>8}")
+    with StandInServers() as servers:
+        for device in options.device or sorted(COMMANDS):
+            for mode in options.mode:
+                for engine in options.engine:
+                    result = run(
+                        servers.addresses, device, mode, engine, options.rounds
+                    )
+                    print(
+                        f"{device:<20}{mode:<9}{engine:<9}{result['p50']:>8.2f}"
+                        f"{result['p99']:>8.2f}{result['throughput']:>8.0f}"
+                    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""Throughput of the multi-page PDF import (Show.module_add_slides).
+
+Generates a PDF slide deck with Wand and imports all pages into a new project
+for every number of worker processes. Every page is rasterized once for both
+versions (widescreen and cinescope). Reported are pages per second.
+
+Run as script:
+
+    $ python -m test.benchmark.bench_slides --pages 40 --workers 1 2 4
+
+or with pytest (the file must be named explicitly since it is not collected by
+default):
+
+    $ pytest test/benchmark/bench_slides.py
+
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+import pytest
+from wand.color import Color
+from wand.drawing import Drawing
+from wand.image import Image
+
+from viewcontrol.show import Show
+
+
+def make_deck(path, pages, size=(2480, 3508)):
+    """write a PDF with numbered pages, size defaults to A4 at 300 dpi"""
+    with Image() as document:
+        for page in range(pages):
+            with Image(
+                width=size[0], height=size[1], background=Color("white")
+            ) as image:
+                with Drawing() as draw:
+                    draw.font_size = 300
+                    draw.text_alignment = "center"
+                    draw.text(size[0] // 2, size[1] // 2, f"page {page + 1}")
+                    draw(image)
+                document.sequence.append(image)
+        document.save(filename=path)
+    return path
+
+
+def run(path, workers):
+    """import all pages of path into a new project
+
+    Returns:
+        float: imported pages per second
+
+    """
+    with tempfile.TemporaryDirectory() as project:
+        show = Show(project)
+        show.show_new("slides")
+        start = time.perf_counter()
+        assert show.module_add_slides("deck", path, 5, max_workers=workers)
+        elapsed = time.perf_counter() - start
+        pages = show.count
+        show.connected_datbase.close()
+    return pages / elapsed
+
+
+@pytest.fixture(scope="module")
+def deck(tmp_path_factory):
+    return make_deck(str(tmp_path_factory.mktemp("slides") / "deck.pdf"), 8)
+
+
+@pytest.mark.parametrize("workers", [1, 2, 4])
+def test_slides(deck, workers):
+    print(f"\n{workers} workers: {run(deck, workers):.2f} pages/s")
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pages", type=int, default=20)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    options = parser.parse_args(args)
+
+    print(f"{'workers':<9}{'pages/s':>8}")
+    with tempfile.TemporaryDirectory() as folder:
+        deck = make_deck(os.path.join(folder, "deck.pdf"), options.pages)
+        for workers in options.workers:
+            print(f"{workers:<9}{run(deck, workers):>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
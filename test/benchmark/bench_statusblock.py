@@ -0,0 +1,121 @@
+"""Reading the latest player status, status queue against shared status block.
+
+A writer process reports the position like the player does with every frame:
+into a StatusBlock and as message on a multiprocessing.Queue (the way every
+time-pos was send before the status channel). The reader asks for the latest
+position every millisecond:
+
+    queue    drain the queue and keep the last message
+    block    StatusBlock.read()
+
+Reported are the time a read takes and the age of the returned position (time
+since the writer reported it), median, 99th percentile and maximum in
+microseconds.
+
+Run as script:
+
+    $ python -m test.benchmark.bench_statusblock --rate 60 --duration 5
+
+or with pytest (the file must be named explicitly since it is not collected by
+default):
+
+    $ pytest test/benchmark/bench_statusblock.py
+
+"""
+
+import argparse
+import multiprocessing
+import queue
+import time
+
+from viewcontrol.playback.statusblock import StatusBlock
+
+
+def writer(block, q, rate, duration, stop):
+    start = time.monotonic()
+    frame = 0
+    while not stop.is_set():
+        deadline = start + frame / rate
+        time.sleep(max(0, deadline - time.monotonic()))
+        position = time.monotonic() - start
+        block.write(time_pos=position, time_remaining=duration - position)
+        q.put(("time-pos", position, time.monotonic()))
+        frame += 1
+
+
+def read_queue(q, last):
+    """drain q, returns the last message or last if q was empty"""
+    while True:
+        try:
+            last = q.get_nowait()
+        except queue.Empty:
+            return last
+
+
+def percentiles(values):
+    values = sorted(values)
+    return (
+        values[len(values) // 2] * 1e6,
+        values[int(len(values) * 0.99)] * 1e6,
+        values[-1] * 1e6,
+    )
+
+
+def run(rate=60, duration=5, interval=0.001):
+    """read the position every interval seconds over both paths
+
+    Returns:
+        dict: path:(read times, ages) in seconds
+
+    """
+    context = multiprocessing.get_context("fork")
+    block, q, stop = StatusBlock(), context.Queue(), context.Event()
+    process = context.Process(target=writer, args=(block, q, rate, duration, stop))
+    process.start()
+    results = {"queue": ([], []), "block": ([], [])}
+    try:
+        last = read_queue(q, q.get(timeout=5))
+        end = time.monotonic() + duration
+        while time.monotonic() < end:
+            start = time.monotonic()
+            last = read_queue(q, last)
+            read = time.monotonic()
+            results["queue"][0].append(read - start)
+            results["queue"][1].append(read - last[2])
+
+            start = time.monotonic()
+            status = block.read()
+            read = time.monotonic()
+            results["block"][0].append(read - start)
+            results["block"][1].append(read - status.updated)
+            time.sleep(interval)
+    finally:
+        stop.set()
+        process.join()
+        block.close()
+    return results
+
+
+def test_statusblock():
+    results = run(duration=1)
+    for path, (reads, ages) in results.items():
+        print(f"\n{path}: read {percentiles(reads)}us, age {percentiles(ages)}us")
+    assert len(results["block"][0]) > 100
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rate", type=float, default=60, help="updates per second")
+    parser.add_argument("--duration", type=float, default=5)
+    options = parser.parse_args(args)
+
+    results = run(options.rate, options.duration)
+    print(f"{'path':<8}{'':<6}{'median/us':>10}{'p99/us':>10}{'max/us':>10}")
+    for path, (reads, ages) in results.items():
+        for name, values in (("read", reads), ("age", ages)):
+            median, p99, maximum = percentiles(values)
+            print(f"{path:<8}{name:<6}{median:>10.1f}{p99:>10.1f}{maximum:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
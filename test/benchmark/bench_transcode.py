@@ -0,0 +1,104 @@
+"""Writing both versions of a 16:9 video, moviepy against one ffmpeg pass.
+
+Transcodes a trimmed generated clip (so the widescreen version is encoded
+too, not copied) into the cinescope and widescreen versions with
+VideoElement._write_versions:
+
+    moviepy    every version composed frame by frame in Python (two decodes)
+    ffmpeg     both versions from one decode, split in the filter graph
+    separate   one ffmpeg process per version (two decodes), to show the cost
+               of every version on its own
+
+Wall time and CPU time (this process and its ffmpeg children) are reported
+per pass.
+
+Run as script:
+
+    $ python -m test.benchmark.bench_transcode --size 1920x1080 --duration 20
+
+or with pytest (the file must be named explicitly since it is not collected by
+default):
+
+    $ pytest test/benchmark/bench_transcode.py
+
+"""
+
+import argparse
+import os
+import tempfile
+
+import pytest
+
+from viewcontrol.show import MediaElement, VideoElement
+from viewcontrol.util.media import transcode
+from .bench_aspect import make_clip
+
+
+def run(mode, path, folder, t_start=0.5):
+    """write both versions of path into folder
+
+    Returns:
+        dict: (versions, ):(wall time, cpu time) in seconds of every pass
+
+    """
+    targets = {
+        variant: os.path.join(folder, f"{mode}{variant}.mp4")
+        for variant in ("_c", "_w")
+    }
+    if mode == "separate":
+        filters = {"_c": VideoElement.letterbox_filter, "_w": None}
+        return {
+            (variant,): transcode(path, [(target, filters[variant])], t_start)
+            for variant, target in targets.items()
+        }
+    transcoder, VideoElement.transcoder = VideoElement.transcoder, mode
+    try:
+        return VideoElement._write_versions(path, targets, "16:9", t_start)
+    finally:
+        VideoElement.transcoder = transcoder
+
+
+MODES = ["ffmpeg", "separate", "moviepy"]
+
+
+@pytest.fixture(scope="module")
+def clip(tmp_path_factory):
+    folder = tmp_path_factory.mktemp("transcode")
+    return make_clip(str(folder / "source.mp4"), 1920, 1080, 4, False), folder
+
+
+@pytest.mark.parametrize("mode", MODES)
+def test_transcode(clip, mode):
+    assert not MediaElement._skip_high_workload_functions
+    path, folder = clip
+    passes = run(mode, path, str(folder))
+    for variants, (wall, cpu) in passes.items():
+        print(f"\n{mode} {'+'.join(variants)}: {wall:.2f}s ({cpu:.2f}s cpu)")
+    assert sum(len(variants) for variants in passes) == 2
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size", default="1920x1080", help="WIDTHxHEIGHT (16:9)")
+    parser.add_argument("--duration", type=int, default=20)
+    parser.add_argument("--mode", choices=MODES, nargs="+", default=MODES)
+    options = parser.parse_args(args)
+    width, height = map(int, options.size.split("x"))
+
+    print(f"{'mode':<10}{'versions':<10}{'wall/s':>8}{'cpu/s':>8}")
+    with tempfile.TemporaryDirectory() as folder:
+        path = make_clip(
+            os.path.join(folder, "source.mp4"), width, height, options.duration, False
+        )
+        for mode in options.mode:
+            try:
+                passes = run(mode, path, folder)
+            except Exception as ex:
+                print(f"{mode:<10}failed: {ex!r}")
+                continue
+            for variants, (wall, cpu) in passes.items():
+                print(f"{mode:<10}{'+'.join(variants):<10}{wall:>8.2f}{cpu:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""Local stand-in servers emulating the supported devices.
+
+The servers answer just enough of the protocols to let the device classes run
+without hardware. They are used by the communication tests and the benchmarks.
+
+"""
+
+import socketserver
+import threading
+
+
+class DenonHandler(socketserver.BaseRequestHandler):
+    """TCP stand-in of the Denon DN-500BD.
+
+    Acknowledges every command with "ack" and answers the status request with
+    "ack+@0STPLAY". Like the device every answer is send twice.
+
+    """
+
+    def handle(self):
+        buffer = b""
+        while True:
+            data = self.request.recv(1024)
+            if not data:
+                return
+            buffer += data
+            while b"\r" in buffer:
+                command, buffer = buffer.split(b"\r", 1)
+                if command == b"@0?ST":
+                    answer = b"ack+@0STPLAY\r"
+                else:
+                    answer = b"ack\r"
+                self.request.sendall(answer + answer)
+
+
+class AtlonaHandler(socketserver.BaseRequestHandler):
+    """Telnet stand-in of the Atlona AT-OME-SW32.
+
+    Negotiates a telnet option and sends the welcome message after connecting.
+    Every command is echoed and then answered with the command itself, as the
+    device does for "Set Output".
+
+    """
+
+    IAC_DO_ECHO = bytes([255, 253, 1])
+    IAC_WONT_ECHO = bytes([255, 252, 1])
+
+    def handle(self):
+        self.request.sendall(self.IAC_DO_ECHO + b"Welcome to TELNET.\r\n")
+        buffer = b""
+        while True:
+            data = self.request.recv(1024)
+            if not data:
+                return
+            buffer += data.replace(self.IAC_WONT_ECHO, b"")
+            while b"\r" in buffer:
+                command, buffer = buffer.split(b"\r", 1)
+                line = command + b"\r\n"
+                self.request.sendall(line + line)
+
+
+class X32Handler(socketserver.BaseRequestHandler):
+    """OSC stand-in of the Behringer X32, echoing every message."""
+
+    def handle(self):
+        data, sock = self.request
+        sock.sendto(data, self.client_address)
+
+
+class _ThreadingTCPServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+class StandInServers:
+    """Starts the stand-in servers of all devices on localhost in threads.
+
+    Can be used as context manager.
+
+    Attributes:
+        addresses (dict): device_name:(ip, port) of the running servers, can be
+            passed as devices to CommandProcess.
+
+    """
+
+    servers = {
+        "Denon DN-500BD": (_ThreadingTCPServer, DenonHandler),
+        "Atlona AT-OME-SW32": (_ThreadingTCPServer, AtlonaHandler),
+        "Behringer X32": (socketserver.ThreadingUDPServer, X32Handler),
+    }
+
+    def __init__(self):
+        self._servers = list()
+        self.addresses = dict()
+
+    def start(self):
+        for name, (server_class, handler) in self.servers.items():
+            server = server_class(("127.0.0.1", 0), handler)
+            server.daemon_threads = True
+            threading.Thread(target=server.serve_forever, daemon=True).start()
+            self._servers.append(server)
+            self.addresses[name] = server.server_address
+        return self
+
+    def stop(self):
+        for server in self._servers:
+            server.shutdown()
+            server.server_close()
+        self._servers = list()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
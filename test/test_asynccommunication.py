@@ -0,0 +1,82 @@
+import queue
+
+import pytest
+
+from viewcontrol.remotecontrol import supported_devices
+from viewcontrol.remotecontrol.asynccommunication import AsyncCommunicationEngine
+from viewcontrol.remotecontrol.commanditem import CommandSendItem
+from viewcontrol.remotecontrol.threadcommunicationbase import ComType
+from viewcontrol.remotecontrol.threadcommunicationbase import ThreadCommunicationBase
+from .benchmark.servers import StandInServers
+
+
+@pytest.fixture(scope="module")
+def servers():
+    with StandInServers() as stand_in:
+        yield stand_in.addresses
+
+
+@pytest.fixture(scope="module")
+def answers(servers):
+    answer_queue = queue.Queue()
+    ThreadCommunicationBase.set_answer_queue(answer_queue)
+    devices = {
+        name: supported_devices[name](*address) for name, address in servers.items()
+    }
+    engine = AsyncCommunicationEngine(devices.values())
+    engine.start()
+    yield devices, answer_queue
+    engine.stop(timeout=5)
+    assert not engine.is_alive()
+
+
+def receive(answer_queue, device, count=1):
+    items = list()
+    while len(items) < count:
+        item = answer_queue.get(timeout=5)
+        if item.device == device:
+            items.append(item)
+    return items
+
+
+def test_tcp(answers):
+    devices, answer_queue = answers
+    device = devices["Denon DN-500BD"]
+    device._put_into_command_queue(
+        CommandSendItem(device.device_name, "Play", request=False)
+    )
+    device._put_into_command_queue(CommandSendItem(device.device_name, "Status"))
+    ack, status = receive(answer_queue, device.name, 2)
+    assert ack.command == "Play"
+    assert ack.message_type == ComType.command_success
+    assert status.command == "Status"
+    assert status.message_type == ComType.request_success
+    assert status.values == {"status": "PLAY"}
+
+
+def test_telnet(answers):
+    devices, answer_queue = answers
+    device = devices["Atlona AT-OME-SW32"]
+    for output in (1, 2):
+        device._put_into_command_queue(
+            CommandSendItem(
+                device.device_name, "Set Output", (3, output), request=False
+            )
+        )
+    for output, answer in zip((1, 2), receive(answer_queue, device.name, 2)):
+        assert answer.command == "Set Output"
+        assert answer.message_type == ComType.command_success
+        assert answer.values == {"IN": 3, "OUT": output}
+
+
+def test_osc(answers):
+    devices, answer_queue = answers
+    device = devices["Behringer X32"]
+    device._put_into_command_queue(
+        CommandSendItem(
+            device.device_name, "Set Mix Fader Level", (3, 0.5), request=False
+        )
+    )
+    (answer,) = receive(answer_queue, device.name)
+    assert answer.command == "Set Mix Fader Level"
+    assert answer.values == {"fader": 3, "level": 0.5}
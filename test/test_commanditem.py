@@ -0,0 +1,111 @@
+import re
+
+import pytest
+
+from viewcontrol.remotecontrol import supported_devices
+from viewcontrol.remotecontrol.commanditem import (
+    AnswerMatcher,
+    CommandTemplate,
+    format_arg_count,
+)
+from viewcontrol.remotecontrol.threadcommunicationbase import ComType
+
+messages = [
+    "@0PW00",
+    "@0STPLAY",
+    "@0Tt0123",
+    "@0PCIRLK01",
+    "ack+12345",
+    "ack+1234567",
+    "x3AVx1,x2AVx2",
+    "x1AVx4",
+    "InputStatus 101",
+    "PWOFF",
+    "Unlock",
+    "Blink ON",
+    "/ch/01/mix/fader",
+    "/config/mute/3",
+    "/status",
+    "garbage",
+]
+
+
+def search_templates(templates, string):
+    for template in templates:
+        if not template.answer_analysis:
+            continue
+        m = re.search(template.answer_analysis, string)
+        if m:
+            return template, m.groups()
+    return None, None
+
+
+@pytest.mark.parametrize("device", sorted(supported_devices))
+def test_matcher_equals_search(device):
+    templates = supported_devices[device].dict_command_template
+    matcher = AnswerMatcher(templates.values())
+    for message in messages:
+        assert matcher.match(message) == search_templates(templates.values(), message)
+    assert matcher.hits + matcher.misses == len(messages)
+
+
+def test_matcher_not_combinable():
+    templates = [
+        CommandTemplate("a", "", answer_analysis=r"(\d)x"),
+        CommandTemplate("b", "", answer_analysis=r"(?i)(y)(\d)"),
+        CommandTemplate("c", "", answer_analysis=r"(?P<v>\d)\1"),
+        CommandTemplate("d", "", answer_analysis=r"(z)"),
+    ]
+    matcher = AnswerMatcher(templates)
+    assert len(matcher._stages) == 4
+    for message in ["1x", "Y2", "33", "z", "Y4x", "44 z", "--"]:
+        assert matcher.match(message) == search_templates(templates, message)
+    assert matcher.misses == 1
+
+
+def test_template_compiled():
+    template = CommandTemplate(
+        "Set Mix Fader Level",
+        "",
+        command_composition="/ch/{:02}/mix/fader",
+        request_composition="/ch/{:02}/mix/fader",
+        answer_analysis=r"/ch/(\d\d)/mix/fader",
+        argument_mappings={"fader": "int", "level": [0.0, 1.0], "mode": {"a": "b"}},
+    )
+    assert template.composition(request=False) == ("/ch/{:02}/mix/fader", 1)
+    assert template.number_request_arguments == 1
+    assert template.argument_type("level") is float
+    assert template.sorted_tuple_from_dict({"level": 0.5, "fader": 3}) == (
+        3,
+        0.5,
+        None,
+    )
+    assert template.create_arg_dict(("03", "0.5", 1)) == {
+        "fader": 3,
+        "level": 0.5,
+        "mode": "1",
+    }
+
+
+@pytest.mark.parametrize("device", sorted(supported_devices))
+def test_templates_compiled(device):
+    for template in supported_devices[device].dict_command_template.values():
+        if template.command_composition:
+            count = format_arg_count(template.command_composition)
+            assert template.composition(request=False)[1] == count
+        for key in template._argument_keys:
+            assert template.argument_type(key) in (int, float, str)
+
+
+def test_denon_unknown_status():
+    device = supported_devices["Denon DN-500BD"]("127.0.0.1", 9030)
+    answers = list()
+    device._put_into_answer_queue = answers.append
+    device._analyse("@0STPLAY\r@0XX42\r")
+    status, unknown = answers
+    assert status.command == "Status"
+    assert status.message_type == ComType.message_status
+    assert status.values == {"status": "PLAY"}
+    assert unknown.command is None
+    assert unknown.message_type == ComType.unidentifiable
+    assert unknown.values == "@0XX42"
@@ -0,0 +1,115 @@
+import threading
+
+from blinker import signal
+
+from viewcontrol.playback.coordinator import PlaybackCoordinator, PlaybackState
+
+
+def run_main_loop(coordinator, log, stop):
+    """main loop of ViewControl, logging instead of appending and sending"""
+    while not stop.is_set():
+        state = coordinator.wait(
+            PlaybackState.prefetching, PlaybackState.switching, timeout=0.05
+        )
+        if state is PlaybackState.prefetching:
+            log.append("append")
+            coordinator.appended()
+        elif state is PlaybackState.switching:
+            log.append("commands")
+            coordinator.switched()
+
+
+def test_transitions():
+    coordinator = PlaybackCoordinator()
+    transitions = list()
+
+    def receiver(sender, state, previous, duration):
+        transitions.append((previous, state))
+        assert duration >= 0
+
+    signal("playback_state").connect(receiver, sender=coordinator)
+    assert not coordinator.time_remaining(0.5)  # nothing playing yet
+    assert coordinator.playlist_switched()
+    assert coordinator.switched()
+    assert not coordinator.time_remaining(None)
+    assert not coordinator.time_remaining(5)
+    assert coordinator.time_remaining(0.5)
+    assert not coordinator.time_remaining(0.4)
+    assert coordinator.appended()
+    assert coordinator.state is PlaybackState.appended
+    assert transitions == [
+        (PlaybackState.appended, PlaybackState.switching),
+        (PlaybackState.switching, PlaybackState.idle),
+        (PlaybackState.idle, PlaybackState.prefetching),
+        (PlaybackState.prefetching, PlaybackState.appended),
+    ]
+    count, total, maximum = coordinator.transitions[
+        (PlaybackState.idle, PlaybackState.prefetching)
+    ]
+    assert count == 1 and 0 <= maximum <= total
+
+
+def test_show_cycle():
+    coordinator = PlaybackCoordinator()
+    log, stop = list(), threading.Event()
+    main = threading.Thread(target=run_main_loop, args=(coordinator, log, stop))
+    main.start()
+    try:
+        for _ in range(3):
+            coordinator.playlist_switched()
+            assert coordinator.wait(PlaybackState.idle, timeout=1)
+            coordinator.time_remaining(0.2)
+            assert coordinator.wait(PlaybackState.appended, timeout=1)
+    finally:
+        stop.set()
+        main.join()
+    assert log == ["commands", "append"] * 3
+
+
+def test_skip():
+    coordinator = PlaybackCoordinator(state=PlaybackState.idle)
+    assert not coordinator.skip(timeout=0.05)  # nobody appends
+    assert coordinator.state is PlaybackState.prefetching
+
+    coordinator = PlaybackCoordinator(state=PlaybackState.switching)
+    log, stop = list(), threading.Event()
+    main = threading.Thread(target=run_main_loop, args=(coordinator, log, stop))
+    main.start()
+    try:
+        assert coordinator.skip(timeout=1)
+        assert coordinator.state is PlaybackState.appended
+        assert coordinator.skip(timeout=1)  # already appended
+    finally:
+        stop.set()
+        main.join()
+    assert log == ["commands", "append"]
+
+
+def test_prefetch():
+    coordinator = PlaybackCoordinator(state=PlaybackState.idle)
+    assert coordinator.prefetch()
+    assert coordinator.state is PlaybackState.prefetching
+    assert not coordinator.prefetch()  # already requested
+    assert coordinator.appended()
+    assert not coordinator.prefetch()  # nothing to prefetch before the switch
+
+
+def test_pending_switches():
+    coordinator = PlaybackCoordinator()
+    assert coordinator.playlist_switched()
+    assert not coordinator.playlist_switched()  # while the first is handled
+    assert coordinator.switched()
+    assert coordinator.state is PlaybackState.switching
+    assert coordinator.switched()
+    assert coordinator.state is PlaybackState.idle
+    assert coordinator.playlist_switched()  # item appended in advance
+
+    assert coordinator.switched()
+    assert coordinator.prefetch()
+    assert not coordinator.playlist_switched()  # while prefetching
+    assert coordinator.pending == 1
+    assert coordinator.appended()
+    assert coordinator.state is PlaybackState.switching
+    assert coordinator.pending == 0
+    assert coordinator.switched()
+    assert coordinator.state is PlaybackState.idle
@@ -0,0 +1,71 @@
+import queue
+import time
+
+import pytest
+
+from viewcontrol.playback.mediaclock import CueScheduler, MediaClock
+
+
+def test_clock_interpolation():
+    clock = MediaClock(seek_threshold=0.5)
+    clock.reset()
+    assert not clock.update(1.0, now=clock._updated + 1.01)
+    assert clock.position(now=clock._updated + 0.2) == pytest.approx(1.2)
+    clock.pause()
+    position = clock.position()
+    time.sleep(0.05)
+    assert clock.position() == position
+    clock.resume()
+    assert clock.update(10.0)  # seek
+
+
+@pytest.fixture
+def scheduler():
+    fired = queue.Queue()
+    scheduler = CueScheduler(lambda cue: fired.put((time.perf_counter(), cue)))
+    scheduler.start()
+    yield scheduler, fired
+    scheduler.stop()
+
+
+def test_cues_fired_on_clock(scheduler):
+    scheduler, fired = scheduler
+    start = time.perf_counter()
+    scheduler.load([(0.2, "b"), (0.1, "a")])
+    for offset, cue in ((0.1, "a"), (0.2, "b")):
+        fired_at, fired_cue = fired.get(timeout=1)
+        assert fired_cue == cue
+        assert fired_at - start == pytest.approx(offset, abs=0.005)
+    assert scheduler.errors.count == 2
+    assert scheduler.errors.maximum < 0.005
+
+
+def test_cues_pause_and_seek(scheduler):
+    scheduler, fired = scheduler
+    scheduler.load([(0.1, "a"), (0.3, "b"), (5, "c")])
+    scheduler.pause()
+    with pytest.raises(queue.Empty):
+        fired.get(timeout=0.2)
+    scheduler.resume()
+    assert fired.get(timeout=1)[1] == "a"
+    scheduler.time_pos(0.15)
+    scheduler.time_pos(4.95)  # seek over "b"
+    assert fired.get(timeout=1)[1] == "c"
+    scheduler.time_pos(0.25)  # seek back arms "b" and "c" again
+    assert fired.get(timeout=1)[1] == "b"
+    scheduler.clear()
+    assert scheduler.pending == 0
+
+
+def test_stale_position_after_load(scheduler):
+    scheduler, fired = scheduler
+    scheduler.load([(0.3, "a"), (30.5, "b")])
+    scheduler.time_pos(30.0)  # previous media not closed yet
+    with pytest.raises(queue.Empty):
+        fired.get(timeout=0.1)
+    assert scheduler.clock.position() < 0.5
+    assert scheduler.pending == 2
+    scheduler.time_pos(0.12)
+    assert fired.get(timeout=1)[1] == "a"
+    scheduler.time_pos(30.4)  # seek after the start was reported
+    assert fired.get(timeout=1)[1] == "b"
@@ -0,0 +1,27 @@
+import pytest
+
+from viewcontrol.playback.outputsync import SkewMeter
+
+
+def test_skew():
+    meter = SkewMeter(outputs=3, tolerance=0.02)
+    assert meter.switched(0, 1, 10.0) is None
+    assert meter.switched(2, 1, 10.012) is None
+    assert meter.switched(1, 2, 20.0) is None  # outputs report in any order
+    assert meter.switched(1, 1, 10.004) == pytest.approx(0.012)
+    assert meter.switched(0, 2, 20.03) is None
+    assert meter.switched(2, 2, 20.01) == pytest.approx(0.03)
+    assert meter.skews.count == 2
+    assert meter.skews.percentile(50) == 0.02
+    assert meter.late == 1
+
+
+def test_incomplete_entries():
+    meter = SkewMeter(outputs=2, pending=2)
+    for index in range(1, 5):
+        meter.switched(0, index, float(index))  # output 1 missed the switches
+    assert list(meter._switches) == [3, 4]
+    assert meter.switched(1, 4, 4.001) == pytest.approx(0.001)
+    meter.reset()
+    assert meter.switched(1, 3, 3.0) is None
+    assert meter.skews.count == 1
@@ -0,0 +1,65 @@
+import pytest
+
+from viewcontrol.playback.playlistwindow import PlaylistWindow
+
+
+class Playlist:
+    """playlist of the player, only indices and removal"""
+
+    def __init__(self):
+        self.entries = ["start"]
+        self.pos = 0
+
+    def remove(self, position):
+        del self.entries[position]
+        if position < self.pos:
+            self.pos -= 1
+
+
+def test_bounded_playlist():
+    window, playlist = PlaylistWindow(keep_played=1), Playlist()
+    durations = dict()
+    for n in range(1, 21):
+        index = window.append(duration=n % 2 and 5.0)
+        playlist.entries.append(index)
+        assert index == n
+
+        playlist.pos += 1  # player switches to the appended entry
+        assert window.position(playlist.pos) == n
+        durations[n] = window.switched(n)
+        for _ in range(window.trim(playlist.pos)):
+            playlist.remove(0)
+        assert window.position(playlist.pos) == n  # removal does not move
+        assert len(playlist.entries) == window.length <= 2
+
+    assert playlist.entries == [19, 20]
+    assert durations == {n: n % 2 and 5.0 or None for n in range(1, 21)}
+    window.reset()
+    assert window.append() == 1
+
+
+def test_drop_upcoming():
+    window, playlist = PlaylistWindow(), Playlist()
+    for _ in range(5):
+        playlist.entries.append(window.append(duration=2.0))
+    playlist.pos = 2
+    window.switched(window.position(2))
+    for position in window.drop(playlist.pos, 3):
+        playlist.remove(position)
+    assert playlist.entries == ["start", 1, 2, 3]
+    assert window.append() == 4
+    assert window.switched(3) == 2.0
+    assert window.switched(4) is None  # duration of the dropped entry removed
+
+    # the player already passed the index: the current entry is kept
+    assert window.drop(3, 1) == [4]
+
+
+def test_transition_gaps():
+    window = PlaylistWindow()
+    assert window.started(now=1.0) is None  # restart after seek, no switch
+    window.switched(1, now=10.0)
+    assert window.started(now=10.03) == pytest.approx(0.03)
+    assert window.started(now=11.0) is None
+    assert window.gaps.count == 1
+    assert window.gaps.percentile(100) == 0.04
@@ -0,0 +1,82 @@
+import queue
+import threading
+import time
+
+import pytest
+
+try:
+    from viewcontrol.playback.processmpv import ThreadMpv
+except (ImportError, OSError):  # libmpv missing
+    pytest.skip("mpv can not be loaded", allow_module_level=True)
+from viewcontrol.playback.outputsync import SkewMeter
+
+
+def switched(status_queue, timeout=5):
+    """wait for the next ("switched", (index, time)) message of a player"""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            message = status_queue.get(timeout=0.1)
+        except queue.Empty:
+            continue
+        if message[0] == "switched":
+            return message[1]
+    raise TimeoutError("player did not switch")
+
+
+@pytest.fixture
+def outputs():
+    """two synchronized players without display"""
+    stop_event = threading.Event()
+    queues = [(queue.Queue(), queue.Queue()) for _ in range(2)]
+    players = [
+        ThreadMpv(
+            status_queue,
+            control_queue,
+            0,
+            stop_event,
+            synchronized=True,
+            video_output="null",
+            name=f"ThreadMpv{output}",
+        )
+        for output, (status_queue, control_queue) in enumerate(queues)
+    ]
+    for player in players:
+        player.start()
+    yield queues
+    stop_event.set()
+    for player in players:
+        player.join(timeout=5)
+
+
+def test_synchronized_switch(outputs, source_data):
+    media = source_data.joinpath("media")
+    tracks = [
+        ["Big_Buck_Bunny_1080p_Opening_Screen.png", "bbb_title_anouncement.jpg"],
+        ["bbb_poster_bunny_big.jpg", "bbb_poster_rodents_big.jpg"],
+    ]
+    for files in tracks:
+        files.append("viewcontrol.png")
+    for (_, control_queue), files in zip(outputs, tracks):
+        for file in files:
+            control_queue.put((str(media.joinpath(file)), 1.0))
+
+    meter = SkewMeter(len(outputs))
+    for index in (1, 2):
+        deadline = time.monotonic() + 0.5
+        for _, control_queue in outputs:
+            control_queue.put(("switch", deadline, index))
+        for output, (status_queue, _) in enumerate(outputs):
+            switch = switched(status_queue)
+            assert switch[0] == index
+            assert switch[1] >= deadline
+            meter.switched(output, *switch)
+
+    # players keep the second still although its display duration is over and
+    # the third one is appended
+    time.sleep(1.5)
+    for status_queue, _ in outputs:
+        with pytest.raises(TimeoutError):
+            switched(status_queue, timeout=0.2)
+    assert meter.skews.count == 2
+    assert meter.late == 0, meter.skews.snapshot()
@@ -0,0 +1,64 @@
+import os
+import time
+
+import pytest
+
+from viewcontrol.playback.readahead import Readahead
+
+
+def cold_file(path, size=4 << 20):
+    """write a file and drop it from the page cache"""
+    with open(path, "wb") as file:
+        file.write(os.urandom(size))
+        file.flush()
+        os.fsync(file.fileno())
+        os.posix_fadvise(file.fileno(), 0, 0, os.POSIX_FADV_DONTNEED)
+    return str(path)
+
+
+def warmed(readahead, path, timeout=5):
+    """count the transition to path once fadvise finished reading it"""
+    deadline = time.monotonic() + timeout
+    while not readahead.probe(path) and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return readahead.transition(path)
+
+
+@pytest.fixture
+def files(tmp_path):
+    if not hasattr(os, "RWF_NOWAIT") or not hasattr(os, "posix_fadvise"):
+        pytest.skip("page cache can not be probed")
+    paths = [cold_file(tmp_path / f"clip{i}.mp4") for i in range(3)]
+    if Readahead().probe(paths[0]) is not False:
+        pytest.skip("file system does not drop or probe the page cache")
+    return paths
+
+
+@pytest.mark.parametrize("method", ["fadvise", "read"])
+def test_warm(files, method):
+    readahead = Readahead(budget=2 << 20, method=method)
+    try:
+        readahead.warm(files[:2])
+        assert readahead.wait(timeout=5)
+        assert warmed(readahead, files[0])  # 1 MiB of 2 MiB budget
+        assert not readahead.transition(files[2])
+        assert (readahead.hits, readahead.misses) == (1, 1)
+        assert readahead.hit_rate == 0.5
+
+        readahead.warm(files[1:])  # files[1] is not warmed again
+        assert list(readahead._jobs) == files[1:]
+        assert readahead.wait(timeout=5)
+        assert warmed(readahead, files[2])
+    finally:
+        readahead.shutdown()
+
+
+def test_missing_file(tmp_path):
+    readahead = Readahead()
+    try:
+        readahead.warm([str(tmp_path / "missing.mp4")])
+        assert readahead.wait(timeout=5)
+        assert readahead.transition(str(tmp_path / "missing.mp4")) is None
+        assert readahead.unknown == 1 and readahead.hit_rate is None
+    finally:
+        readahead.shutdown()
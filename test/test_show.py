@@ -1,6 +1,12 @@
+import os
+import sqlite3
+import types
+
 import pytest
+import sqlalchemy
 
 import viewcontrol
+from viewcontrol.remotecontrol.commanditem import CommandRecvItem
 from viewcontrol.remotecontrol.threadcommunicationbase import ComType
 
 
@@ -91,7 +97,7 @@ class TestShowPlaylist:
 
     def test_1102_append_same(self, project_folder, show_t, source_data):
         assert show_t.count == 1
-        # add same (source-)file(name) twice , check if counter is added on files
+        # add same (source-)file twice, check if the stored files are referenced
         show_t.module_add_still(
             "announcement", scr_media(source_data, "bbb_title_anouncement.jpg"), 2
         )
@@ -99,9 +105,12 @@ class TestShowPlaylist:
             "announcement_copy", scr_media(source_data, "bbb_title_anouncement.jpg"), 3
         )
         assert project_folder.joinpath("bbb_title_anouncement_c.jpg").exists()
-        assert project_folder.joinpath("bbb_title_anouncement_c_2.jpg").exists()
+        assert not project_folder.joinpath("bbb_title_anouncement_c_2.jpg").exists()
         assert project_folder.joinpath("bbb_title_anouncement_w.jpg").exists()
-        assert project_folder.joinpath("bbb_title_anouncement_w_2.jpg").exists()
+        assert not project_folder.joinpath("bbb_title_anouncement_w_2.jpg").exists()
+        announcement = show_t._module_get_with_name("announcement").media_element
+        copy = show_t._module_get_with_name("announcement_copy").media_element
+        assert announcement.file_path == copy.file_path
         assert show_t.count == 3
 
     def test_1203_delete_same(self, show_t):
@@ -172,6 +181,24 @@ class TestShowPlaylist:
         assert show_t.module_remove(7)
         assert show_t.count == 7
 
+    def test_1309_position_index(self, show_t):
+        assert [mod.position for mod in show_t.playlist] == list(range(show_t.count))
+        assert show_t.module_change_position(0, show_t.count - 1)
+        assert show_t._module_get_at_pos(show_t.count - 1).name == "poster"
+        assert show_t.module_change_position(show_t.count - 1, 0)
+        assert show_t._module_get_with_name("poster").position == 0
+        assert [mod.position for mod in show_t.playlist] == list(range(show_t.count))
+
+    def test_1310_reorder(self, show_t):
+        ids = [mod.id for mod in show_t.playlist]
+        assert not show_t.modules_reorder(ids[1:])
+        assert show_t.modules_reorder(list(reversed(ids)))
+        assert show_t._module_get_at_pos(0).id == ids[-1]
+        assert show_t.show_load("testing")
+        assert [mod.id for mod in show_t.playlist] == list(reversed(ids))
+        assert show_t.modules_reorder(ids)
+        assert [mod.position for mod in show_t.playlist] == list(range(len(ids)))
+
     def test_1316_append_text_element(self, project_folder, show_t):
         assert show_t.count == 7
         assert show_t.module_add_text("next", "next at viewcontrol", 5)
@@ -355,3 +382,242 @@ class TestShowPlaylist:
             show_t.show_options.set_device_property(
                 show_t.show_options.devices[name], enabled=True, connection=connection,
             )
+
+
+class TestShowPlayback:
+    def test_1000_plan(self, show):
+        assert show.show_new("playback")
+        for i in range(4):
+            assert show.module_add_text(f"pb{i}", f"pb{i}", 1)
+        assert show.module_add_loop(2, pos=1)
+        assert show.module_move_down(2)
+        assert show.module_add_jumptotarget("pb jump", "event_pb", pos=5)
+        assert [mod.name for mod in show.playlist] == [
+            "~pb0",
+            "#LoopStart_2",
+            "~pb1",
+            "#LoopEnd_2",
+            "~pb2",
+            "#pb jump",
+            "~pb3",
+        ]
+
+    def test_1001_next(self, show):
+        assert show.show_load("playback")
+        assert show.module_current.name == "~pb0"
+        names = [show.next().name for _ in range(6)]
+        assert names == ["~pb1", "~pb1", "~pb1", "~pb2", "~pb3", "viewcontrol"]
+
+    def test_1002_jump(self, show):
+        assert show.show_load("playback")
+        assert show.item_current.module.name == "~pb0"
+        show.notify(show._module_get_with_name("#pb jump").logic_element)
+        item = show.item_next()
+        assert item.module.name == "~pb3"
+        assert item.still and item.duration == 1
+        assert item.file_path.endswith("_pb3.jpg")
+
+    def test_1003_invalidate(self, show):
+        assert show.show_load("playback")
+        plan = show.plan
+        assert show.plan is plan
+        assert show.module_move_up(6)
+        assert show.plan is not plan
+        assert show.plan.item_at(5).module.name == "~pb3"
+        assert show.module_move_down(5)
+
+    def test_1004_eager_load(self, show):
+        statements = list()
+
+        def count(conn, cursor, statement, *args):
+            statements.append(statement)
+
+        engine = show.connected_datbase.get_bind()
+        sqlalchemy.event.listen(engine, "before_cursor_execute", count)
+        try:
+            assert show.show_load("testing", detach=True)
+            loaded = len(statements)
+            for mod in show.playlist:
+                assert mod not in show.connected_datbase
+                mod.media_element, mod.logic_element
+                [cmd.command_send_item for cmd in mod.list_commands]
+            for mod in show.eventlist:
+                mod.jump_to_target_element, mod.list_commands
+            assert len(statements) == loaded
+            assert any(mod.list_commands for mod in show.playlist)
+        finally:
+            sqlalchemy.event.remove(engine, "before_cursor_execute", count)
+
+    def test_1005_event_index(self, show):
+        assert show.show_load("testing")
+        recv = CommandRecvItem(
+            "DenonDN500BD", "Status", {"status": "Pause"}, ComType.message_status
+        )
+        matched = show.event_index.match(recv)
+        assert matched and all(mod.name_command == "Status" for mod in matched)
+        recv.values = {"status": "Play"}
+        assert not show.event_index.match(recv)
+        recv.device = "Atlona AT-OME-SW32"
+        assert not show.event_index.candidates(recv)
+        key = ("KeyEvent", types.SimpleNamespace(name="end"), "on_press")
+        assert [mod.name for mod in show.event_index.candidates(key)] == ["exit loop"]
+
+    def test_1006_event_index_regex(self):
+        mod = viewcontrol.show.ComEventModule(
+            "X32", ComType.unidentifiable, None, r"/meters/\d+ .*"
+        )
+        index = viewcontrol.show.EventIndex([mod])
+        recv = CommandRecvItem("X32", None, ("/meters/1", 0.5), ComType.unidentifiable)
+        assert index.match(recv) == [mod]
+        recv.values = ("/status", 0.5)
+        assert index.match(recv) == []
+
+    def test_1007_media_import_batch(self, show, project_folder, source_data):
+        paths = [
+            scr_media(source_data, "Big_Buck_Bunny_1080p_Opening_Screen.png"),
+            scr_media(source_data, "Big_Buck_Bunny_1080p_clip2.avi"),
+            scr_media(source_data, "Big_Buck_Bunny_1080p_Opening_Screen.png"),
+            scr_media(source_data, "missing.jpg"),
+        ]
+        reports = list()
+        elements = show.media_import_batch(
+            paths, max_workers=2, progress=lambda *args: reports.append(args)
+        )
+        assert isinstance(elements[0], viewcontrol.show.StillElement)
+        assert isinstance(elements[1], viewcontrol.show.VideoElement)
+        assert elements[1].duration
+        assert elements[0].name != elements[2].name
+        assert elements[0].file_path == elements[2].file_path  # same source
+        assert elements[3] is None
+        assert sorted(report[0] for report in reports) == [1, 2, 3, 4]
+        for element in elements[:3]:
+            assert element.id is not None
+            assert os.path.exists(element.file_path)
+        assert not project_folder.joinpath("missing_w.jpg").exists()
+
+    def test_1008_media_store_garbage(self, show, project_folder, source_data):
+        source = scr_media(source_data, "Big_Buck_Bunny_1080p_Opening_Screen.png")
+        digest = viewcontrol.util.media.file_hash(source)
+        show._media_store.recount()
+        entry = show._media_store._entry(
+            viewcontrol.util.media.store_key(digest, "still", "_c")
+        )
+        assert entry.refcount == 2  # both elements of test_1007
+        clip = scr_media(source_data, "Big_Buck_Bunny_1080p_clip2.avi")
+        assert show._media_store.probe_get(viewcontrol.util.media.file_hash(clip))
+        # files written without an element using them
+        path = scr_media(source_data, "viewcontrol.png")
+        ingest = viewcontrol.show.StillElement.ingest(path)
+        assert viewcontrol.show.StillElement.ingest(path) == ingest
+        assert project_folder.joinpath(ingest.file_path_w).exists()
+        removed = show.media_collect_garbage()
+        assert sorted(removed) == sorted(ingest[:2])
+        assert not project_folder.joinpath(ingest.file_path_w).exists()
+        assert not show.media_collect_garbage()
+
+    def test_1009_text_render_cache(self, show, project_folder):
+        assert show.show_new("texts")
+        show.module_add_text("same1", "same text", 1)
+        show.module_add_text("same2", "same text", 1)
+        same1 = show._module_get_with_name("~same1").media_element
+        same2 = show._module_get_with_name("~same2").media_element
+        assert os.path.samefile(same1.file_path, same2.file_path)
+        cache = project_folder.joinpath(viewcontrol.show.TextElement.cache_folder)
+        assert cache.joinpath(same1._render_key + ".jpg").exists()
+        assert not show.text_elements_render_all()  # nothing stale
+
+        viewcontrol.show.TextElement.set_font(font_size=80)
+        try:
+            assert same1.stale
+            rendered = show.text_elements_render_all(max_workers=2)
+            assert same1 in rendered and same2 in rendered
+            assert not same1.stale
+            assert os.path.samefile(same1.file_path, same2.file_path)
+        finally:
+            viewcontrol.show.TextElement.set_font()
+        assert len(show.text_elements_render_all()) == len(rendered)
+
+    def test_1010_slides(self, show, project_folder, source_data):
+        assert show.show_new("slides")
+        pdf = scr_media(source_data, "bbb_poster.pdf")
+        # bbb_poster.pdf has a single page, more pages are made up without load
+        skip = viewcontrol.show.MediaElement._skip_high_workload_functions
+        pages = 3 if skip else 1
+        assert show.module_add_slides("deck", pdf, 5, pages=range(pages), max_workers=2)
+        assert [module.name for module in show.playlist] == [
+            f"deck_{page + 1}" for page in range(pages)
+        ]
+        assert project_folder.joinpath("bbb_poster_p1_w.jpg").exists()
+        assert project_folder.joinpath("bbb_poster_p1_c.jpg").exists()
+        # pages in the media store are referenced
+        assert show.module_add_slides("copy", pdf, 5, pages=[0], pos=1)
+        assert show.playlist[1].name == "copy_1"
+        assert show.playlist[1].media_element.file_path == (
+            show.playlist[0].media_element.file_path
+        )
+
+    def test_1011_upcoming(self, show):
+        assert show.show_load("playback")
+        names = [item.module.name for item in show.items_upcoming(6)]
+        assert names == ["~pb1", "~pb1", "~pb1", "~pb2", "~pb3"]
+        assert show.next().name == "~pb1"
+        show.notify(show._module_get_with_name("#pb jump").logic_element)
+        assert [item.module.name for item in show.items_upcoming(2)] == ["~pb3"]
+        assert show.next().name == "~pb3"  # jump not consumed by items_upcoming
+
+    def test_1012_tracks(self, show):
+        assert show.show_load("playback")
+        element = viewcontrol.show.TextElement("pb0 right", text="pb0 right")
+        assert show.module_track_set(0, 2, element)
+        item = show.item_current
+        assert item.tracks == {2: element.file_path}
+        assert item.file_path != element.file_path
+
+        assert show.show_load("playback", detach=True)
+        module = show.playlist[0]
+        assert module not in show.connected_datbase
+        assert module.tracks[2].name == element.name
+        assert show.item_current.tracks == {2: element.file_path}
+        assert module.copy().tracks == module.tracks
+
+        assert show.show_load("playback")
+        assert show.module_track_remove(0, 2)
+        assert not show.module_track_remove(0, 2)
+        assert show.item_current.tracks == dict()
+
+    def test_1013_item_current_position(self, show):
+        with pytest.raises(Exception, match="no show loaded"):
+            show.item_current
+        assert show.show_load("playback")
+        show._current_pos = len(show.playlist)
+        with pytest.raises(Exception, match="does not exist"):
+            show.item_current
+
+
+def test_schema_upgrade(tmp_path, project_folder):
+    """a project created before the text of text elements was stored"""
+    connection = sqlite3.connect(str(tmp_path.joinpath("vcproject.db3")))
+    connection.execute(
+        "CREATE TABLE media_element (id INTEGER NOT NULL, name VARCHAR(20), "
+        "file_path_w VARCHAR(200), file_path_c VARCHAR(200), etype VARCHAR(10), "
+        "duration INTEGER, PRIMARY KEY (id), UNIQUE (name))"
+    )
+    connection.execute(
+        "INSERT INTO media_element (name, file_path_w, file_path_c, etype) "
+        "VALUES ('~old', '_old.jpg', '_old.jpg', 'TextElement')"
+    )
+    connection.commit()
+    connection.close()
+    tmp_path.joinpath("_old.jpg").write_bytes(b"image")
+    try:
+        show = viewcontrol.Show(tmp_path)
+        element = show._mm.element_get_with_name("~old")
+        assert element.text is None and not element.stale
+        element.render()  # text unknown, the image is kept
+        assert tmp_path.joinpath("_old.jpg").read_bytes() == b"image"
+        assert show.text_elements_render_all() == []
+        assert show.show_new("upgraded")
+        assert show.module_add_text("new", "new", 1)
+        assert show._mm.element_get_with_name("~new").text == "new"
+    finally:
+        viewcontrol.show.MediaElement.set_project_path(str(project_folder))
@@ -0,0 +1,85 @@
+import multiprocessing
+import pickle
+import threading
+
+import pytest
+
+from viewcontrol.playback import statusblock
+from viewcontrol.playback.statusblock import StatusBlock, shared_memory
+
+LENGTH = 100.0
+
+
+def write_loop(block, count):
+    """write consistent pairs of time-pos and time-remaining"""
+    for i in range(count):
+        block.write(time_pos=i / 100, time_remaining=LENGTH - i / 100, playlist_pos=i)
+
+
+@pytest.fixture(params=["shared", "array", "local"])
+def block(request, monkeypatch):
+    if request.param == "shared" and not shared_memory:
+        pytest.skip("multiprocessing.shared_memory requires python 3.8")
+    if request.param == "array":
+        monkeypatch.setattr(statusblock, "shared_memory", None)  # python < 3.8
+    block = StatusBlock(shared=request.param != "local")
+    yield block
+    block.close()
+
+
+def test_read_write(block):
+    status = block.read()
+    assert status.time_pos is None and status.playlist_pos is None
+    assert not status.paused
+    block.write(time_pos=1.5, playlist_pos=2)
+    block.write(paused=True)
+    status = block.read()
+    assert (status.time_pos, status.time_remaining) == (1.5, None)
+    assert status.playlist_pos == 2 and status.paused
+    assert status.sequence == 3
+
+
+def test_pickle(block):
+    if not block.is_shared:
+        with pytest.raises(TypeError):
+            pickle.dumps(block)
+        return
+    if block.name is None:
+        # a RawArray is passed only to a process started with it
+        with pytest.raises(pickle.PicklingError):
+            pickle.dumps(block)
+        writer = multiprocessing.get_context("spawn").Process(
+            target=write_loop, args=(block, 10)
+        )
+        writer.start()
+        writer.join()
+        assert block.read().playlist_pos == 9
+        return
+    attached = pickle.loads(pickle.dumps(block))
+    try:
+        attached.write(time_pos=3.0)
+        assert block.read().time_pos == 3.0
+    finally:
+        attached.close()
+    assert block.read().time_pos == 3.0  # attached block does not remove it
+
+
+def test_no_torn_reads(block):
+    count = 20000
+    if block.is_shared:
+        writer = multiprocessing.get_context("fork").Process(
+            target=write_loop, args=(block, count)
+        )
+    else:
+        writer = threading.Thread(target=write_loop, args=(block, count))
+    writer.start()
+    sequence = 0
+    while writer.is_alive():
+        status = block.read()
+        assert status.sequence >= sequence
+        sequence = status.sequence
+        if status.time_pos is not None:
+            assert status.time_pos + status.time_remaining == pytest.approx(LENGTH)
+            assert status.playlist_pos == round(status.time_pos * 100)
+    writer.join()
+    assert block.read().playlist_pos == count - 1
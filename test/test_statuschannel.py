@@ -0,0 +1,97 @@
+import queue
+import time
+
+import pytest
+from blinker import signal
+
+from viewcontrol.playback.statuschannel import StatusChannel, StatusPublisher
+
+
+def play(publisher, duration, fps=200, length=None):
+    """report position and remaining time like the player does every frame"""
+    length = length or duration
+    for frame in range(int(duration * fps)):
+        position = frame / fps
+        publisher.update("time-pos", position)
+        publisher.update("time-remaining", length - position)
+        time.sleep(1 / fps)
+
+
+def drain(q):
+    messages = list()
+    while not q.empty():
+        messages.append(q.get())
+    return messages
+
+
+def test_publisher_coalesces():
+    q = queue.Queue()
+    publisher = StatusPublisher(q, rate=10, thresholds=(0.5,))
+    publisher.start()
+    publisher.update("playlist-pos", 1)
+    play(publisher, 1)
+    publisher.stop()
+    messages = drain(q)
+
+    assert messages[0] == ("playlist-pos", 1)
+    remaining = [m for m in messages if m[0] == "remaining"]
+    assert len(remaining) == 1
+    assert remaining[0][1] == 0.5 and remaining[0][2] < 0.5
+    snapshots = [m[1] for m in messages if m[0] == "status"]
+    assert 3 <= len(snapshots) <= 15
+    assert snapshots[-1]["time-remaining"] == pytest.approx(1 / 200)
+    assert publisher.sent == len(messages)
+    assert publisher.updates > 20 * publisher.sent
+
+
+def test_publisher_thresholds_rearmed():
+    q = queue.Queue()
+    publisher = StatusPublisher(q, thresholds=(1,))
+    publisher.add_threshold(0.5)
+    for remaining in (2, 0.9, 0.4, 0.3, 1.5, 0.8):  # seek back to 1.5
+        publisher.update("time-remaining", remaining)
+    publisher.update("playlist-pos", 2)
+    publisher.update("time-remaining", 0.2)
+    publisher.update("time-remaining", 0.2)  # unchanged, not counted as change
+    assert drain(q) == [
+        ("remaining", 1.0, 0.9),
+        ("remaining", 0.5, 0.4),
+        ("remaining", 1.0, 0.8),
+        ("playlist-pos", 2),
+        ("remaining", 1.0, 0.2),
+        ("remaining", 0.5, 0.2),
+    ]
+    publisher.flush()
+    publisher.flush()  # nothing changed
+    assert drain(q) == [("status", {"time-remaining": 0.2, "playlist-pos": 2})]
+
+
+def test_channel_dispatch():
+    q_recv, q_control = queue.Queue(), queue.Queue()
+    channel = StatusChannel(q_recv, q_control)
+    received = queue.Queue()
+    channel.subscribe("playlist-pos", lambda value: received.put(("pos", value)))
+    channel.subscribe_threshold(1, lambda value: received.put(("remaining", value)))
+    assert q_control.queue[0] == ("threshold", 1.0)
+
+    def receiver(sender, snapshot):
+        received.put(("status", snapshot))
+
+    signal("mpv_status").connect(receiver, sender=channel)
+    publisher = StatusPublisher(q_recv)
+    publisher.add_threshold(q_control.get_nowait()[1])  # as done by the player
+    channel.start()
+    try:
+        publisher.update("playlist-pos", 1)
+        publisher.update("time-remaining", 0.5)
+        publisher.flush()
+        assert received.get(timeout=1) == ("pos", 1)
+        assert received.get(timeout=1) == ("remaining", 0.5)
+        assert received.get(timeout=1) == (
+            "status",
+            {"playlist-pos": 1, "time-remaining": 0.5},
+        )
+    finally:
+        channel.stop()
+    assert channel.received == 3
+    assert channel.status == {"playlist-pos": 1, "time-remaining": 0.5}
@@ -1,9 +1,23 @@
 import collections
+import hashlib
+import inspect
+import threading
 import time
+import timeit
+
+import numpy
+import pytest
 
 from viewcontrol.util.timing import PausableRepeatedTimer
 from viewcontrol.util.timing import RepeatedTimer
 from viewcontrol.util.timing import PausableTimer
+from viewcontrol.util.timing import TimerGroup
+from viewcontrol.util.timing import JitterHistogram
+from viewcontrol.util.timing import TimerRegistry
+from viewcontrol.util.timing import TimerScheduler
+from viewcontrol.util.media import content_aspect_ratio, file_hash, letterbox
+from viewcontrol.util.media import keyframe_luminance, transcode
+from .benchmark.bench_aspect import make_clip
 
 callback_stack = list()
 
@@ -95,3 +109,197 @@ def test_timer_renewable_only():
     print(runtime)
     assert runtime < 3.000
     assert runtime > 2.996
+
+
+def test_scheduler_single_thread():
+    fired = list()
+    threads_before = threading.active_count()
+    timers = [
+        PausableTimer(0.1 + i * 0.001, fired.append, i, group=TimerGroup())
+        for i in range(200)
+    ]
+    for timer in timers:
+        timer.start()
+    assert threading.active_count() <= threads_before + 1
+    timers[-1].join()
+    assert fired == list(range(200))
+
+
+def test_timer_group_pause():
+    group = TimerGroup()
+    repeated = PausableRepeatedTimer(
+        0.1, RepeatedTimer.do_nothing, cycles=4, group=group
+    )
+    timer = PausableTimer(0.5, RepeatedTimer.do_nothing, group=group)
+    single = PausableTimer(0.5, RepeatedTimer.do_nothing, group=group)
+    t_start = time.perf_counter()
+    for t in (repeated, timer, single):
+        t.start()
+    single.pause()
+    time.sleep(0.2)
+    group.pause()
+    assert group.is_paused
+    time.sleep(0.5)
+    assert repeated.is_running and timer.is_running
+    group.resume()
+    repeated.join()
+    assert 0.899 < time.perf_counter() - t_start < 0.91
+    timer.join()
+    runtime = time.perf_counter() - t_start
+    print(runtime)
+    assert 0.999 < runtime < 1.01
+    assert single.is_paused  # not resumed with the group
+    single.cancel()
+
+
+def compose_and_call_inspect(timer, func):
+    """binding of handler arguments on every call, as before compiling it"""
+    cur_arg = 0
+    args = list()
+    kwargs = dict()
+    for param in inspect.signature(func).parameters.values():
+        if param.kind in (param.VAR_POSITIONAL, param.VAR_KEYWORD):
+            pass
+        elif param.kind == param.KEYWORD_ONLY or param.default is not param.empty:
+            if param.name in timer.self_attr:
+                kwargs[param.name] = getattr(timer, param.name)
+            elif param.name in timer._kwargs.keys():
+                kwargs[param.name] = timer._kwargs[param.name]
+        else:
+            if param.name in timer.self_attr:
+                args.append(getattr(timer, param.name))
+            elif param.name in timer._kwargs.keys():
+                args.append(timer._kwargs.get(param.name))
+            else:
+                args.append(timer._args[cur_arg])
+                cur_arg += 1
+    func(*args, **kwargs)
+
+
+def _still_handler(runtime_cycle, time_left_cycle):
+    """signature of the still image handler of MpvProcess"""
+    pass
+
+
+def test_timer_compiled_call_overhead():
+    ticks = 20000
+    timers = [
+        PausableRepeatedTimer(10, _still_handler, cycles=100),
+        PausableRepeatedTimer(
+            10, _print_cycles, "custom_arg", custom_kwarg2="custom_kwarg2"
+        ),
+    ]
+    callback_stack.clear()
+    for timer in timers:
+        timer.start()
+        func = timer.handler_repeat
+        before = timeit.timeit(
+            lambda: compose_and_call_inspect(timer, func), number=ticks
+        )
+        after = timeit.timeit(lambda: timer._compose_and_call(func), number=ticks)
+        print(
+            f"{func.__name__}: {before / ticks * 1e6:.2f}us -> "
+            f"{after / ticks * 1e6:.2f}us per tick"
+        )
+        assert after < before
+        timer.cancel()
+    assert {args.custom_arg for args in callback_stack} == {"custom_arg"}
+    assert {args.custom_kwarg2 for args in callback_stack} == {"custom_kwarg2"}
+
+
+def test_timer_self_attr_pausable():
+    def handler(is_paused, cycles_left):
+        callback_stack.append((is_paused, cycles_left))
+
+    callback_stack.clear()
+    timer = PausableTimer(0.01, handler)
+    timer.start()
+    timer.join()
+    assert callback_stack == [(False, 0)]
+
+
+def test_timer_jitter_histogram():
+    histogram = JitterHistogram(bounds=[0.001, 0.01])
+    assert histogram.percentile(50) is None
+    for delay in (0.0005, 0.0005, 0.005, 0.02):
+        histogram.record(delay)
+    assert histogram.counts == [2, 1, 1]
+    assert histogram.percentile(50) == 0.001
+    assert histogram.percentile(75) == 0.01
+    assert histogram.percentile(100) == 0.02
+    assert histogram.snapshot()["buckets"] == {"1": 2, "10": 1, "inf": 1}
+
+    jitter = TimerScheduler.default().jitter
+    count = jitter.count
+    timer = RepeatedTimer(0.01, RepeatedTimer.do_nothing, cycles=10)
+    timer.start()
+    timer.join()
+    assert jitter.count >= count + 10
+    print(jitter.snapshot())
+    assert jitter.percentile(50) <= 0.002
+
+
+def test_timer_registry():
+    registry = TimerRegistry()
+    fired = list()
+    for i in range(3):
+        registry.start("a", 0.05, fired.append, ("a", i))
+    registry.start("b", 0.05, fired.append, ("b", 0))
+    registry.start("b", 0.3, fired.append, ("b", 1))
+    assert registry.pending() == 5 and registry.pending("a") == 3
+    assert registry.cancel("a") == 3
+    assert registry.cancel("a") == 0
+    time.sleep(0.1)
+    assert fired == [("b", 0)]
+    assert registry.counts() == {"pending": 1, "fired": 1, "cancelled": 3}
+    registry.pause()
+    time.sleep(0.3)
+    assert registry.pending("b") == 1
+    registry.resume()
+    time.sleep(0.25)
+    assert fired == [("b", 0), ("b", 1)]
+    assert registry.counts() == {"pending": 0, "fired": 2, "cancelled": 3}
+    assert not registry._pending  # finished timers are not kept
+
+
+def test_file_hash(tmp_path):
+    path = tmp_path.joinpath("source")
+    content = bytes(range(256)) * 1000
+    path.write_bytes(content)
+    digest = hashlib.sha256(content).hexdigest()
+    assert file_hash(str(path)) == digest
+    assert file_hash(str(path), chunk_size=1000) == digest  # chunk boundaries
+    path.write_bytes(b"")
+    assert file_hash(str(path)) == hashlib.sha256().hexdigest()
+
+
+def test_letterbox():
+    frames = numpy.zeros((3, 90, 160), numpy.uint8)
+    assert letterbox(frames) == (0, 0)
+    frames[0, 30:40] = 200  # dark scene in the other samples
+    frames[1, 12:78] = 100
+    assert letterbox(frames) == pytest.approx((12 / 90, 12 / 90))
+
+
+@pytest.mark.parametrize("aspect", ["16:9", "21:9"])
+def test_content_aspect_ratio(tmp_path, aspect):
+    path = make_clip(str(tmp_path.joinpath("clip.mp4")), 640, 360, 4, aspect == "21:9")
+    assert content_aspect_ratio(path, 0, 4, samples=4) == aspect
+
+
+def test_transcode_versions(tmp_path):
+    source = make_clip(str(tmp_path.joinpath("source.mp4")), 320, 180, 2, False)
+    outputs = [
+        (
+            str(tmp_path.joinpath("c.mp4")),
+            "scale=-2:90,pad=320:180:(ow-iw)/2:(oh-ih)/2",
+        ),
+        (str(tmp_path.joinpath("w.mp4")), None),
+    ]
+    wall, cpu = transcode(source, outputs, t_start=0.5, t_end=1.5)
+    assert wall > 0 and cpu >= 0
+    for path, filters in outputs:
+        frames = keyframe_luminance(path, [0.5])
+        assert frames.shape == (1, 90, 160)
+        top, bottom = letterbox(frames)
+        assert (top > 0.2 and bottom > 0.2) == bool(filters)
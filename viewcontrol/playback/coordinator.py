@@ -0,0 +1,184 @@
+import logging
+import threading
+import time
+from enum import Enum
+
+from blinker import signal
+
+
+class PlaybackState(Enum):
+    idle = 0
+    """current item is playing, next item not yet appended to player"""
+    prefetching = 1
+    """next item is requested to be appended to player"""
+    appended = 2
+    """next item is appended to player, waiting for player to switch to it"""
+    switching = 3
+    """player switched to next item, its commands have to be send"""
+
+
+class PlaybackCoordinator:
+    """State machine synchronizing the show with the playlist of the player.
+
+    Replaces the handshake of threading.Event objects between the main loop of
+    ViewControl and the blinker subscribers of the player status. The subscribers
+    only report what happened (``time_remaining``, ``playlist_switched``), the main
+    loop blocks in ``wait`` on a condition variable until it has something to do
+    and reports back when done (``appended``, ``switched``). No method spins.
+
+    Transitions::
+
+        idle --time_remaining < prefetch_time, prefetch or skip--> prefetching
+        prefetching --appended--> appended
+        appended or idle --playlist_switched--> switching
+        switching --switched--> idle
+        prefetching --appended, switch pending--> switching
+        switching --switched, switch pending--> switching
+
+    Several items can be appended to the player in advance, so the player may
+    switch while the main loop is busy (prefetching or switching). Such a switch
+    is counted as pending and handled as soon as the main loop reports back, no
+    switch is lost.
+
+    Every transition is logged and send with the blinker signal "playback_state"
+    (keyword arguments: state, previous, duration), where duration is the time in
+    seconds spend in the previous state. Count, total and maximum duration per
+    transition are collected in ``transitions``.
+
+    Args:
+        prefetch_time (float, optional): remaining play time of the current item in
+            seconds below which the next item is appended to the player. Defaults
+            to 1.
+        state (PlaybackState, optional): initial state. Defaults to
+            PlaybackState.appended, the first item is appended to the player
+            before playback starts.
+
+    """
+
+    def __init__(self, prefetch_time=1, state=PlaybackState.appended):
+        self.prefetch_time = prefetch_time
+        self.transitions = dict()
+        """dict: (previous, state):[count, total, maximum] of the durations"""
+        self.signal = signal("playback_state")
+        self.logger = logging.getLogger("playback_coordinator")
+        self._condition = threading.Condition()
+        self._state = state
+        self._since = time.perf_counter()
+        self._pending = 0
+        """int: switches of the player not yet handled by the main loop"""
+
+    @property
+    def state(self):
+        return self._state
+
+    def _transition(self, state):
+        """change state, must be called with condition acquired"""
+        now = time.perf_counter()
+        previous, duration = self._state, now - self._since
+        self._state, self._since = state, now
+        stats = self.transitions.setdefault((previous, state), [0, 0.0, 0.0])
+        stats[0] += 1
+        stats[1] += duration
+        stats[2] = max(stats[2], duration)
+        self._condition.notify_all()
+        self.logger.debug(
+            f"{previous.name} -> {state.name} after {duration * 1000:.1f}ms"
+        )
+        self.signal.send(self, state=state, previous=previous, duration=duration)
+
+    def _transition_from(self, previous, state):
+        with self._condition:
+            if self._state is not previous:
+                return False
+            if self._pending and previous is not PlaybackState.idle:
+                # main loop reported back, handle the switch it missed
+                self._pending -= 1
+                state = PlaybackState.switching
+            self._transition(state)
+            return True
+
+    def wait(self, *states, timeout=None):
+        """block until the coordinator is in one of the given states
+
+        Returns:
+            PlaybackState: current state or None if timeout expired.
+
+        """
+        with self._condition:
+            if self._condition.wait_for(lambda: self._state in states, timeout):
+                return self._state
+            return None
+
+    def time_remaining(self, remaining_time):
+        """report remaining play time of the current item (player status)
+
+        Returns:
+            bool: True if prefetching of the next item was requested.
+
+        """
+        if remaining_time is None or remaining_time >= self.prefetch_time:
+            return False
+        return self._transition_from(PlaybackState.idle, PlaybackState.prefetching)
+
+    def prefetch(self):
+        """request appending the next items at once (main loop, window not full)
+
+        Returns:
+            bool: True if prefetching was requested.
+
+        """
+        return self._transition_from(PlaybackState.idle, PlaybackState.prefetching)
+
+    @property
+    def pending(self):
+        """int: switches of the player not yet handled by the main loop"""
+        return self._pending
+
+    def playlist_switched(self):
+        """report change of the playlist position of the player (player status)
+
+        Returns:
+            bool: True if the switch is handled at once, False if it is pending
+                until the main loop reports back (appended or switched).
+
+        """
+        with self._condition:
+            if self._state in (PlaybackState.appended, PlaybackState.idle):
+                self._transition(PlaybackState.switching)
+                return True
+            self._pending += 1
+            return False
+
+    def appended(self):
+        """report that the next item was appended to the player (main loop)"""
+        return self._transition_from(PlaybackState.prefetching, PlaybackState.appended)
+
+    def switched(self):
+        """report that the commands of the new item were send (main loop)"""
+        return self._transition_from(PlaybackState.switching, PlaybackState.idle)
+
+    def skip(self, timeout=None):
+        """request the next item at once and block until it is appended
+
+        Waits for a running switch to finish, requests prefetching if the next item
+        is not yet appended and waits until it is.
+
+        Returns:
+            bool: True if the next item is appended, False if timeout expired.
+
+        """
+        deadline = None if timeout is None else time.perf_counter() + timeout
+
+        def remaining():
+            return None if deadline is None else max(0, deadline - time.perf_counter())
+
+        with self._condition:
+            if not self._condition.wait_for(
+                lambda: self._state is not PlaybackState.switching, remaining()
+            ):
+                return False
+            if self._state is PlaybackState.idle:
+                self._transition(PlaybackState.prefetching)
+            return self._condition.wait_for(
+                lambda: self._state is not PlaybackState.prefetching, remaining()
+            )
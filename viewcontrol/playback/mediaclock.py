@@ -0,0 +1,206 @@
+import heapq
+import itertools
+import logging
+import threading
+import time
+
+from blinker import signal
+
+from viewcontrol.util.timing import JitterHistogram
+
+
+class MediaClock:
+    """Position in the currently played media, interpolated between updates.
+
+    The player reports its position (mpv property time-pos) only every few
+    frames. In between, the position is extrapolated with the system clock while
+    playing and stands still while paused. A reported position differing more
+    than seek_threshold from the interpolated one is taken as a seek.
+
+    Args:
+        seek_threshold (float, optional): difference in seconds between reported
+            and interpolated position detected as seek. Defaults to 0.5.
+
+    """
+
+    def __init__(self, seek_threshold=0.5):
+        self.seek_threshold = seek_threshold
+        self._position = 0.0
+        self._updated = time.perf_counter()
+        self._paused = False
+
+    @property
+    def is_paused(self):
+        return self._paused
+
+    def position(self, now=None):
+        """interpolated position in seconds"""
+        if self._paused:
+            return self._position
+        if now is None:
+            now = time.perf_counter()
+        return self._position + now - self._updated
+
+    def update(self, position, now=None):
+        """set position reported by the player
+
+        Returns:
+            bool: True if the update was detected as seek.
+
+        """
+        if now is None:
+            now = time.perf_counter()
+        seek = abs(position - self.position(now)) > self.seek_threshold
+        self._position, self._updated = position, now
+        return seek
+
+    def reset(self, position=0.0):
+        """set position at start of a new media"""
+        self._position, self._updated = position, time.perf_counter()
+
+    def pause(self):
+        if not self._paused:
+            self._position = self.position()
+            self._paused = True
+
+    def resume(self):
+        if self._paused:
+            self._updated = time.perf_counter()
+            self._paused = False
+
+
+class CueScheduler:
+    """Fires commands at positions of the media clock instead of after a delay.
+
+    The cues of the current media are loaded at the start of its playback. A
+    thread waits on a condition variable until the interpolated position of the
+    MediaClock reaches the next cue; every position update of the player wakes
+    it to correct the waiting time. Pausing the clock holds all cues. After a
+    seek, the cues at or after the new position are armed again, so cues are
+    fired again after seeking back and skipped when seeking over them.
+
+    The player reports the position of the previous media until the new one is
+    opened. After loading, reported positions are therefore ignored until the
+    first one at most the seek threshold of the clock after the start position.
+
+    The cue error (clock position at firing minus the position of the cue) of
+    every fired cue is logged, send with the blinker signal "cue_fired"
+    (keyword arguments: cue, position, error) and its absolute value counted in
+    ``errors``.
+
+    Args:
+        fire (function): called with the cue (any object) in the thread of the
+            scheduler when its position is reached.
+        clock (MediaClock, optional): clock of the played media. Defaults to a new
+            MediaClock.
+
+    """
+
+    def __init__(self, fire, clock=None):
+        self.fire = fire
+        self.clock = clock or MediaClock()
+        self.errors = JitterHistogram()
+        """JitterHistogram: absolute cue errors of the fired cues"""
+        self.signal = signal("cue_fired")
+        self.logger = logging.getLogger("cue_scheduler")
+        self._condition = threading.Condition()
+        self._loaded = list()
+        self._cues = list()
+        self._start = None
+        """float: start position of the loaded media until the player reports it"""
+        self._sequence = itertools.count()
+        self._stopped = False
+        self._thread = threading.Thread(
+            target=self._run, name="cue_scheduler", daemon=True
+        )
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        with self._condition:
+            self._stopped = True
+            self._condition.notify()
+        self._thread.join()
+
+    def load(self, cues, position=0.0):
+        """replace the cues by the cues of a new media starting at position
+
+        Args:
+            cues (iterable): (position in seconds, cue) of the cues
+            position (float, optional): start position of the new media.
+                Defaults to 0.
+
+        """
+        with self._condition:
+            self._loaded = [(t, next(self._sequence), cue) for t, cue in cues]
+            self.clock.reset(position)
+            self._start = position
+            self._arm(position)
+
+    def clear(self):
+        """drop all cues of the current media"""
+        self.load(())
+
+    def time_pos(self, position):
+        """report the position of the player in the current media"""
+        if position is None:
+            return
+        with self._condition:
+            if self._start is not None:
+                if position - self._start > self.clock.seek_threshold:
+                    return  # position of the previous media
+                self._start = None
+            if self.clock.update(position):
+                self.logger.debug(f"seek to {position:.3f}s")
+                self._arm(position)
+            self._condition.notify()
+
+    def pause(self):
+        with self._condition:
+            self.clock.pause()
+            self._condition.notify()
+
+    def resume(self):
+        with self._condition:
+            self.clock.resume()
+            self._condition.notify()
+
+    @property
+    def pending(self):
+        """number of cues not fired yet"""
+        return len(self._cues)
+
+    def _arm(self, position):
+        """arm all cues at or after position, must be called with condition"""
+        self._cues = [entry for entry in self._loaded if entry[0] >= position]
+        heapq.heapify(self._cues)
+        self._condition.notify()
+
+    def _run(self):
+        with self._condition:
+            while not self._stopped:
+                if not self._cues or self.clock.is_paused:
+                    self._condition.wait()
+                    continue
+                wait = self._cues[0][0] - self.clock.position()
+                if wait > 0:
+                    self._condition.wait(wait)
+                    continue
+                cue_time, _, cue = heapq.heappop(self._cues)
+                position = self.clock.position()
+                self._condition.release()
+                try:
+                    self._fire(cue, cue_time, position)
+                finally:
+                    self._condition.acquire()
+
+    def _fire(self, cue, cue_time, position):
+        error = position - cue_time
+        self.errors.record(abs(error))
+        self.logger.debug(f"cue at {cue_time:.3f}s fired, error {error * 1000:.1f}ms")
+        self.signal.send(self, cue=cue, position=position, error=error)
+        try:
+            self.fire(cue)
+        except Exception as ex:
+            self.logger.error(f"error firing cue {cue}", exc_info=ex)
@@ -0,0 +1,68 @@
+import collections
+import threading
+
+from viewcontrol.util.timing import JitterHistogram
+
+
+class SkewMeter:
+    """Skew between several outputs switching to the same playlist entry.
+
+    Every output reports the time it restarted playback with an entry (mpv event
+    playback-restart after a scheduled switch, see MpvProcess) together with the
+    absolute index of the entry. The times are taken with time.monotonic() in the
+    process of the output, a clock shared by all processes of the machine. Once
+    all outputs reported an entry, its skew is the time between the first and the
+    last output showing it and is counted in ``skews``.
+
+    Entries not reported by all outputs (e.g. an output restarted its playlist)
+    are discarded when more than ``pending`` entries are incomplete.
+
+    Args:
+        outputs (int): number of outputs
+        tolerance (float, optional): skew in seconds above which a switch is
+            counted in ``late``. Defaults to 0.04, two frames at 50 Hz.
+        pending (int, optional): incomplete entries kept. Defaults to 16.
+
+    """
+
+    skew_bounds = (0.001, 0.002, 0.005, 0.01, 0.02, 0.04, 0.08, 0.16, 0.32)
+    """tuple: upper bounds of the buckets of the skews in seconds"""
+
+    def __init__(self, outputs, tolerance=0.04, pending=16):
+        self.outputs = outputs
+        self.tolerance = tolerance
+        self.pending = pending
+        self.skews = JitterHistogram(self.skew_bounds)
+        """JitterHistogram: skews in seconds"""
+        self.late = 0
+        """int: switches with a skew above tolerance"""
+        self._lock = threading.Lock()
+        self._switches = collections.OrderedDict()
+        """OrderedDict: absolute index:{output:time} of the incomplete entries"""
+
+    def switched(self, output, index, when):
+        """output restarted playback with the entry with absolute index at when
+
+        Returns:
+            float or None: skew of the entry in seconds, None if not all outputs
+                reported it yet.
+
+        """
+        with self._lock:
+            times = self._switches.setdefault(index, dict())
+            times[output] = when
+            if len(times) < self.outputs:
+                while len(self._switches) > self.pending:
+                    self._switches.popitem(last=False)
+                return None
+            del self._switches[index]
+        skew = max(times.values()) - min(times.values())
+        self.skews.record(skew)
+        if skew > self.tolerance:
+            self.late += 1
+        return skew
+
+    def reset(self):
+        """discard the incomplete entries, e.g. after the playlists were reset"""
+        with self._lock:
+            self._switches.clear()
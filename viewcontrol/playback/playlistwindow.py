@@ -0,0 +1,132 @@
+import time
+
+from viewcontrol.util.timing import JitterHistogram
+
+
+class PlaylistWindow:
+    """Bookkeeping of the bounded playlist of the player.
+
+    The player keeps only ``keep_played`` played entries before the current one,
+    older entries are removed from the front of its playlist. Removing them shifts
+    the index (mpv property playlist-pos) of all other entries, so every entry is
+    identified by its absolute index instead: the number of entries appended
+    before it since the playlist was reset, the start image being 0. The absolute
+    index of an entry is its index in the playlist of the player plus ``offset``,
+    the number of entries removed from the front.
+
+    The display duration of stills is kept per entry, so it is known when the
+    player switches to the entry, regardless of how many entries were appended
+    after it.
+
+    The transition gap is the time from the change of the playlist position until
+    the player restarted playback with the new entry (mpv event playback-restart),
+    i.e. opened and demuxed the file. The gaps are counted in ``gaps``.
+
+    Args:
+        keep_played (int, optional): played entries kept before the current one.
+            Defaults to 2.
+
+    """
+
+    gap_bounds = (0.005, 0.01, 0.02, 0.04, 0.08, 0.16, 0.32, 0.64, 1.28)
+    """tuple: upper bounds of the buckets of the gaps in seconds"""
+
+    def __init__(self, keep_played=2):
+        self.keep_played = keep_played
+        self.gaps = JitterHistogram(self.gap_bounds)
+        """JitterHistogram: transition gaps in seconds"""
+        self.reset()
+
+    def reset(self):
+        """playlist of the player replaced by the start image"""
+        self.offset = 0
+        self.length = 1
+        self._durations = dict()
+        """dict: absolute index:display duration in seconds of the stills"""
+        self._switched = None
+
+    def append(self, duration=None):
+        """entry appended to the playlist of the player
+
+        Args:
+            duration (float, optional): display duration of a still. Defaults to
+                None, media with own duration.
+
+        Returns:
+            int: absolute index of the entry
+
+        """
+        index = self.offset + self.length
+        self.length += 1
+        if duration:
+            self._durations[index] = duration
+        return index
+
+    def position(self, pos):
+        """absolute index of the entry at pos in the playlist of the player"""
+        return None if pos is None else pos + self.offset
+
+    def switched(self, index, now=None):
+        """player switched to the entry with absolute index
+
+        Returns:
+            float or None: display duration of the entry, None if no still
+
+        """
+        self._switched = time.perf_counter() if now is None else now
+        return self._durations.pop(index, None)
+
+    def started(self, now=None):
+        """player restarted playback (mpv event playback-restart)
+
+        Returns:
+            float or None: transition gap in seconds or None if the playback was
+                not restarted after a switch (e.g. after a seek).
+
+        """
+        if self._switched is None:
+            return None
+        gap = (time.perf_counter() if now is None else now) - self._switched
+        self._switched = None
+        self.gaps.record(gap)
+        return gap
+
+    def trim(self, pos):
+        """played entries to be removed from the front of the playlist
+
+        The entries are counted as removed, the caller must remove them.
+
+        Args:
+            pos (int): current position in the playlist of the player
+
+        Returns:
+            int: number of entries to remove at index 0
+
+        """
+        count = max(0, pos - self.keep_played)
+        self.offset += count
+        self.length -= count
+        for index in [i for i in self._durations if i < self.offset]:
+            del self._durations[index]
+        return count
+
+    def drop(self, pos, index):
+        """upcoming entries after absolute index to be removed from the playlist
+
+        Entries at or before the current position are never removed. The entries
+        are counted as removed, the caller must remove them.
+
+        Args:
+            pos (int): current position in the playlist of the player
+            index (int): absolute index of the last entry to keep
+
+        Returns:
+            list<int>: positions to remove, highest first
+
+        """
+        first = max(pos, index - self.offset) + 1
+        positions = list(range(self.length - 1, first - 1, -1))
+        for position in positions:
+            self._durations.pop(position + self.offset, None)
+        self.length -= len(positions)
+        return positions
@@ -5,19 +5,32 @@ import os
 import pathlib
 import queue
 import threading
+import time
 
 import mpv
 
-from viewcontrol.util.timing import PausableRepeatedTimer
+from viewcontrol.playback.playlistwindow import PlaylistWindow
+from viewcontrol.playback.statuschannel import StatusPublisher
+from viewcontrol.util.timing import PausableRepeatedTimer, PausableTimer
 
 
 class ProcessMpv(multiprocessing.Process):
     """Dummy to starting MpvProcess as thread. See MpvProcess for args."""
 
     def __init__(
-        self, logger_config, queue_send, queue_recv, fs_screen_num, stop_event
+        self,
+        queue_send,
+        queue_recv,
+        fs_screen_num,
+        stop_event,
+        logger_config,
+        status_rate=10,
+        status_block=None,
+        synchronized=False,
+        video_output=None,
+        name="ProcessMPV",
     ):
-        super().__init__(name="ProcessMPV")
+        super().__init__(name=name)
         self._dummy = MpvProcess(
             queue_send,
             queue_recv,
@@ -25,6 +38,10 @@ class ProcessMpv(multiprocessing.Process):
             fs_screen_num,
             stop_event,
             logger_config=logger_config,
+            status_rate=status_rate,
+            status_block=status_block,
+            synchronized=synchronized,
+            video_output=video_output,
         )
 
     def run(self):
@@ -35,8 +52,19 @@ class ProcessMpv(multiprocessing.Process):
 class ThreadMpv(threading.Thread):
     """Dummy to starting MpvProcess as thread. See MpvProcess for args."""
 
-    def __init__(self, queue_send, queue_recv, fs_screen_num, stop_event):
-        super().__init__(name="ThreadMpv")
+    def __init__(
+        self,
+        queue_send,
+        queue_recv,
+        fs_screen_num,
+        stop_event,
+        status_rate=10,
+        status_block=None,
+        synchronized=False,
+        video_output=None,
+        name="ThreadMpv",
+    ):
+        super().__init__(name=name)
         self._dummy = MpvProcess(
             queue_send,
             queue_recv,
@@ -44,6 +72,10 @@ class ThreadMpv(threading.Thread):
             fs_screen_num,
             stop_event,
             logger_config=None,
+            status_rate=status_rate,
+            status_block=status_block,
+            synchronized=synchronized,
+            video_output=video_output,
         )
 
     def run(self):
@@ -54,6 +86,28 @@ class ThreadMpv(threading.Thread):
 class MpvProcess:
     """Manages and starts threads of devices and handles communication.
 
+    The status of the player is send over queue_send by a StatusPublisher: a
+    snapshot of the properties status_rate times per second and changes of filename
+    and playlist-pos at once. Besides (filepath, duration) and the strings "pause",
+    "resume" and "next", queue_recv takes the control messages ("threshold",
+    seconds) to notify when the remaining time falls below seconds and ("drop",
+    index) to remove the upcoming entries after the absolute index.
+
+    Several upcoming entries can be appended to the playlist, mpv opens the next
+    one in advance (see cache_options). Played entries are removed from the
+    playlist, so it stays bounded in a show running for days; playlist-pos is
+    send as absolute index (see PlaylistWindow). The transition gap of every
+    switch is logged and send as property "transition-gap".
+
+    Several players on different screens are kept in step with synchronized:
+    a player only switches to the next entry when told so, it holds the last
+    frame of a video and the display of a still at their end. The control message
+    ("switch", deadline, index) switches to the entry with absolute index at
+    time.monotonic() deadline, which is the same clock in every process. When
+    playback restarted after a scheduled switch, (index, time.monotonic()) is send
+    as property "switched" to measure the skew between the players (see
+    outputsync.SkewMeter).
+
     Args:
          queue_send (queue.Queue or multiprocessing.Queue): queue over which
             status messages of player will are send.
@@ -66,9 +120,28 @@ class MpvProcess:
             will stop thread when set.
          logger_config (dict or None): pass a queue logger logger config (only when
             using multiprocessing). Default to None.
+         status_rate (float, optional): snapshots of the player status send per
+            second. Defaults to 10.
+         status_block (StatusBlock, optional): block into which the latest
+            time-pos, time-remaining, playlist-pos and pause state are written.
+            Defaults to None.
+         keep_played (int, optional): played entries kept in the playlist.
+            Defaults to 2.
+         synchronized (bool, optional): switch to the next entry only by control
+            message. Defaults to False.
+         video_output (str, optional): mpv option vo, "null" for playback without
+            display (no audio output either). Defaults to None, the default of mpv.
 
     """
 
+    cache_options = {
+        "cache": "yes",
+        "demuxer-max-bytes": "256MiB",
+        "demuxer-readahead-secs": 20,
+        "prefetch-playlist": "yes",
+    }
+    """dict: mpv options to open and demux the upcoming entries in advance"""
+
     def __init__(
         self,
         queue_send,
@@ -77,21 +150,36 @@ class MpvProcess:
         fs_screen_num,
         stop_event,
         logger_config=None,
+        status_rate=10,
+        status_block=None,
+        keep_played=2,
+        synchronized=False,
+        video_output=None,
     ):
         self.stop_event = stop_event
         self.logger_config = logger_config
         self.queue_send = queue_send
+        self.status_rate = status_rate
+        self.status = None
+        self.status_block = status_block
         self.queue_recv = queue_recv
         self.name = name_thread
         self.fs_screen_num = fs_screen_num
+        self.synchronized = synchronized
+        self.video_output = video_output
 
         self._is_not_paused = threading.Event()
         self._is_not_paused.set()
         self.next_image_display_time_queue = queue.Queue()
 
         self.dummy_timer_running = False
-        self.duration_next = None
         self.still_timer = None
+        self.switch_timer = None
+        self._switch_scheduled = None
+        """int or None: absolute index of the last scheduled switch not started"""
+        self.window = PlaylistWindow(keep_played)
+        self._window_lock = threading.Lock()
+        self._position = None
 
         self.logger = None
         self.player = None
@@ -112,19 +200,36 @@ class MpvProcess:
             self.player["fullscreen"] = True
             self.player["fs-screen"] = self.fs_screen_num
             self.player["on-all-workspaces"] = True
-            self.player["keep-open"] = False
+            self.player["keep-open"] = "always" if self.synchronized else False
             self.player["osc"] = False
             self.player["image-display-duration"] = "INFINITY"
+            if self.video_output:
+                self.player["vo"] = self.video_output
+                if self.video_output == "null":
+                    self.player["ao"] = "null"
+            for option, value in self.cache_options.items():
+                try:
+                    self.player[option] = value
+                except (AttributeError, TypeError, ValueError):
+                    self.logger.warning(f"mpv option '{option}' not supported")
+
+            # must be created in run, the timer runs in a thread of this process
+            self.status = StatusPublisher(
+                self.queue_send,
+                rate=self.status_rate,
+                edges=("filename", "playlist-pos", "transition-gap", "switched"),
+            )
+            self.status.start()
 
             self.player.observe_property("filename", self._mpv_observer_stat)
             self.player.observe_property("playlist-pos", self._mpv_observer_stat)
             self.player.observe_property("time-pos", self._mpv_observer_stat)
             self.player.observe_property("time-remaining", self._mpv_observer_stat)
+            self.player.register_event_callback(self._mpv_event)
 
             self._player_reset_playlist()
             self.dummy_timer_running = False
             start_image = True
-            self.duration_next = None
             self.still_timer = None
 
             while not self.stop_event.is_set():
@@ -136,16 +241,23 @@ class MpvProcess:
                         "--> received data: '{}':'{}'".format(type(data), str(data))
                     )
 
-                    if isinstance(data, tuple):
+                    if isinstance(data, tuple) and data[0] == "threshold":
+                        self.status.add_threshold(data[1])
+                    elif isinstance(data, tuple) and data[0] == "drop":
+                        self._player_drop(data[1])
+                    elif isinstance(data, tuple) and data[0] == "switch":
+                        self._player_schedule_switch(*data[1:])
+                    elif isinstance(data, tuple):
                         filepath, duration = data
-                        self.player.playlist_append(filepath)
-                        self.duration_next = duration
+                        with self._window_lock:
+                            self.player.playlist_append(filepath)
+                            index = self.window.append(duration)
                         self.logger.info(
                             "Appending File {} at pos {} in playlist.".format(
-                                str(data), len(self.player.playlist)
+                                str(data), index
                             )
                         )
-                        if start_image:
+                        if start_image and not self.synchronized:
                             self._player_next()
                             start_image = False
                     elif isinstance(data, str):
@@ -161,7 +273,15 @@ class MpvProcess:
                 except queue.Empty:
                     continue
 
+            if self.switch_timer:
+                self.switch_timer.cancel()
             self.player.terminate()
+            self.status.stop()
+            self.logger.info(
+                f"player status: {self.status.updates} property changes send as "
+                f"{self.status.sent} messages"
+            )
+            self.logger.info(f"transition gaps: {self.window.gaps.snapshot()}")
 
             self.logger.info("stop flag set. terminated processmpv")
 
@@ -190,13 +310,21 @@ class MpvProcess:
         self.player["pause"] = True
         if self.still_timer:
             self.still_timer.pause()
+        if self.switch_timer:
+            # the switch is scheduled again after resume
+            self.switch_timer.cancel()
+            self.switch_timer = None
         self._is_not_paused.clear()
+        if self.status_block:
+            self.status_block.write(paused=True)
 
     def _player_resume(self):
         self.player["pause"] = False
         if self.still_timer:
             self.still_timer.resume()
         self._is_not_paused.set()
+        if self.status_block:
+            self.status_block.write(paused=False)
 
     def _player_next(self):
         if self.still_timer:
@@ -204,6 +332,26 @@ class MpvProcess:
             self.still_timer = None
         self.player.playlist_next()
 
+    def _player_schedule_switch(self, deadline, index):
+        """switch to the entry with absolute index at time.monotonic() deadline"""
+        if self.switch_timer:
+            self.switch_timer.cancel()
+        self.switch_timer = PausableTimer(
+            max(0.0, deadline - time.monotonic()), self._player_switch, index
+        )
+        self.switch_timer.start()
+
+    def _player_switch(self, index):
+        """switch to the next entry, if not already at the one with index"""
+        self.switch_timer = None
+        if self._position is not None and self._position >= index:
+            return
+        self._switch_scheduled = index
+        if self._playing:
+            # keep-open paused the player if the end was reached before
+            self.player["pause"] = False
+        self._player_next()
+
     def _mpv_log(self, log_level, _, message):
         """passes mpv log massages to python logger."""
         if log_level == "fatal":
@@ -221,36 +369,78 @@ class MpvProcess:
         self.logger.log(level, "MPV:" + message)
 
     def _mpv_observer_stat(self, prop, value):
-        """relays status messages of interest to main thread (viewcontrol)"""
+        """relays status messages of interest to main thread (viewcontrol)
+
+        The changes are passed to the StatusPublisher, which coalesces them, and
+        written into the status block.
+
+        """
         tuple_send = (prop, value)
         if prop == "time-pos" or prop == "time-remaining":
             if value:
                 value = round(value, 4)
             tuple_send = (prop, value)
         elif prop == "playlist-pos":
-            if value == 0:
-                self.logger.debug(
-                    "<-- Omitting {}. Property change not send.".format(tuple_send)
-                )
-                return
-            elif value is None:
-                self._player_reset_playlist()
-            else:
-                if self.duration_next:
-                    self.still_timer = PausableRepeatedTimer(
-                        0.1,
-                        self._timer_handler_repeat,
-                        cycles=int(self.duration_next / 0.1),
-                        handler_end=self._timer_handler_end,
+            with self._window_lock:
+                pos, value = value, self.window.position(value)
+                if value is not None and value == self._position:
+                    return  # played entries before the current one were removed
+                self._position = value
+                tuple_send = (prop, value)
+                if value == 0:
+                    self.logger.debug(
+                        "<-- Omitting {}. Property change not send.".format(tuple_send)
                     )
-                    self.still_timer.start()
-                    if not self._is_not_paused.is_set():
-                        self.still_timer.pause()
-
-        self.queue_send.put(tuple_send)
-        logging.getLogger().log(
-            0, "<-- send data: '{}':'{}'".format(type(tuple_send), str(tuple_send))
-        )
+                    return
+                elif value is None:
+                    self._player_reset_playlist()
+                else:
+                    duration = self.window.switched(value)
+                    if duration:
+                        self.still_timer = PausableRepeatedTimer(
+                            0.1,
+                            self._timer_handler_repeat,
+                            cycles=int(duration / 0.1),
+                            handler_end=self._timer_handler_end,
+                        )
+                        self.still_timer.start()
+                        if not self._is_not_paused.is_set():
+                            self.still_timer.pause()
+                    for _ in range(self.window.trim(pos)):
+                        self.player.playlist_remove(0)
+
+        if self.status_block and prop == "playlist-pos":
+            # the times of the previous entry are no longer valid
+            self.status_block.write(
+                playlist_pos=tuple_send[1], time_pos=None, time_remaining=None
+            )
+        elif self.status_block and prop != "filename":
+            self.status_block.write(**{prop.replace("-", "_"): tuple_send[1]})
+        self.status.update(*tuple_send)
+
+    def _mpv_event(self, event):
+        """measures the transition gap when playback restarts after a switch"""
+        if event["event_id"] != mpv.MpvEventID.PLAYBACK_RESTART:
+            return
+        now = time.monotonic()
+        gap = self.window.started()
+        if gap is not None:
+            self.logger.debug(f"transition gap {gap * 1000:.1f}ms")
+            self.status.update("transition-gap", round(gap, 4))
+        if self._switch_scheduled is not None:
+            self.status.update("switched", (self._switch_scheduled, now))
+            self._switch_scheduled = None
+
+    def _player_drop(self, index):
+        """remove the upcoming entries after absolute index from the playlist"""
+        with self._window_lock:
+            pos = self.player.playlist_pos
+            if pos is None:
+                return
+            positions = self.window.drop(pos, index)
+            for position in positions:
+                self.player.playlist_remove(position)
+        self.logger.info(f"dropped {len(positions)} upcoming entries after {index}")
 
     def _timer_handler_repeat(self, runtime_cycle, time_left_cycle):
         self._mpv_observer_stat("time-pos", runtime_cycle)
@@ -258,9 +448,11 @@ class MpvProcess:
 
     def _timer_handler_end(self, runtime_cycle, time_left_cycle):
         self._timer_handler_repeat(runtime_cycle, time_left_cycle)
-        self._player_next()
+        if not self.synchronized:
+            self._player_next()
 
     def _player_reset_playlist(self):
+        self.window.reset()
         self.player.play(str(viewcontrol_picture_path()))
         self.player["image-display-duration"] = "INFINITY"
 
@@ -0,0 +1,179 @@
+import concurrent.futures
+import logging
+import os
+import threading
+
+
+class Readahead:
+    """Warms the page cache with the beginning of the upcoming media files.
+
+    Media on spinning disks and network mounts is read cold when the player
+    opens the next file at a transition. ``warm`` gets the files in playback
+    order (see Show.items_upcoming) and reads the beginning of each into the page
+    cache in background threads, either with posix_fadvise(WILLNEED), which lets
+    the kernel read ahead asynchronously, or by reading it sequentially (for file
+    systems ignoring the advice). A file is warmed once as long as it stays in
+    the files passed to ``warm``; jobs of files dropped from them are cancelled
+    if not started yet.
+
+    At every transition ``transition`` probes whether the beginning of the file
+    opened next by the player is in the page cache, using a read with RWF_NOWAIT
+    which fails instead of waiting for the disk. Warm and cold files are counted
+    in ``hits`` and ``misses``, files which can not be probed (python < 3.7,
+    file system without RWF_NOWAIT) in ``unknown``.
+
+    Args:
+        budget (int, optional): bytes warmed over all files of a call of warm,
+            shared equally between the files. Defaults to 256 MiB.
+        max_workers (int, optional): files warmed at the same time. Defaults to 2.
+        method (str, optional): "fadvise" or "read". Defaults to "fadvise" if
+            os.posix_fadvise is available, else "read".
+        probe_size (int, optional): bytes at the beginning of a file which must be
+            cached to count it as warm. Defaults to 1 MiB.
+
+    """
+
+    chunk_size = 1 << 20
+    """int: bytes read at once by method "read\""""
+
+    def __init__(
+        self, budget=256 << 20, max_workers=2, method=None, probe_size=1 << 20
+    ):
+        if method is None:
+            method = "fadvise" if hasattr(os, "posix_fadvise") else "read"
+        self.budget = budget
+        self.method = method
+        self.probe_size = probe_size
+        self.hits = 0
+        """int: transitions to a file found in the page cache"""
+        self.misses = 0
+        """int: transitions to a file not (completely) in the page cache"""
+        self.unknown = 0
+        """int: transitions to a file which could not be probed"""
+        self.logger = logging.getLogger("readahead")
+        self._pool = concurrent.futures.ThreadPoolExecutor(
+            max_workers, thread_name_prefix="readahead"
+        )
+        self._lock = threading.Lock()
+        self._jobs = dict()
+        """dict: path:future of the files of the last call of warm"""
+
+    @property
+    def hit_rate(self):
+        """share of the probed transitions to a warm file, None if none probed"""
+        probed = self.hits + self.misses
+        return self.hits / probed if probed else None
+
+    def warm(self, paths):
+        """warm the beginning of the files in background, in the given order
+
+        Args:
+            paths (iterable<str>): paths of the upcoming files in playback order
+
+        """
+        paths = list(dict.fromkeys(path for path in paths if path))
+        if not paths:
+            return
+        size = self.budget // len(paths)
+        with self._lock:
+            for path, job in self._jobs.items():
+                if path not in paths:
+                    job.cancel()
+            self._jobs = {
+                path: self._jobs.get(path)
+                or self._pool.submit(self._warm_file, path, size)
+                for path in paths
+            }
+
+    def wait(self, timeout=None):
+        """block until the files of the last call of warm are warmed
+
+        Returns:
+            bool: False if timeout expired.
+
+        """
+        with self._lock:
+            jobs = list(self._jobs.values())
+        _, not_done = concurrent.futures.wait(jobs, timeout)
+        return not not_done
+
+    def transition(self, path):
+        """probe and count whether the file opened next by the player is warm
+
+        Returns:
+            bool or None: True if warm, False if cold, None if unknown.
+
+        """
+        warm = self.probe(path)
+        if warm is None:
+            self.unknown += 1
+        elif warm:
+            self.hits += 1
+        else:
+            self.misses += 1
+        self.logger.debug(
+            f"{'unknown' if warm is None else 'warm' if warm else 'cold'} "
+            f"'{path}', hit rate {self.hits}/{self.hits + self.misses}"
+        )
+        return warm
+
+    def probe(self, path):
+        """True if the first probe_size bytes of path are in the page cache
+
+        Returns:
+            bool or None: None if the page cache can not be probed.
+
+        """
+        if not hasattr(os, "RWF_NOWAIT"):
+            return None
+        try:
+            fd = os.open(path, os.O_RDONLY)
+        except OSError:
+            return None
+        try:
+            size = min(self.probe_size, os.fstat(fd).st_size)
+            try:
+                return os.preadv(fd, [bytearray(size)], 0, os.RWF_NOWAIT) == size
+            except BlockingIOError:
+                return False
+            except OSError:
+                return None  # e.g. EOPNOTSUPP on network file systems
+        finally:
+            os.close(fd)
+
+    def shutdown(self):
+        """cancel the pending jobs and stop the threads"""
+        with self._lock:
+            for job in self._jobs.values():
+                job.cancel()
+            self._jobs = dict()
+        self._pool.shutdown()
+        self.logger.info(
+            f"page cache hits {self.hits}, misses {self.misses}, "
+            f"unknown {self.unknown}"
+        )
+
+    def _warm_file(self, path, size):
+        """read the first size bytes of path into the page cache
+
+        Returns:
+            int: bytes warmed
+
+        """
+        try:
+            with open(path, "rb", buffering=0) as file:
+                size = min(size, os.fstat(file.fileno()).st_size)
+                if self.method == "fadvise":
+                    os.posix_fadvise(file.fileno(), 0, size, os.POSIX_FADV_WILLNEED)
+                    return size
+                view = memoryview(bytearray(min(self.chunk_size, size)))
+                warmed = 0
+                while warmed < size:
+                    count = file.readinto(view[: size - warmed])
+                    if not count:
+                        break
+                    warmed += count
+                return warmed
+        except OSError as ex:
+            self.logger.warning(f"could not warm '{path}': {ex}")
+            return 0
@@ -0,0 +1,159 @@
+import collections
+import math
+import multiprocessing
+import struct
+import threading
+import time
+
+try:
+    from multiprocessing import shared_memory
+except ImportError:  # python < 3.8
+    shared_memory = None
+
+
+PlayerStatus = collections.namedtuple(
+    "PlayerStatus",
+    ["time_pos", "time_remaining", "playlist_pos", "paused", "updated", "sequence"],
+)
+"""status of the player as read from a StatusBlock, unknown values are None"""
+
+
+class StatusBlock:
+    """Latest status of the player in a fixed-layout memory block.
+
+    The player writes time-pos, time-remaining, playlist-pos and pause state into
+    the block, any number of readers (ViewControl, cue scheduler, UI) read the
+    latest values without draining a queue, without locks and without IPC.
+
+    The block is guarded by a seqlock: the writer increments the sequence number
+    before (odd, write in progress) and after (even) writing the values. A reader
+    copies the values between two reads of the sequence number and retries if the
+    numbers differ or are odd, so it never returns a torn status. Only one writer
+    is allowed at a time, the writer side is serialized with a lock in its process.
+    Sequence and values are packed into bytes and copied into the block in one
+    piece each (struct.pack_into clears the target before packing into it).
+
+    Layout (little endian)::
+
+        sequence (uint64), time_pos (double, NaN if unknown), time_remaining
+        (double, NaN if unknown), updated (double, time.monotonic() of the writer),
+        playlist_pos (int64, -1 if unknown), paused (uint8), padding (7 bytes)
+
+    With shared=True the block is a multiprocessing.shared_memory segment, which
+    a process started by fork inherits; a pickled block is attached by its name.
+    On python < 3.8 it is a multiprocessing.RawArray instead, which is shared
+    with a process only when passed to it at creation (inheritance). With
+    shared=False (threading mode) the block is a bytearray with the same API.
+
+    Args:
+        shared (bool, optional): create the block in shared memory. Defaults to
+            True.
+        name (str, optional): name of an existing shared memory block to attach.
+            Defaults to None, a new block is created.
+        array (multiprocessing.RawArray, optional): array of an existing block
+            to attach (python < 3.8). Defaults to None.
+
+    """
+
+    _sequence = struct.Struct("<Q")
+    _values = struct.Struct("<dddqB7x")
+    size = _sequence.size + _values.size
+    """int: size of the block in bytes"""
+
+    def __init__(self, shared=True, name=None, array=None):
+        self._memory = None
+        self._array = array
+        if array is not None:
+            self._buffer = memoryview(array).cast("B")
+        elif shared and shared_memory:
+            if name is None:
+                self._memory = shared_memory.SharedMemory(create=True, size=self.size)
+            else:
+                self._memory = shared_memory.SharedMemory(name=name)
+            self._buffer = self._memory.buf
+        elif shared:
+            self._array = multiprocessing.RawArray("B", self.size)
+            self._buffer = memoryview(self._array).cast("B")
+        else:
+            self._buffer = bytearray(self.size)
+        self._owner = name is None and array is None
+        self._status = dict(
+            time_pos=None, time_remaining=None, playlist_pos=None, paused=False
+        )
+        self._lock = threading.Lock()
+        if self._owner:
+            self.write()
+
+    @property
+    def name(self):
+        """name of the shared memory block, None if not shared"""
+        return self._memory.name if self._memory else None
+
+    @property
+    def is_shared(self):
+        """bool: the block is shared with other processes"""
+        return self._memory is not None or self._array is not None
+
+    def __reduce__(self):
+        if self._array is not None:
+            # pickling the array fails unless a process is started with it
+            return self.__class__, (True, None, self._array)
+        if not self._memory:
+            raise TypeError("a not shared StatusBlock can not be passed to a process")
+        return self.__class__, (True, self.name)
+
+    def write(self, **values):
+        """set the given values (see PlayerStatus), the others are kept"""
+        with self._lock:
+            self._status.update(values)
+            v = self._status
+            data = self._values.pack(
+                math.nan if v["time_pos"] is None else v["time_pos"],
+                math.nan if v["time_remaining"] is None else v["time_remaining"],
+                time.monotonic(),
+                -1 if v["playlist_pos"] is None else v["playlist_pos"],
+                bool(v["paused"]),
+            )
+            head = self._sequence.size
+            sequence = self._sequence.unpack(self._buffer[:head])[0]
+            self._buffer[:head] = self._sequence.pack(sequence + 1)
+            self._buffer[head:] = data
+            self._buffer[:head] = self._sequence.pack(sequence + 2)
+
+    def read(self):
+        """latest status of the player
+
+        Returns:
+            PlayerStatus: consistent copy of the values written last.
+
+        """
+        head = self._sequence.size
+        while True:
+            before = bytes(self._buffer[:head])
+            if not before[0] & 1:
+                data = bytes(self._buffer[head:])
+                if bytes(self._buffer[:head]) == before:
+                    break
+            time.sleep(0)  # let the writer finish
+        values = self._values.unpack(data)
+        time_pos, time_remaining, updated, playlist_pos, paused = values
+        return PlayerStatus(
+            None if math.isnan(time_pos) else time_pos,
+            None if math.isnan(time_remaining) else time_remaining,
+            None if playlist_pos < 0 else playlist_pos,
+            bool(paused),
+            updated,
+            self._sequence.unpack(before)[0] // 2,
+        )
+
+    def close(self):
+        """detach from the block, the creator also removes it"""
+        if self._array is not None:
+            self._buffer = bytearray(self.size)
+            self._array = None
+        if self._memory:
+            self._buffer = bytearray(self.size)
+            self._memory.close()
+            if self._owner:
+                self._memory.unlink()
+            self._memory = None
@@ -0,0 +1,185 @@
+import collections
+import logging
+import threading
+
+from blinker import signal
+
+from viewcontrol.util.timing import RepeatedTimer, TimerGroup
+
+
+class StatusPublisher:
+    """Player side of the status channel, coalesces the properties of the player.
+
+    The player reports time-pos and time-remaining with every frame. Instead of
+    passing each change to the main process, a change only updates a snapshot of
+    all properties, which is send at most ``rate`` times per second and only if it
+    changed, as message ("status", snapshot).
+
+    Changes which must not wait are send at once (edge triggered):
+
+    * a change of a property in ``edges`` as (property, value)
+    * time-remaining falling below a registered threshold as
+      ("remaining", threshold, value). The threshold is armed again when the
+      remaining time rises to it (seek back) or the playlist position changes.
+
+    Args:
+        queue_send (queue.Queue or multiprocessing.Queue): queue over which the
+            messages are send.
+        rate (float, optional): snapshots send per second. Defaults to 10.
+        thresholds (iterable<float>, optional): remaining times in seconds to notify.
+            Defaults to ().
+        edges (iterable<str>, optional): properties notified at every change.
+            Defaults to ("filename", "playlist-pos").
+
+    """
+
+    def __init__(
+        self, queue_send, rate=10, thresholds=(), edges=("filename", "playlist-pos")
+    ):
+        self.queue_send = queue_send
+        self.rate = rate
+        self.edges = set(edges)
+        self.snapshot = dict()
+        """dict: property:value of the last reported values"""
+        self.updates = 0
+        """int: property changes reported by the player"""
+        self.sent = 0
+        """int: messages put on queue_send"""
+        self._lock = threading.Lock()
+        self._changed = False
+        self._thresholds = dict()
+        """dict: threshold:armed"""
+        for threshold in thresholds:
+            self.add_threshold(threshold)
+        self._timer = None
+
+    def start(self):
+        """start sending snapshots, must be called in the thread/process running"""
+        self._timer = RepeatedTimer(1 / self.rate, self.flush, group=TimerGroup())
+        self._timer.start()
+
+    def stop(self):
+        """stop sending snapshots, the last changes are send at once"""
+        if self._timer:
+            self._timer.cancel()
+            self._timer = None
+        self.flush()
+
+    def add_threshold(self, threshold):
+        """notify when time-remaining falls below threshold (seconds)"""
+        with self._lock:
+            self._thresholds.setdefault(float(threshold), True)
+
+    def update(self, prop, value):
+        """report a property change of the player, called by the player"""
+        messages = list()
+        with self._lock:
+            self.updates += 1
+            if prop in self.snapshot and self.snapshot[prop] == value:
+                return
+            self.snapshot[prop] = value
+            self._changed = True
+            if prop in self.edges:
+                messages.append((prop, value))
+                if prop == "playlist-pos":
+                    self._thresholds = dict.fromkeys(self._thresholds, True)
+            elif prop == "time-remaining" and value is not None:
+                for threshold, armed in self._thresholds.items():
+                    if value >= threshold:
+                        self._thresholds[threshold] = True
+                    elif armed:
+                        self._thresholds[threshold] = False
+                        messages.append(("remaining", threshold, value))
+        for message in messages:
+            self._put(message)
+
+    def flush(self):
+        """send the snapshot if it changed since it was send the last time"""
+        with self._lock:
+            if not self._changed:
+                return
+            self._changed = False
+            snapshot = dict(self.snapshot)
+        self._put(("status", snapshot))
+
+    def _put(self, message):
+        self.sent += 1
+        self.queue_send.put(message)
+        logging.getLogger().log(0, f"<-- send data: '{message}'")
+
+
+class StatusChannel:
+    """Main process side of the status channel, receives from a StatusPublisher.
+
+    A thread reads the messages of the publisher. A snapshot is stored in
+    ``status`` and send with the blinker signal "mpv_status" (keyword argument
+    snapshot). A property notification calls the subscribers of the property with
+    the value, a threshold notification the subscribers of the threshold with the
+    remaining time.
+
+    Thresholds subscribed are passed to the publisher as control message
+    ("threshold", seconds) over queue_control, also before the player is started.
+
+    Args:
+        queue_recv (queue.Queue or multiprocessing.Queue): queue of the publisher.
+        queue_control (queue.Queue or multiprocessing.Queue, optional): queue over
+            which commands are passed to the player. Defaults to None.
+
+    """
+
+    def __init__(self, queue_recv, queue_control=None):
+        self.queue_recv = queue_recv
+        self.queue_control = queue_control
+        self.status = dict()
+        """dict: property:value of the last snapshot"""
+        self.received = 0
+        """int: messages received from the publisher"""
+        self.signal = signal("mpv_status")
+        self.logger = logging.getLogger("status_channel")
+        self._subscribers = collections.defaultdict(list)
+        """dict: property or ("remaining", threshold):list of callbacks"""
+        self._thread = threading.Thread(
+            target=self._run, name="listen_process_mpv", daemon=True
+        )
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self.queue_recv.put(None)
+        self._thread.join()
+
+    def subscribe(self, prop, callback):
+        """call callback with the value at every change of property prop"""
+        self._subscribers[prop].append(callback)
+
+    def subscribe_threshold(self, seconds, callback):
+        """call callback with the remaining time when it falls below seconds"""
+        seconds = float(seconds)
+        self._subscribers[("remaining", seconds)].append(callback)
+        if self.queue_control is not None:
+            self.queue_control.put(("threshold", seconds))
+
+    def dispatch(self, message):
+        """pass a message of the publisher to the subscribers"""
+        self.received += 1
+        if message[0] == "status":
+            self.status = message[1]
+            self.signal.send(self, snapshot=message[1])
+            return
+        if message[0] == "remaining":
+            key, value = ("remaining", message[1]), message[2]
+        else:
+            key, value = message
+        for callback in self._subscribers.get(key, ()):
+            try:
+                callback(value)
+            except Exception as ex:
+                self.logger.error(f"error in subscriber of {key}", exc_info=ex)
+
+    def _run(self):
+        while True:
+            message = self.queue_recv.get(block=True)
+            if message is None:
+                break
+            self.dispatch(message)
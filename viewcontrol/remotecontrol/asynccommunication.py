@@ -0,0 +1,426 @@
+import abc
+import asyncio
+import collections
+import os
+import threading
+
+from pythonosc import osc_packet
+from pythonosc.osc_message_builder import OscMessageBuilder
+
+from .commanditem import CommandRecvItem
+from .threadcommunicationbase import ComType
+from .threadcommunicationbase import ThreadCommunicationBase
+
+
+class AsyncCommunicationEngine:
+    """Runs the communication of all devices in one asyncio event loop.
+
+    Alternative to starting one thread per device. The device objects are created
+    as usual (without starting their threads) and only their protocol specific
+    methods (``_compose``, ``_combine_command``, ``_analyse``, ...) are used. The
+    polling ``_main`` loop of the device threads is replaced by a transport of the
+    protocol named in ``async_transport`` of the device class (see TRANSPORTS).
+    Commands put into the queue of a device wake the loop and are send at once,
+    only delayed by the minimal ``send_interval`` of the device.
+
+    Args:
+        devices (list of ThreadCommunicationBase): device objects, not started.
+        name (str, optional): name of the thread running the loop. Defaults to
+            "AsyncCommunication".
+
+    """
+
+    def __init__(self, devices, name="AsyncCommunication"):
+        self.devices = list(devices)
+        self.loop = asyncio.new_event_loop()
+        self._tasks = list()
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        for device in self.devices:
+            if device.async_transport not in TRANSPORTS:
+                raise ValueError(
+                    f"device '{device.device_name}' has no async transport"
+                )
+            device._queue_command = _CommandQueue(self.loop)
+
+    def start(self):
+        """start event loop with communication of all devices in a thread"""
+        self._thread.start()
+
+    def stop(self, timeout=None):
+        """stop communication of all devices and wait for the loop to close"""
+        if self._thread.is_alive():
+            self.loop.call_soon_threadsafe(self._cancel)
+            self._thread.join(timeout)
+
+    def is_alive(self):
+        return self._thread.is_alive()
+
+    def _run(self):
+        asyncio.set_event_loop(self.loop)
+        for device in self.devices:
+            self._tasks.append(self.loop.create_task(self._run_device(device)))
+        try:
+            self.loop.run_forever()
+        finally:
+            self.loop.close()
+
+    def _cancel(self):
+        for task in self._tasks:
+            task.cancel()
+        gathered = asyncio.gather(*self._tasks, return_exceptions=True)
+        gathered.add_done_callback(lambda _: self.loop.stop())
+
+    async def _run_device(self, device):
+        """equivalent of ThreadCommunicationBase.run for the event loop"""
+        transport = TRANSPORTS[device.async_transport](device, self.loop)
+        device.logger.info(
+            "Started control of device '{}' in event loop with pid {}.".format(
+                device.name, os.getpid()
+            )
+        )
+        device._on_enter()
+        try:
+            while True:
+                try:
+                    await transport.run()
+                except asyncio.CancelledError:
+                    raise
+                except device.type_exception as ex:
+                    device.logger.warning(
+                        "{}: Communication Failed ({}). "
+                        "New Try in {} second(s).".format(
+                            device.name,
+                            getattr(ex, "errno", type(ex)),
+                            ThreadCommunicationBase.retry_interval,
+                        )
+                    )
+                except Exception as ex:
+                    device.logger.error(
+                        "Uncaught exception in communication of '{}'".format(
+                            device.name
+                        ),
+                        exc_info=ex,
+                    )
+                await asyncio.sleep(ThreadCommunicationBase.retry_interval)
+        finally:
+            device._on_exit()
+
+
+class _CommandQueue:
+    """Replacement of the command queue of a device waking the event loop.
+
+    ``put`` can be called from any thread, ``get`` must be awaited in the loop.
+
+    """
+
+    def __init__(self, loop):
+        self._loop = loop
+        self._items = collections.deque()
+        self._waiter = None
+
+    def put(self, item):
+        self._loop.call_soon_threadsafe(self._put, item)
+
+    def _put(self, item):
+        self._items.append(item)
+        if self._waiter is not None and not self._waiter.done():
+            self._waiter.set_result(None)
+
+    def empty(self):
+        return not self._items
+
+    async def get(self):
+        while not self._items:
+            self._waiter = self._loop.create_future()
+            await self._waiter
+        return self._items.popleft()
+
+
+class AsyncTransport(abc.ABC):
+    """Base class of the protocols of the AsyncCommunicationEngine.
+
+    Opens the connection and runs a receive and a send coroutine until one of them
+    fails. Sending waits only as long as the ``send_interval`` of the device and
+    ``_send_blocked`` require.
+
+    Args:
+        device (ThreadCommunicationBase): device object providing compose and
+            analyse methods.
+        loop (asyncio.AbstractEventLoop): event loop of the engine.
+
+    """
+
+    def __init__(self, device, loop):
+        self.device = device
+        self.loop = loop
+        self.commands = device._queue_command
+        self.buffer_size = getattr(device, "BUFFER_SIZE", 1024)
+        self._last_send = None
+        self._received = None
+
+    async def run(self):
+        tasks = list()
+        try:
+            await self._open()
+            tasks.append(self.loop.create_task(self._receive()))
+            tasks.append(self.loop.create_task(self._send_loop()))
+            done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_EXCEPTION)
+            for task in done:
+                task.result()
+        finally:
+            for task in tasks:
+                task.cancel()
+            self._close()
+
+    async def _send_loop(self):
+        while True:
+            command_item = await self.commands.get()
+            await self._wait_ready()
+            self._send(command_item)
+            self._last_send = self.loop.time()
+
+    async def _wait_ready(self):
+        while True:
+            if self._last_send is not None:
+                wait = self.device.send_interval - (self.loop.time() - self._last_send)
+                if wait > 0:
+                    await asyncio.sleep(wait)
+            if not self._send_blocked():
+                return
+            self._received = self.loop.create_future()
+            await self._received
+
+    def _send_blocked(self):
+        """return True if device is not ready to receive a command"""
+        return False
+
+    def _analyse(self, *args):
+        try:
+            self.device._analyse(*args)
+        except Exception as ex:
+            self.device.logger.warning(f"error analyzing message {args}: {ex}")
+        if self._received is not None and not self._received.done():
+            self._received.set_result(None)
+
+    @abc.abstractmethod
+    async def _open(self):
+        pass
+
+    @abc.abstractmethod
+    async def _receive(self):
+        """receive until connection fails"""
+        pass
+
+    @abc.abstractmethod
+    def _send(self, command_item):
+        pass
+
+    @abc.abstractmethod
+    def _close(self):
+        pass
+
+
+class TcpTransport(AsyncTransport):
+    """TCP stream, counterpart of ``tcpip._threadcommunication``"""
+
+    writer = None
+
+    async def _open(self):
+        self.reader, self.writer = await asyncio.open_connection(
+            self.device.target_ip, self.device.target_port
+        )
+
+    async def _receive(self):
+        while True:
+            data = await self.reader.read(self.buffer_size)
+            if not data:
+                raise ConnectionResetError("connection closed by device")
+            self._analyse(data.decode())
+
+    def _send(self, command_item):
+        str_composed = self.device._compose(command_item)
+        if str_composed is None:
+            return
+        str_send = self.device._combine_command(str_composed)
+        self.device.last_cmd = (command_item, str_send)
+        self.device.logger.debug("Send: {}".format(str_send))
+        self.writer.write(str_send.encode())
+
+    def _close(self):
+        if self.writer:
+            self.writer.close()
+            self.writer = None
+
+
+class TelnetTransport(TcpTransport):
+    """Telnet line protocol, counterpart of ``telnet._threadcommunication``
+
+    Waits for the ``welcome_seq`` of the device after connecting, refuses all
+    telnet options the device offers and passes every received line (ending with
+    "\\r\\n") to ``_analyse``. Commands are hold back while the device has echoed
+    a command but not yet answered it.
+
+    """
+
+    IAC, DONT, DO, WONT, WILL, SB, SE = 255, 254, 253, 252, 251, 250, 240
+
+    async def _open(self):
+        await super()._open()
+        self._buffer = bytearray()
+        self._pending = bytearray()
+        self._subnegotiation = False
+        welcome_seq = self.device.welcome_seq
+        if welcome_seq:
+            while welcome_seq not in self._buffer:
+                await asyncio.wait_for(self._read(), timeout=5)
+            del self._buffer[: self._buffer.index(welcome_seq) + len(welcome_seq)]
+
+    async def _read(self):
+        data = await self.reader.read(self.buffer_size)
+        if not data:
+            raise ConnectionResetError("connection closed by device")
+        self._buffer += self._filter(data)
+
+    async def _receive(self):
+        while True:
+            while b"\r\n" in self._buffer:
+                end = self._buffer.index(b"\r\n") + 2
+                line = bytes(self._buffer[:end])
+                del self._buffer[:end]
+                self._analyse(line)
+            await self._read()
+
+    def _filter(self, data):
+        """remove telnet commands from data, refusing all options"""
+        data = self._pending + data
+        self._pending = bytearray()
+        out = bytearray()
+        i = 0
+        while i < len(data):
+            byte = data[i]
+            if self._subnegotiation:
+                if byte == self.IAC and data[i + 1 : i + 2] == bytes([self.SE]):
+                    self._subnegotiation = False
+                    i += 1
+                elif byte == self.IAC and i + 1 == len(data):
+                    self._pending = data[i:]
+                    break
+                i += 1
+            elif byte != self.IAC:
+                out.append(byte)
+                i += 1
+            elif i + 1 == len(data):
+                self._pending = data[i:]
+                break
+            else:
+                cmd = data[i + 1]
+                if cmd == self.IAC:
+                    out.append(self.IAC)
+                    i += 2
+                elif cmd in (self.DO, self.DONT, self.WILL, self.WONT):
+                    if i + 2 == len(data):
+                        self._pending = data[i:]
+                        break
+                    if cmd == self.DO:
+                        self.writer.write(bytes([self.IAC, self.WONT, data[i + 2]]))
+                    elif cmd == self.WILL:
+                        self.writer.write(bytes([self.IAC, self.DONT, data[i + 2]]))
+                    i += 3
+                elif cmd == self.SB:
+                    self._subnegotiation = True
+                    i += 2
+                else:
+                    i += 2
+        return bytes(out)
+
+    def _send_blocked(self):
+        return self.device.feedback_received
+
+    def _send(self, command_item):
+        str_composed = self.device._compose(command_item)
+        if str_composed is None:
+            return
+        self.device.last_send_command_item = command_item
+        str_send = self.device._combine_command(str_composed)
+        self.device.logger.debug("Send: {0:<78}R{0}".format(str_send))
+        self.device.last_send_data = str_send.encode()
+        self.device.feedback_received = False
+        self.writer.write(self.device.last_send_data)
+
+
+class OscTransport(AsyncTransport):
+    """OSC datagram protocol, counterpart of ``osc._threadcommunication``"""
+
+    transport = None
+
+    async def _open(self):
+        self._failed = self.loop.create_future()
+        self.transport, _ = await self.loop.create_datagram_endpoint(
+            lambda: _OscProtocol(self), local_addr=("0.0.0.0", 0)
+        )
+        self.device.logger.debug(
+            f"osc connection: {self.transport.get_extra_info('sockname')}"
+        )
+
+    async def _receive(self):
+        await self._failed
+
+    def datagram_received(self, data):
+        try:
+            packet = osc_packet.OscPacket(data)
+        except osc_packet.ParseError as ex:
+            self.device.logger.warning(f"error parsing osc packet: {ex}")
+            return
+        for timed_msg in packet.messages:
+            self._analyse(timed_msg.message.address, *timed_msg.message.params)
+
+    def connection_failed(self, exc):
+        if not self._failed.done():
+            self._failed.set_exception(exc or ConnectionResetError())
+
+    def _send(self, command_item):
+        address, value = self.device._compose(command_item)
+        if not address:
+            return
+        if address is TypeError:
+            cai = CommandRecvItem(
+                self.device.device_name, command_item.command, (), ComType.failed
+            )
+            self.device._put_into_answer_queue(cai)
+            return
+        builder = OscMessageBuilder(address=address)
+        if value is None:
+            pass
+        elif isinstance(value, list):
+            for val in value:
+                builder.add_arg(val)
+        else:
+            builder.add_arg(value)
+        self.transport.sendto(
+            builder.build().dgram, (self.device.target_ip, self.device.target_port)
+        )
+
+    def _close(self):
+        if not self._failed.done():
+            self._failed.cancel()
+        if self.transport:
+            self.transport.close()
+            self.transport = None
+
+
+class _OscProtocol(asyncio.DatagramProtocol):
+    def __init__(self, owner):
+        self.owner = owner
+
+    def datagram_received(self, data, addr):
+        self.owner.datagram_received(data)
+
+    def error_received(self, exc):
+        self.owner.connection_failed(exc)
+
+    def connection_lost(self, exc):
+        self.owner.connection_failed(exc)
+
+
+TRANSPORTS = {"tcp": TcpTransport, "telnet": TelnetTransport, "osc": OscTransport}
+"""dict: transports by name as used in ``async_transport`` of the device classes"""
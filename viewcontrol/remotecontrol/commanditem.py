@@ -24,15 +24,21 @@ class CommandSendItem(CommandItem):
         delay (float): delay to send signal (handled in ProcessCmd)
         request (bool): true if request object has to be used otherwise
             command_composition string will be used. Defaults to False.
+        module (hashable, optional): key of the show module sending the command.
+            Delayed commands of a module can be cancelled together (handled in
+            ProcessCmd). Defaults to None.
 
     For Attributes see Arguments. Attributes are identical with arguments.
     """
 
-    def __init__(self, device, command, arguments=(), delay=0, request=True):
+    def __init__(
+        self, device, command, arguments=(), delay=0, request=True, module=None
+    ):
         super().__init__(device, command)
         self.arguments = arguments
         self.delay = delay
         self.request = request
+        self.module = module
 
     def __str__(self):
         return (
@@ -94,7 +100,8 @@ class CommandTemplate(yaml.YAMLObject):
             predefined set of commands. The sets are loaded by the DictCommandItemLib
     """
 
-    allowed_type_strings = ["int", "float", "str"]
+    _type_by_string = {"int": int, "float": float, "str": str}
+    allowed_type_strings = list(_type_by_string)
 
     def __init__(
         self,
@@ -113,6 +120,7 @@ class CommandTemplate(yaml.YAMLObject):
         self.answer_analysis = answer_analysis
         self.argument_mappings = argument_mappings
         self.__is_valid_err_counter = 0
+        self.compile()
 
     def __repr__(self):
         return f"Command: {self.name}"
@@ -132,22 +140,97 @@ class CommandTemplate(yaml.YAMLObject):
 
     @property
     def number_command_arguments(self):
-        if self.command_composition:
-            return format_arg_count(self.command_composition, raise_ex=False)
-        return 0
+        return self._command_arg_count
 
     @property
     def number_request_arguments(self):
-        if self.request_composition:
-            return format_arg_count(self.request_composition, raise_ex=False)
-        return 0
+        return self._request_arg_count
+
+    def compile(self):
+        """Precompute everything needed to compose and analyse messages.
+
+        Counts the formatter fields of the compositions, resolves the types of
+        the argument mappings to callables and compiles the answer_analysis, so
+        sending and receiving is reduced to tuple operations. Called when the
+        template is created or loaded by CommandTemplateList, must be called
+        again after changing attributes.
+
+        """
+        command_composition = getattr(self, "command_composition", None)
+        request_composition = getattr(self, "request_composition", None)
+        argument_mappings = getattr(self, "argument_mappings", None)
+        self._command_arg_count = 0
+        if command_composition:
+            self._command_arg_count = format_arg_count(command_composition)
+        self._request_arg_count = 0
+        if request_composition:
+            self._request_arg_count = format_arg_count(request_composition)
+        self._argument_keys = ()
+        if isinstance(argument_mappings, dict):
+            self._argument_keys = tuple(argument_mappings.keys())
+        self._argument_casts = dict()
+        for key in self._argument_keys:
+            try:
+                self._argument_casts[key] = self._resolve_argument_type(key)
+            except (AttributeError, IndexError):
+                pass  # reported by is_valid, raised again when casting
+        self._argument_key_casts = tuple(
+            (key, self._argument_casts.get(key)) for key in self._argument_keys
+        )
+        if getattr(self, "answer_analysis", None):
+            try:
+                self.answer_regex
+            except re.error:
+                pass  # reported by is_valid
+
+    def composition(self, request=False):
+        """returns composition and number of its formatter fields.
+
+        Args:
+            request (bool): if True return request_composition otherwise
+                command_composition. Defaults to False.
+
+        Returns:
+            tuple: (composition, number of formatter fields). The number is None
+                if the composition could not be parsed.
+
+        """
+        if request:
+            return self.request_composition, self._request_arg_count
+        return self.command_composition, self._command_arg_count
 
     @property
     def number_analysis_arguments(self):
         if self.answer_analysis:
-            return re.compile(self.answer_analysis).groups
+            return self.answer_regex.groups
         return 0
 
+    @property
+    def answer_regex(self):
+        """re.Pattern: compiled answer_analysis, compiled only once per pattern"""
+        if not self.answer_analysis:
+            return None
+        regex = getattr(self, "_answer_regex", None)
+        if regex is None or regex.pattern != self.answer_analysis:
+            regex = re.compile(self.answer_analysis)
+            self._answer_regex = regex
+        return regex
+
+    def answer_groups(self, string):
+        """returns capture groups of answer_analysis found in string.
+
+        Returns:
+            tuple or None: groups of the match, None if no analysis or no match.
+
+        """
+        regex = self.answer_regex
+        if regex is None:
+            return None
+        match = regex.search(string)
+        if match:
+            return match.groups()
+        return None
+
     def argument_type(self, key):
         """get argument type from mapping for given key
 
@@ -155,14 +238,20 @@ class CommandTemplate(yaml.YAMLObject):
             type: type of value of key
 
         """
+        cast = self._argument_casts.get(key)
+        if cast is None:
+            return self._resolve_argument_type(key)
+        return cast
+
+    def _resolve_argument_type(self, key):
         mapping = self.argument_mappings[key]
         if isinstance(mapping, list):  # discrete values
             return type(mapping[0])
         elif isinstance(mapping, dict):  # discrete values with mapping to string
             return type(list(mapping.values())[0])
         elif isinstance(mapping, str):
-            if mapping in self.allowed_type_strings:
-                return eval(mapping)
+            if mapping in self._type_by_string:
+                return self._type_by_string[mapping]
         # else
         raise AttributeError("format no found")
 
@@ -186,8 +275,10 @@ class CommandTemplate(yaml.YAMLObject):
         if len(args) == 0:
             return d
 
-        for key, arg in zip(self.argument_mappings.keys(), args):
-            d[key] = self.cast_argument_as_type(key, arg)
+        for (key, cast), arg in zip(self._argument_key_casts, args):
+            if cast is None:
+                cast = self.argument_type(key)
+            d[key] = cast(arg)
         return d
 
     def sorted_tuple_from_dict(self, argument_dict):
@@ -197,8 +288,7 @@ class CommandTemplate(yaml.YAMLObject):
             tuple: arguments in order of dict
 
         """
-        sort = [argument_dict.get(key) for key in self.argument_mappings.keys()]
-        return tuple(sort)
+        return tuple(map(argument_dict.get, self._argument_keys))
 
     def __print_message(self, rule, attribute, msg):
         self.__is_valid_err_counter += 1
@@ -347,12 +437,25 @@ class CommandTemplateList(dict):
         else:
             raise FileNotFoundError()
 
+    @property
+    def answer_matcher(self):
+        """AnswerMatcher: matcher of all templates, see compile_answer_matcher"""
+        if getattr(self, "_answer_matcher", None) is None:
+            self.compile_answer_matcher()
+        return self._answer_matcher
+
+    def compile_answer_matcher(self):
+        """(Re)compile the AnswerMatcher, call after changing templates."""
+        self._answer_matcher = AnswerMatcher(self.values())
+
     def load_objects_from_yaml(self):
         """Loads all command item objects from yaml file to a dict."""
         with open(self.file_path, "r") as infile:
             list_obj = yaml.safe_load(infile)
             for obj in list_obj:
+                obj.compile()
                 self.update({obj.name: obj})
+        self.compile_answer_matcher()
 
     def is_valid(self):
         """Returns 0 if all Templates in list are valid by checking a list of criteria.
@@ -367,6 +470,90 @@ class CommandTemplateList(dict):
         return errors
 
 
+class AnswerMatcher:
+    """Identifies the CommandTemplate of a received message in one pass.
+
+    All answer_analysis regexes are compiled once and combined into one
+    alternation, where every template is a lookahead with a named group
+    ``(?=.*?(?P<t0>...))``. The first alternative matching wins, so the result
+    is identical to searching every template in order and taking the first
+    match. Patterns which can not be combined (global inline flags, named
+    groups or backreferences) are searched on their own at their place in the
+    order.
+
+    Args:
+        templates (iterable of CommandTemplate): templates in order of priority.
+
+    Attributes:
+        hits (int): number of messages a template was found for.
+        misses (int): number of messages no template was found for.
+
+    """
+
+    _not_combinable = re.compile(r"\\[1-9]|\(\?P[<=]|\(\?[aiLmsux]+\)")
+
+    def __init__(self, templates):
+        self.hits = 0
+        self.misses = 0
+        self._stages = list()
+        combined = list()
+        for template in templates:
+            if template.answer_regex is None:
+                continue
+            if self._not_combinable.search(template.answer_analysis):
+                self._add_combined(combined)
+                combined = list()
+                self._stages.append((template.answer_regex, (template,), None))
+            else:
+                combined.append(template)
+        self._add_combined(combined)
+
+    def _add_combined(self, templates):
+        if not templates:
+            return
+        parts = list()
+        offsets = list()
+        group = 0
+        for index, template in enumerate(templates):
+            parts.append(f"(?=(?s:.*?)(?P<t{index}>{template.answer_analysis}))")
+            # first inner group follows the named group of the template
+            offsets.append(group + 1)
+            group += 1 + template.answer_regex.groups
+        self._stages.append((re.compile("|".join(parts)), tuple(templates), offsets))
+
+    def match(self, string):
+        """returns template and capture groups of first matching template.
+
+        Args:
+            string (str): received message.
+
+        Returns:
+            tuple: (CommandTemplate, tuple of groups) or (None, None) if no
+                template matches.
+
+        """
+        for regex, templates, offsets in self._stages:
+            if offsets is None:
+                match = regex.search(string)
+                if not match:
+                    continue
+                template = templates[0]
+                groups = match.groups()
+            else:
+                match = regex.match(string)
+                if not match:
+                    continue
+                # the named group of the matching alternative is closed last
+                index = int(match.lastgroup[1:])
+                template = templates[index]
+                start = offsets[index]
+                groups = match.groups()[start : start + template.answer_regex.groups]
+            self.hits += 1
+            return template, groups
+        self.misses += 1
+        return None, None
+
+
 def format_arg_count(fmt, raise_ex=False):
     """return arguments in formatter string, catches errors by default.
 
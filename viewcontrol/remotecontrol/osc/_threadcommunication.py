@@ -1,4 +1,3 @@
-import re
 import socket
 
 from pythonosc.dispatcher import Dispatcher
@@ -7,7 +6,6 @@ from pythonosc.udp_client import SimpleUDPClient
 
 from ..commanditem import CommandRecvItem
 from ..commanditem import CommandSendItem
-from ..commanditem import format_arg_count
 from ..threadcommunicationbase import ComType
 from ..threadcommunicationbase import ThreadCommunicationBase
 
@@ -24,6 +22,8 @@ class ThreadCommunication(ThreadCommunicationBase):
 
     """
 
+    async_transport = "osc"
+
     def __init__(self, target_ip, target_port, stop_event=None):
         super().__init__(target_ip, target_port, stop_event=stop_event)
         self._dispatcher = Dispatcher()
@@ -67,8 +67,8 @@ class ThreadCommunication(ThreadCommunicationBase):
     def _compose(self, command_item):
         """parse arguments to address and arguments returning OSC message parts.
 
-        First counts the fields in the address string and inserts the arguments into it
-        if there are one. Rest of the arguments are returned as new tuple.
+        Inserts as many arguments into the address string as it has fields (counted
+        once by the template). Rest of the arguments are returned as new tuple.
 
         Args:
             command_item (CommandSendItem): CommandItem to be composed from.
@@ -76,10 +76,7 @@ class ThreadCommunication(ThreadCommunicationBase):
         """
 
         command_template = self.dict_command_template[command_item.command]
-        if command_item.request:
-            address = command_template.request_composition
-        else:
-            address = command_template.command_composition
+        address, address_arg_count = command_template.composition(command_item.request)
 
         if isinstance(command_item.arguments, dict):
             arguments = command_template.sorted_tuple_from_dict(command_item.arguments)
@@ -87,7 +84,6 @@ class ThreadCommunication(ThreadCommunicationBase):
             arguments = command_item.arguments
 
         try:
-            address_arg_count = format_arg_count(address)
             arg_address_tuple = arguments[:address_arg_count]
             arg_argument_tuple = arguments[address_arg_count:]
             if arg_address_tuple:
@@ -112,7 +108,7 @@ class ThreadCommunication(ThreadCommunicationBase):
 
         self.logger.debug(f"analyzing {address} with args {args}")
 
-        m = None
+        groups = None
         cmd_template = None
         in_last_composed = False
 
@@ -121,23 +117,20 @@ class ThreadCommunication(ThreadCommunicationBase):
                 self.last_composed.command
             ]
             if command_template_last.answer_analysis:
-                m = re.search(command_template_last.answer_analysis, address)
+                groups = command_template_last.answer_groups(address)
                 cmd_template = command_template_last
                 in_last_composed = True
 
-            if not m:
-                for name, command_template in self.dict_command_template.items():
-                    if not command_template.answer_analysis:
-                        continue
-                    m = re.search(command_template.answer_analysis, address)
-                    if m:
-                        cmd_template = command_template
-                        break
+            if groups is None:
+                matcher = self.dict_command_template.answer_matcher
+                matched_template, groups = matcher.match(address)
+                if matched_template:
+                    cmd_template = matched_template
 
             values = None
             if cmd_template:
-                if m:
-                    values = cmd_template.create_arg_dict(tuple(m.groups()) + args)
+                if groups is not None:
+                    values = cmd_template.create_arg_dict(groups + args)
                 else:
                     values = cmd_template.create_arg_dict(args)
 
@@ -147,7 +140,7 @@ class ThreadCommunication(ThreadCommunicationBase):
                     mt = ComType.request_success
                 else:
                     mt = ComType.command_success
-            elif m:  # match was found in dict_command_template
+            elif groups is not None:  # match was found in dict_command_template
                 command = cmd_template.name
                 mt = ComType.message_status
             else:  # address could not be associated with any command
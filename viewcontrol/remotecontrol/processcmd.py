@@ -8,6 +8,7 @@ import threading
 from blinker import signal
 
 from . import supported_devices
+from .asynccommunication import AsyncCommunicationEngine
 from .threadcommunicationbase import ThreadCommunicationBase
 from ..util import timing
 
@@ -22,6 +23,7 @@ class ProcessCmd(multiprocessing.Process):
         device_options,
         stop_event,
         logger_config,
+        engine="thread",
         **kwargs,
     ):
         super().__init__(name="ProcessCmd", **kwargs)
@@ -32,6 +34,7 @@ class ProcessCmd(multiprocessing.Process):
             self.name,
             stop_event,
             logger_config=logger_config,
+            engine=engine,
         )
 
     def run(self):
@@ -42,7 +45,15 @@ class ProcessCmd(multiprocessing.Process):
 class ThreadCmd(threading.Thread):
     """Dummy to starting ThreadCmd as thread. See ThreadCmd for args."""
 
-    def __init__(self, queue_status, queue_command, modules, stop_event, **kwargs):
+    def __init__(
+        self,
+        queue_status,
+        queue_command,
+        modules,
+        stop_event,
+        engine="thread",
+        **kwargs,
+    ):
         super().__init__(name="ThreadCmd", **kwargs)
         self._dummy = CommandProcess(
             queue_status,
@@ -51,6 +62,7 @@ class ThreadCmd(threading.Thread):
             self.name,
             stop_event,
             logger_config=None,
+            engine=engine,
         )
 
     def run(self):
@@ -61,6 +73,11 @@ class ThreadCmd(threading.Thread):
 class CommandProcess:
     """Manages and starts threads of devices and handles communication.
 
+    Besides CommandSendItem objects queue_command takes the control messages
+    "pause" and "resume" (delayed commands), "timers" (answered with
+    ("timers", counts) over queue_status, see TimerRegistry.counts) and
+    ("cancel", module) to cancel the pending delayed commands of a show module.
+
     Args:
          queue_status (queue.Queue or multiprocessing.Queue): queue over which
             received messages will be returned from process.
@@ -74,6 +91,9 @@ class CommandProcess:
             will stop thread when set.
          logger_config (dict or None): pass a queue logger logger config (only when
             using multiprocessing). Default to None.
+         engine (str): "thread" to run every device in its own thread or "asyncio"
+            to run all devices in one event loop (see AsyncCommunicationEngine).
+            Defaults to "thread".
 
     """
 
@@ -85,8 +105,11 @@ class CommandProcess:
         name_thread,
         stop_event,
         logger_config=None,
+        engine="thread",
     ):
         self.stop_event = stop_event
+        self.engine = engine
+        self.async_engine = None
         self.logger_config = logger_config
         self.queue_status = queue_status
         self.queue_command = queue_command
@@ -97,7 +120,7 @@ class CommandProcess:
 
         self.threads = list()  # = treads
         self.signals = dict()
-        self.timers = list()
+        self.timers = None
 
         self.signal_sink = signal("sink_send")
         self.signal_sink.connect(self._subscr_signal_sink)
@@ -118,6 +141,9 @@ class CommandProcess:
 
             ThreadCommunicationBase.set_answer_queue(self.queue_status)
 
+            # must be created in run, the timers run in a thread of this process
+            self.timers = timing.TimerRegistry()
+
             stop_event = threading.Event()
             for name, connection in self.devices.items():
                 thread_device = supported_devices.get(name)(
@@ -131,8 +157,12 @@ class CommandProcess:
             for device in others:
                 self.signals.update({device: self.signal_sink})
 
-            for thread in self.threads:
-                thread.start()
+            if self.engine == "asyncio":
+                self.async_engine = AsyncCommunicationEngine(self.threads)
+                self.async_engine.start()
+            else:
+                for thread in self.threads:
+                    thread.start()
 
             while not self.stop_event.is_set():
                 try:
@@ -142,31 +172,45 @@ class CommandProcess:
                     if isinstance(command_item, str):
                         # command item is a command to pause/resume the delay timers
                         if command_item == "pause":
-                            [t.pause() for t in self.timers]
+                            self.timers.pause()
                         elif command_item == "resume":
-                            [t.resume() for t in self.timers]
+                            self.timers.resume()
                         elif command_item == "next":
                             pass
+                        elif command_item == "timers":
+                            self.queue_status.put(("timers", self.timers.counts()))
+                        continue
+                    elif isinstance(command_item, tuple):
+                        # ("cancel", module): cancel delayed commands of module
+                        if command_item[0] == "cancel":
+                            count = self.timers.cancel(command_item[1])
+                            self.logger.info(
+                                f"cancelled {count} delayed commands of module "
+                                f"{command_item[1]} {self.timers.counts()}"
+                            )
                         continue
                     else:
                         # command item is a actual CommandItem
                         if command_item.delay == 0:
                             self._send_to_thread(command_item)
                         else:
-                            t = timing.PausableTimer(
-                                command_item.delay, self._send_to_thread, command_item
+                            self.timers.start(
+                                command_item.module,
+                                command_item.delay,
+                                self._send_to_thread,
+                                command_item,
                             )
-                            t.start()
-                            self.timers.append(t)
 
                 except queue.Empty:
                     continue
 
             self.logger.info("stop flag set. stopping timers ...")
-            [t.cancel() for t in self.timers]
+            self.timers.cancel_all()
 
             stop_event.set()
             self.logger.info("stop flag set. stopping threads ...")
+            if self.async_engine:
+                self.async_engine.stop()
 
             count = -1
             while count < len(self.threads):
@@ -177,6 +221,11 @@ class CommandProcess:
                     else:
                         count += 1
 
+            # blinker signals are global, stopped devices must not receive commands
+            # of a command process started later in the same interpreter
+            for thread in self.threads:
+                thread.signal.disconnect(thread._put_into_command_queue)
+
             self.logger.info("stop flag set. terminated processcmd")
 
         except Exception as e:
@@ -18,6 +18,9 @@ class ThreadCommunication(ThreadCommunicationBase):
     start_seq = NotImplemented
     end_seq = NotImplemented
 
+    async_transport = "tcp"
+    send_interval = 0.02
+
     def __init__(self, target_ip, target_port, buffer_size=1024, stop_event=None):
         super().__init__(target_ip, target_port, stop_event=stop_event)
         self.target_port = target_port
@@ -30,7 +33,7 @@ class ThreadCommunication(ThreadCommunicationBase):
             self.socket.connect((self.target_ip, self.target_port))
 
             # timeout for socket.recv, also ensures 20ms between each send
-            self.socket.settimeout(0.02)
+            self.socket.settimeout(self.send_interval)
 
             while not self.stop_event.is_set():
 
@@ -32,7 +32,7 @@ class DenonDN500BD(ThreadCommunication):
                     else:
                         self.last_recv = str_recv
 
-                    m2 = None
+                    groups = None
                     command_template = None
 
                     if "ack" in str_recv:
@@ -55,24 +55,22 @@ class DenonDN500BD(ThreadCommunication):
                     elif str_recv.startswith("@0"):
                         mt = ComType.message_status
 
-                        for command_template in self.dict_command_template.values():
-                            if not command_template.answer_analysis:
-                                continue
-                            m2 = re.search(command_template.answer_analysis, str_recv)
-                            if m2:
-                                break
+                        matcher = self.dict_command_template.answer_matcher
+                        command_template, groups = matcher.match(str_recv)
+                        # status answers no template matches are reported as
+                        # unidentifiable
+                        if not command_template:
+                            raise ValueError("string can not be classified")
                     else:
                         raise ValueError("string can not be classified")
 
                     # starts with ack or @0
                     if command_template:
-                        if not m2:
-                            m2 = re.search(command_template.answer_analysis, str_recv)
+                        if groups is None:
+                            groups = command_template.answer_groups(str_recv)
 
-                        if m2:
-                            values = command_template.create_arg_dict(
-                                tuple(m2.groups())
-                            )
+                        if groups is not None:
+                            values = command_template.create_arg_dict(groups)
                         else:
                             values = ()
                     else:
@@ -20,6 +20,11 @@ class ThreadCommunication(ThreadCommunicationBase):
     start_seq = ""
     end_seq = ""
     error_seq = NotImplemented
+    welcome_seq = None
+    """bytes: message of device after connecting, awaited before sending"""
+
+    async_transport = "telnet"
+    send_interval = 0.5
 
     def __init__(self, target_ip, target_port, stop_event=None):
         super().__init__(target_ip, target_port, stop_event=stop_event)
@@ -40,11 +45,11 @@ class ThreadCommunication(ThreadCommunicationBase):
 
                 time_tmp = time.time()
                 # only send new command from queue conditions are met:
-                #  -500ms between commands
+                #  -send_interval (500ms) between commands
                 #  -not waiting for echo of a prev command
                 #  -queue not empty
                 if (
-                    time_tmp - last_send_time > 0.5
+                    time_tmp - last_send_time > self.send_interval
                     and not self.feedback_received
                     and not self._queue_command.empty()
                 ):
@@ -74,7 +79,8 @@ class ThreadCommunication(ThreadCommunicationBase):
 
     def _telnet_login(self, tn):
         """connect with device and provide password if needed. Block until connected."""
-        NotImplemented("please implement")
+        if self.welcome_seq:
+            tn.read_until(self.welcome_seq)
 
     def _combine_command(self, str_command):
         """Adds the start and end sequence to each command string if not already there.
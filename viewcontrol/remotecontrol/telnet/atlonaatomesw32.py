@@ -1,5 +1,3 @@
-import re
-
 from ._threadcommunication import ThreadCommunication
 from ..commanditem import CommandRecvItem
 from ..threadcommunicationbase import ComType
@@ -13,6 +11,7 @@ class AtlonaATOMESW32(ThreadCommunication):
     start_seq = ""
     end_seq = "\r"
     error_seq = r"Command FAILED: \((.*)\)"
+    welcome_seq = b"Welcome to TELNET.\r\n"
 
     def _analyse(self, str_recv):
 
@@ -50,10 +49,10 @@ class AtlonaATOMESW32(ThreadCommunication):
                             mt = ComType.command_success
                     self.feedback_received = False
 
-                    m = re.search(command_template.answer_analysis, str_recv)
+                    groups = command_template.answer_groups(str_recv)
 
-                    if m:
-                        values = command_template.create_arg_dict(tuple(m.groups()))
+                    if groups is not None:
+                        values = command_template.create_arg_dict(groups)
                     else:
                         values = ()
 
@@ -67,6 +66,3 @@ class AtlonaATOMESW32(ThreadCommunication):
                 cai = CommandRecvItem(self.name, None, str_recv, ComType.unidentifiable)
                 self._put_into_answer_queue(cai)
                 return
-
-    def _telnet_login(self, tn):
-        tn.read_until(b"Welcome to TELNET.\r\n")
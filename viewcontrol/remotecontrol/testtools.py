@@ -11,7 +11,6 @@ from tkinter import scrolledtext
 
 from viewcontrol.remotecontrol import supported_devices
 from viewcontrol.remotecontrol.commanditem import CommandSendItem
-from viewcontrol.remotecontrol.commanditem import format_arg_count
 from viewcontrol.remotecontrol.processcmd import ThreadCmd
 from viewcontrol.remotecontrol.processcmd import ProcessCmd
 
@@ -79,7 +78,7 @@ class Application(tk.Frame):
 
     def send_request(self):
         args = self.collect_args()
-        if format_arg_count(self.selected_command.request_composition) == 0:
+        if self.selected_command.number_request_arguments == 0:
             args = ()
         self.logger.info(f"Request: {self.selected_command} {args}")
         self.send_command_item(
@@ -62,6 +62,13 @@ class ThreadCommunicationBase(threading.Thread, abc.ABC):
     device_type = DeviceType.undefined
     """DeviceType: device category/type"""
 
+    async_transport = None
+    """str: name of the protocol in asynccommunication.TRANSPORTS used when the
+    device is run by the AsyncCommunicationEngine. None if not supported."""
+
+    send_interval = 0
+    """float: minimal time in seconds between two commands send to the device"""
+
     dict_command_template = None
     dict_command_template_path = None
 
@@ -215,10 +222,7 @@ class ThreadCommunicationBase(threading.Thread, abc.ABC):
 
         try:
             command_template = self.dict_command_template.get(command_item.command)
-            if command_item.request:
-                str_formatter = command_template.request_object
-            else:
-                str_formatter = command_template.command_composition
+            str_formatter, _ = command_template.composition(command_item.request)
 
             if isinstance(command_item.arguments, dict):
                 arguments = command_template.sorted_tuple_from_dict(
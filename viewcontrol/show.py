@@ -1,13 +1,18 @@
 import abc
+import collections
+import concurrent.futures
+import hashlib
+import logging
 import os
 import pathlib
 import pickle
 import queue
 import re
 import sys
+import time
 from shutil import copyfile
 
-from .remotecontrol.commanditem import CommandSendItem
+from .remotecontrol.commanditem import CommandRecvItem, CommandSendItem
 
 # run in headless environment
 if os.name == "posix" and "DISPLAY" in os.environ:
@@ -18,7 +23,7 @@ from moviepy.video.VideoClip import ColorClip
 from moviepy.video.compositing.CompositeVideoClip import CompositeVideoClip
 from moviepy.video.fx.resize import resize
 from moviepy.video.io.VideoFileClip import VideoFileClip
-from numpy import array, arange
+from moviepy.video.io.ffmpeg_reader import ffmpeg_parse_infos
 from sqlalchemy import Column, Integer, String, Boolean, ForeignKey, Float, Binary
 from sqlalchemy import orm
 from sqlalchemy.ext.declarative import declarative_base
@@ -28,6 +33,7 @@ from wand.image import Image
 
 from viewcontrol.remotecontrol.threadcommunicationbase import ComType
 from .remotecontrol import supported_devices
+from .util.media import content_aspect_ratio, file_hash, store_key, transcode
 
 Base = declarative_base()
 
@@ -357,7 +363,11 @@ class LogicElement(Base):
     _key = Column(Integer, name="key")
     _etype = Column(String(20), name="etype")
 
-    __mapper_args__ = {"polymorphic_on": _etype, "polymorphic_identity": "LogicElement"}
+    __mapper_args__ = {
+        "polymorphic_on": _etype,
+        "polymorphic_identity": "LogicElement",
+        "with_polymorphic": "*",
+    }
 
     def __init__(self, name, key):
         """Create a LogicElement object with the given options.
@@ -488,7 +498,7 @@ class LogicElementManager(ManagerBase):
         if not raw_key:
             key = 1
         else:
-            key = raw_key[0]
+            key = raw_key[0] + 1
         loop_start = LoopStart("LoopStart_{}".format(key), key)
         loop_end = LoopEnd("LoopEnd_{}".format(key), key, cycles)
         return loop_start, loop_end
@@ -534,10 +544,16 @@ class MediaElement(Base):
     _file_path_c = Column(String(200), name="file_path_c")
     _etype = Column(String(10), name="etype")
 
-    __mapper_args__ = {"polymorphic_on": _etype, "polymorphic_identity": "MediaElement"}
+    __mapper_args__ = {
+        "polymorphic_on": _etype,
+        "polymorphic_identity": "MediaElement",
+        "with_polymorphic": "*",
+    }
 
     project_path = None
     content_aspect_ratio = "widescreen"
+    media_store = None
+    """MediaStore: store looked up before writing files of a source, or None"""
     # for debuging only
     _skip_high_workload_functions = False
 
@@ -545,6 +561,10 @@ class MediaElement(Base):
     def set_project_path(cls, path):
         cls.project_path = os.path.expanduser(path)
 
+    @classmethod
+    def set_media_store(cls, store):
+        cls.media_store = store
+
     @classmethod
     def set_content_aspect_ratio(cls, ratio):
         if ratio in ["w", "widescreen", "16:9"]:
@@ -575,6 +595,41 @@ class MediaElement(Base):
                 os.path.relpath(target_file, start=MediaElement.project_path),
             )
 
+    @staticmethod
+    def _reserve_abs_filepath(abs_source, mid, extension):
+        """same as _create_abs_filepath but creates an empty file at the path,
+
+        so files written later in parallel do not get the same path.
+        """
+        target_file, rel_target_file = MediaElement._create_abs_filepath(
+            abs_source, mid, extension
+        )
+        open(target_file, "a").close()
+        return target_file, rel_target_file
+
+    @staticmethod
+    def _store_get(file_path, kind, t_start=0, t_end=None):
+        """look up the files of a source in the media store
+
+        Returns:
+            tuple: IngestResult of the stored files or None, hash of the source
+                or None if no media store is set or the source is not readable
+
+        """
+        if MediaElement.media_store is None or not os.path.isfile(file_path):
+            # the source is not hashed, errors are raised when writing the files
+            return None, None
+        digest = file_hash(file_path)
+        stored = MediaElement.media_store.get(digest, kind, t_start, t_end)
+        return stored, digest
+
+    @staticmethod
+    def _store_add(digest, kind, ingest, t_start=0, t_end=None):
+        """register written files in the media store if the source was hashed"""
+        if digest is not None:
+            MediaElement.media_store.add(digest, kind, ingest, t_start, t_end)
+        return ingest
+
     @property
     def id(self):
         return self._id
@@ -603,6 +658,19 @@ class MediaElement(Base):
         return "{:04d}|{}|{}".format(self.id, type(self), self.name)
 
 
+IngestResult = collections.namedtuple(
+    "IngestResult", ["file_path_w", "file_path_c", "duration"]
+)
+IngestResult.__doc__ = """Files of a media element written into the project folder.
+
+Attributes:
+    file_path_w    (str): path of widescreen version relative to project folder
+    file_path_c    (str): path of cinescope version relative to project folder
+    duration (float or None): duration of a video in seconds
+
+"""
+
+
 class VideoElement(MediaElement):
     """Class for moving MediaElement.
     
@@ -610,6 +678,9 @@ class VideoElement(MediaElement):
         name        (str): name of the media element
         file_path (str): file path to source file, which will be copied and/or
             converted into the media folder defined in the config file
+        ingest (IngestResult, optional): files already written into the project
+            folder from file_path (see Show.media_import_batch). Defaults to
+            None, the files are written by the initializer.
 
     Attributes:
         duration (float): duration in seconds of video clip
@@ -620,50 +691,149 @@ class VideoElement(MediaElement):
 
     __mapper_args__ = {"polymorphic_identity": "VideoElement"}
 
-    def __init__(self, name, file_path, t_start=0, t_end=None):
+    extensions = {".avi", ".m4v", ".mkv", ".mov", ".mp4", ".mpeg", ".mpg", ".webm"}
+    """set: file extensions imported as video by Show.media_import_batch"""
+    transcoder = "ffmpeg"
+    """str: "ffmpeg" writes all versions of a source in one ffmpeg process
+    decoding the source once, "moviepy" composes every version frame by frame"""
+    letterbox_filter = "scale=-2:810,pad=1920:1080:(ow-iw)/2:(oh-ih)/2:black"
+    """str: ffmpeg filter placing 16:9 content in the cinescope area"""
+
+    def __init__(self, name, file_path, t_start=0, t_end=None, ingest=None):
+        if ingest is None:
+            ingest = VideoElement.ingest(file_path, t_start=t_start, t_end=t_end)
+        self._duration = ingest.duration
+        super().__init__(name, ingest.file_path_w, ingest.file_path_c)
 
+    @property
+    def duration(self):
+        return self._duration
+
+    @staticmethod
+    def ingest(file_path, t_start=0, t_end=None):
+        """probe source file and write both versions into the project folder
+
+        The files of a source already in the media store are not written again.
+
+        Returns:
+            IngestResult: paths of the written files and duration
+
+        """
+        stored, digest = MediaElement._store_get(file_path, "video", t_start, t_end)
+        if stored:
+            return stored
+        probe = digest and MediaElement.media_store.probe_get(digest, t_start, t_end)
+        if not probe:
+            probe = VideoElement._probe_video(file_path, t_start, t_end)
+            if digest:
+                MediaElement.media_store.probe_add(digest, probe, t_start, t_end)
+        dur, car = probe
         adst_c, rdst_c = MediaElement._create_abs_filepath(file_path, "_c", ".mp4")
-        dur, car = self._insert_video(
-            file_path, adst_c, cinescope=True, t_start=t_start, t_end=t_end
-        )
-        self._duration = dur
-        content_aspect_ratio = car
-        if content_aspect_ratio == "21:9":
-            adst_w = adst_c
+        targets = {"_c": adst_c}
+        if car == "21:9":
             rdst_w = rdst_c
         else:
             adst_w, rdst_w = MediaElement._create_abs_filepath(file_path, "_w", ".mp4")
-            self._insert_video(
-                file_path,
-                adst_w,
-                content_aspect=content_aspect_ratio,
-                cinescope=False,
-                t_start=t_start,
-                t_end=t_end,
-            )
-        super().__init__(name, rdst_w, rdst_c)
+            targets["_w"] = adst_w
+        VideoElement._write_versions(file_path, targets, car, t_start, t_end)
+        ingest = IngestResult(rdst_w, rdst_c, dur)
+        return MediaElement._store_add(digest, "video", ingest, t_start, t_end)
 
-    @property
-    def duration(self):
-        return self._duration
+    @staticmethod
+    def _probe_video(path_scr, t_start=0, t_end=None):
+        """duration and content aspect ratio ("16:9" or "21:9") of source file
+
+        The content aspect ratio is detected from scaled down keyframes decoded
+        by ffmpeg (see util.media.content_aspect_ratio).
+        """
+        if MediaElement._skip_high_workload_functions:
+            return 42, "16:9"
+
+        t_end = VideoElement._clip_end(path_scr, t_end)
+        return t_end - t_start, content_aspect_ratio(path_scr, t_start, t_end)
+
+    @staticmethod
+    def _clip_end(path_scr, t_end=None):
+        """absolute end in seconds, negative t_end is relative to the end of
+        the source (same as VideoFileClip.subclip)"""
+        duration = ffmpeg_parse_infos(path_scr)["duration"]
+        if t_end is None:
+            return duration
+        elif t_end < 0:
+            return duration + t_end
+        return min(t_end, duration)
+
+    @staticmethod
+    def _write_versions(path_scr, targets, content_aspect, t_start=0, t_end=None):
+        """convert source file into the given versions in project directory
+
+        With the ffmpeg transcoder all versions to be encoded are written in one
+        pass decoding the source once (see util.media.transcode). Versions
+        identical with the source are copied. Wall and CPU time of every pass
+        are logged.
+
+        Args:
+            path_scr (str): path of the source file
+            targets (dict): "_w" or "_c":destination path of the version
+            content_aspect (str): "16:9" or "21:9", see _probe_video
+            t_start (float, optional): see VideoElement. Defaults to 0.
+            t_end (float, optional): see VideoElement. Defaults to None.
 
+        Returns:
+            dict: (versions, ):(wall time, cpu time) in seconds of every pass
+
+        """
+        if MediaElement._skip_high_workload_functions:
+            for path_dst in targets.values():
+                open(path_dst, "a").close()
+            return dict()
+
+        passes = dict()
+        if VideoElement.transcoder == "moviepy":
+            for variant, path_dst in targets.items():
+                start, cpu = time.perf_counter(), sum(os.times()[:4])
+                VideoElement._insert_video(
+                    path_scr, path_dst, content_aspect, variant == "_c", t_start, t_end
+                )
+                passes[(variant,)] = (
+                    time.perf_counter() - start,
+                    sum(os.times()[:4]) - cpu,
+                )
+        else:
+            outputs = dict()
+            for variant, path_dst in targets.items():
+                letterbox = variant == "_c" and content_aspect == "16:9"
+                if letterbox:
+                    outputs[variant] = (path_dst, VideoElement.letterbox_filter)
+                elif t_start > 0 or t_end:
+                    outputs[variant] = (path_dst, None)
+                else:
+                    copyfile(path_scr, path_dst)
+            if outputs:
+                if t_end is not None:
+                    t_end = VideoElement._clip_end(path_scr, t_end)
+                passes[tuple(outputs)] = transcode(
+                    path_scr, list(outputs.values()), t_start, t_end
+                )
+
+        logger = logging.getLogger("media_import")
+        for variants, (wall, cpu) in passes.items():
+            logger.info(
+                f"wrote {'+'.join(variants)} of '{path_scr}' in {wall:.2f}s "
+                f"({cpu:.2f}s cpu, {VideoElement.transcoder})"
+            )
+        return passes
+
+    @staticmethod
     def _insert_video(
-        self,
-        path_scr,
-        path_dst,
-        content_aspect=None,
-        cinescope=True,
-        t_start=0,
-        t_end=None,
+        path_scr, path_dst, content_aspect, cinescope=True, t_start=0, t_end=None
     ):
         """convert source file and save it in project directory"""
         if MediaElement._skip_high_workload_functions:
             open(path_dst, "a").close()
-            return 42, "16:9"
+            return
 
         video_clip = VideoFileClip(path_scr).subclip(t_start=t_start, t_end=t_end)
-        if cinescope:
-            content_aspect = VideoElement._get_video_content_aspect_ratio(video_clip)
         if content_aspect == "16:9" and cinescope:
             # else do nothing cinscope identical with widescreen
             cclip = ColorClip(
@@ -680,53 +850,48 @@ class VideoElement(MediaElement):
             )
         else:
             copyfile(path_scr, path_dst)
-        return video_clip.duration, content_aspect
-
-    @staticmethod
-    def _get_video_content_aspect_ratio(video_file_clip):
-        """anyalyse video for the aspect ratio of its content"""
-        vfc = video_file_clip
-        samples = 5
-        sample_time_step = video_file_clip.duration / samples
-        w = []
-        for t in arange(0, video_file_clip.duration, sample_time_step):
-            frame = video_file_clip.get_frame(t)
-
-            w.append(
-                frame[
-                    [int(vfc.h * 0.125), int(vfc.h * 0.5), int(vfc.h * 0.875)],
-                    0 : vfc.w,
-                ]
-                .mean(axis=2)
-                .mean(axis=1)
-            )
-        w = array(w)
-        wm = w.mean(axis=0)
-
-        if wm[0] < 1 and wm[2] < 1 and wm[1] >= 1:
-            return "21:9"
-        else:
-            return "16:9"
+        video_clip.close()
 
 
 class TextElement(MediaElement):
     """Class for custom-text MediaElement.
 
+    The image of a text is rendered once per (text, font, font_size, resolution)
+    into the render cache (cache_folder in the project folder) and linked to
+    the file of the element, so identical texts of all shows reuse one image.
+
     Args:
         name (str): name of the media element
         text (str): test displayed at playback
     
     """
 
+    _text = Column(String(500), name="text")
+    _render_key = Column(String(64), name="render_key")
+
     __mapper_args__ = {"polymorphic_identity": "TextElement"}
 
+    font = None
+    """str: font name or path of a font file, None for the default font"""
+    font_size = 100
+    resolution = (1920, 1080)
+    cache_folder = "_text_cache"
+    """str: folder in the project folder of the rendered images"""
+
     def __init__(self, name, text):
         if name[0] != "~":
             name = "~" + name
         filename = "_" + name[1:] + ".jpg"
         super().__init__(name, filename, filename)
         self._text = text
-        self._make_text_image(text, self.file_path)
+        self.render()
+
+    @classmethod
+    def set_font(cls, font=None, font_size=100, resolution=(1920, 1080)):
+        """change the font of all texts, see Show.text_elements_render_all"""
+        cls.font = font
+        cls.font_size = font_size
+        cls.resolution = tuple(resolution)
 
     @property
     def text(self):
@@ -735,19 +900,89 @@ class TextElement(MediaElement):
     @text.setter
     def text(self, new_text):
         self._text = new_text
-        self._make_text_image(self.text, self.file_path)
+        self.render()
+
+    @property
+    def stale(self):
+        """bool: image is missing or was rendered with other text or font
+
+        The text of elements created before it was stored is unknown, their image
+        is kept and never stale.
+
+        """
+        if self._text is None:
+            return False
+        return self._render_key != TextElement.render_key(self._text) or (
+            not os.path.exists(self.file_path)
+        )
+
+    @staticmethod
+    def render_key(text):
+        """key of the image of text rendered with the current font"""
+        settings = (text, TextElement.font, TextElement.font_size)
+        settings += tuple(TextElement.resolution)
+        return hashlib.sha256(repr(settings).encode()).hexdigest()
+
+    @staticmethod
+    def cache_path(key):
+        """path of the image with render key in the render cache"""
+        return os.path.join(
+            MediaElement.project_path, TextElement.cache_folder, key + ".jpg"
+        )
+
+    def render(self):
+        """link the image of the text, rendered only if not in the cache"""
+        if self._text is None:
+            return  # text unknown, keep the image
+        key = TextElement.render_key(self._text)
+        cached = TextElement.cache_path(key)
+        if not os.path.exists(cached):
+            TextElement._render_cached(
+                cached,
+                self._text,
+                TextElement.font,
+                TextElement.font_size,
+                TextElement.resolution,
+            )
+        TextElement._link(cached, self.file_path)
+        self._render_key = key
+
+    @staticmethod
+    def _render_cached(path_dst, text, font, font_size, resolution):
+        """render image into the cache, visible only when completely written"""
+        os.makedirs(os.path.dirname(path_dst), exist_ok=True)
+        base, extension = os.path.splitext(path_dst)
+        path_tmp = f"{base}.{os.getpid()}{extension}"
+        TextElement._make_text_image(text, path_tmp, font, font_size, resolution)
+        os.replace(path_tmp, path_dst)
 
     @staticmethod
-    def _make_text_image(text, path_dst):
+    def _link(path_scr, path_dst):
+        """replace path_dst by a hard link (a copy if not possible) of path_scr"""
+        path_tmp = path_dst + ".link"
+        if os.path.exists(path_tmp):
+            os.remove(path_tmp)
+        try:
+            os.link(path_scr, path_tmp)
+        except OSError:
+            copyfile(path_scr, path_tmp)
+        os.replace(path_tmp, path_dst)
+
+    @staticmethod
+    def _make_text_image(
+        text, path_dst, font=None, font_size=100, resolution=(1920, 1080)
+    ):
         """create image with given text and save in project folder"""
         if MediaElement._skip_high_workload_functions:
             open(path_dst, "a").close()
             return
 
+        width, height = resolution
         with Drawing() as draw:
-            with Image(width=1920, height=1080, background=Color("black")) as image:
-                # draw.font = 'wandtests/assets/League_Gothic.otf'
-                draw.font_size = 100
+            with Image(width=width, height=height, background=Color("black")) as image:
+                if font:
+                    draw.font = font
+                draw.font_size = font_size
                 draw.stroke_color = "white"
                 draw.fill_color = "white"
                 draw.text_alignment = "center"
@@ -763,76 +998,141 @@ class StillElement(MediaElement):
         name        (str): name of the media element
         file_path (str): file path to source file, which will be copied and/or
             converted into the media folder defined in the config file
+        ingest (IngestResult, optional): files already written into the project
+            folder from file_path (see Show.media_import_batch). Defaults to
+            None, the files are written by the initializer.
+        page (int, optional): index of the page of a multi-page source (e.g.
+            PDF). Defaults to None, the first page.
 
     
     """
 
     __mapper_args__ = {"polymorphic_identity": "StillElement"}
 
-    def __init__(self, name, file_path):
+    screen_sizes = {"_w": (1920, 1080), "_c": (1920, 810)}
+    """dict: area of the image in the frame of widescreen and cinescope version"""
+    max_upscale = 10
+
+    def __init__(self, name, file_path, ingest=None, page=None):
+        if ingest is None:
+            ingest = StillElement.ingest(file_path, page=page)
+        super().__init__(name, ingest.file_path_w, ingest.file_path_c)
+
+    @staticmethod
+    def target_extension(file_path):
         # TODO add handling for gifs if possible
         _, file_extension = os.path.splitext(file_path)
         if not file_extension == ".gif":
             file_extension = ".jpg"
+        return file_extension
+
+    @staticmethod
+    def store_kind(page=None):
+        """kind of the files in the media store, pages are stored separately"""
+        return "still" if page is None else f"still[{page}]"
+
+    @staticmethod
+    def target_mid(variant, page=None):
+        """mid of the file names of a version, see _create_abs_filepath"""
+        return variant if page is None else f"_p{page + 1}{variant}"
+
+    @staticmethod
+    def page_count(file_path):
+        """number of pages (frames) of a source file, without decoding them"""
+        if MediaElement._skip_high_workload_functions:
+            return 1
+
+        with Image.ping(filename=file_path) as info:
+            return len(info.sequence)
+
+    @staticmethod
+    def ingest(file_path, page=None):
+        """write both versions of source file into the project folder
+
+        The files of a source already in the media store are not written again.
+
+        Returns:
+            IngestResult: paths of the written files
+
+        """
+        kind = StillElement.store_kind(page)
+        stored, digest = MediaElement._store_get(file_path, kind)
+        if stored:
+            return stored
+        file_extension = StillElement.target_extension(file_path)
         adst_w, rdst_w = MediaElement._create_abs_filepath(
-            file_path, "_w", file_extension
+            file_path, StillElement.target_mid("_w", page), file_extension
         )
         adst_c, rdst_c = MediaElement._create_abs_filepath(
-            file_path, "_c", file_extension
+            file_path, StillElement.target_mid("_c", page), file_extension
         )
-        StillElement._insert_image(file_path, adst_w, False)
-        StillElement._insert_image(file_path, adst_c, True)
-        super().__init__(name, rdst_w, rdst_c)
+        StillElement._insert_image(file_path, {"_w": adst_w, "_c": adst_c}, page)
+        ingest = IngestResult(rdst_w, rdst_c, None)
+        return MediaElement._store_add(digest, kind, ingest)
+
+    @staticmethod
+    def _fit_scale(size, screen_size):
+        """scale fitting an image of size into screen_size"""
+        scale = min(screen_size[0] / size[0], screen_size[1] / size[1])
+        if StillElement.max_upscale and scale > StillElement.max_upscale:
+            scale = StillElement.max_upscale
+        return scale
 
     @staticmethod
-    def _insert_image(path_scr, path_dst, cinescope):
+    def _insert_image(path_scr, targets, page=None):
         """Composes images with black background for widescreen and cinescope.
 
+        The source is measured from its header (ping) and decoded once for all
+        versions; a PDF is rasterized with the resolution of the largest version.
+
             To many gif frames are causing a segmentation fault!!
+
+        Args:
+            path_scr (str): path of the source file
+            targets (dict): "_w" or "_c":destination path of the version
+            page (int, optional): index of the page to be imported. Defaults to
+                None, the first page.
+
         """
         if MediaElement._skip_high_workload_functions:
-            open(path_dst, "a").close()
+            for path_dst in targets.values():
+                open(path_dst, "a").close()
             return
 
-        if cinescope:
-            screesize = (1920, 810)
-        else:
-            screesize = (1920, 1080)
-
-        max_upscale = 10
+        if page is not None:
+            path_scr = f"{path_scr}[{page}]"
 
         # check size, if pdf calc resulution to import it in the needed size
-        with Image(filename=path_scr, width=1920) as tmp_scr:
-            a = screesize[0] / tmp_scr.width
-            b = screesize[1] / tmp_scr.height
-            scale = min(a, b)
-            if max_upscale and scale > max_upscale:
-                scale = max_upscale
-            s_size = (int(tmp_scr.width * scale), int(tmp_scr.height * scale))
-
-            if tmp_scr.mimetype == "application/pdf":
-                res = (tmp_scr.resolution[0] * scale, tmp_scr.resolution[1] * scale)
-                scale = 1
+        with Image.ping(filename=path_scr) as info:
+            if info.mimetype == "image/gif":
+                raise Exception("Gifs are not allowed atm")
+            size = (info.width, info.height)
+            sizes = StillElement.screen_sizes
+            scales = {v: StillElement._fit_scale(size, sizes[v]) for v in targets}
+            if info.mimetype == "application/pdf":
+                # rasterized in the size of the largest version
+                decode_scale = max(scales.values())
+                res = tuple(r * decode_scale for r in info.resolution)
             else:
+                decode_scale = 1
                 res = None
 
         with Image(filename=path_scr, resolution=res) as scr:
             scr.colorspace = "rgb"
             scr.format = "jpeg"
-
-            if not scr.mimetype == "image/gif":
-                with Image(width=1920, height=1080, background=Color("black")) as dst:
+            for variant, path_dst in targets.items():
+                scale = scales[variant] / decode_scale
+                with scr.clone() as img, Image(
+                    width=1920, height=1080, background=Color("black")
+                ) as dst:
                     if not scale == 1:
-                        scr.scale(*s_size)
-                        # img.resize(*s_size)
-                    offset_width = int((dst.width - scr.width) / 2)
-                    offset_height = int((dst.height - scr.height) / 2)
+                        img.scale(int(scr.width * scale), int(scr.height * scale))
+                    offset_width = int((dst.width - img.width) / 2)
+                    offset_height = int((dst.height - img.height) / 2)
                     dst.composite(
-                        operator="over", left=offset_width, top=offset_height, image=scr
+                        operator="over", left=offset_width, top=offset_height, image=img
                     )
                     dst.save(filename=path_dst)
-            else:
-                raise Exception("Gifs are not allowed atm")
 
 
 class StartElement(MediaElement):
@@ -843,6 +1143,27 @@ class StartElement(MediaElement):
         super().__init__("viewcontrol", file_path, file_path)
 
 
+def _text_render_stage(skip_high_workload, *args):
+    """render an image of Show.text_elements_render_all in a worker process"""
+    MediaElement._skip_high_workload_functions = skip_high_workload
+    TextElement._render_cached(*args)
+
+
+def _media_ingest_stage(skip_high_workload, stage, *args):
+    """run a stage of Show.media_import_batch in a worker process"""
+    MediaElement._skip_high_workload_functions = skip_high_workload
+    if not os.path.exists(args[0]):
+        raise FileNotFoundError(f"source file '{args[0]}' not found")
+    if stage == "hash":
+        return file_hash(*args)
+    elif stage == "probe":
+        return VideoElement._probe_video(*args)
+    elif stage == "video":
+        return VideoElement._write_versions(*args)
+    else:
+        return StillElement._insert_image(*args)
+
+
 class MediaElementManager(ManagerBase):
     """Manager for all media elemets at runtime and in database.
 
@@ -867,6 +1188,201 @@ class MediaElementManager(ManagerBase):
         return self._session.query(MediaElement).all()
 
 
+class MediaStoreEntry(Base):
+    """File in the project folder written from a source file.
+
+    Args:
+        key       (str): hash of the source and transcode parameters, see
+            util.media.store_key
+        file_path (str): path of the file relative to the project folder
+        duration  (float or None): duration of a video in seconds
+
+    Attributes:
+        refcount  (int): number of media elements using the file
+
+    """
+
+    __tablename__ = "media_store"
+    _id = Column(Integer, primary_key=True, name="id")
+    _key = Column(String(120), name="key", unique=True)
+    _file_path = Column(String(200), name="file_path")
+    _duration = Column(Float, name="duration")
+    refcount = Column(Integer, default=0, name="refcount")
+
+    @property
+    def key(self):
+        return self._key
+
+    @property
+    def file_path(self):
+        return self._file_path
+
+    @property
+    def duration(self):
+        return self._duration
+
+    def __init__(self, key, file_path, duration=None):
+        self._key = key
+        self._file_path = file_path
+        self._duration = duration
+        self.refcount = 0
+
+
+class MediaProbe(Base):
+    """Duration and content aspect ratio of a video, see VideoElement._probe_video
+
+    Args:
+        key      (str): hash of the source and t_start/t_end, see
+            util.media.store_key
+        duration (float): duration of the used part of the video in seconds
+        aspect   (str): content aspect ratio, "16:9" or "21:9"
+
+    """
+
+    __tablename__ = "media_probe"
+    _id = Column(Integer, primary_key=True, name="id")
+    _key = Column(String(120), name="key", unique=True)
+    _duration = Column(Float, name="duration")
+    _aspect = Column(String(5), name="aspect")
+
+    def __init__(self, key, duration, aspect):
+        self._key = key
+        self._duration = duration
+        self._aspect = aspect
+
+
+class MediaStore:
+    """Content-addressed index of the media files in the project folder.
+
+    The files written from a source are registered under the hash of the source
+    content and the transcode parameters (aspect variant, t_start/t_end, see
+    util.media.store_key). Importing the same content again, from any path,
+    references the files already written instead of transcoding it again.
+    The reference count of an entry is increased for every media element using
+    its file. It is never decreased, since media elements are not deleted one by
+    one (ManagerBase.element_delete); recount rebuilds the counts from the media
+    elements in the database and collect_garbage calls it before removing the
+    files no media element uses anymore. Probe results of videos are cached by the same
+    hash and kept by collect_garbage.
+
+    Args:
+        session (sqlalchemy.orm.Session): database session
+
+    """
+
+    variants = ("_w", "_c")
+    """tuple: aspect variants written for every source"""
+
+    def __init__(self, session):
+        self._session = session
+
+    def _entry(self, key):
+        """entry with key, None if not stored or the file was deleted"""
+        entry = (
+            self._session.query(MediaStoreEntry)
+            .filter(MediaStoreEntry._key == key)
+            .first()
+        )
+        if entry and not os.path.exists(
+            os.path.join(MediaElement.project_path, entry.file_path)
+        ):
+            self._session.delete(entry)
+            return None
+        return entry
+
+    def get(self, digest, kind, t_start=0, t_end=None):
+        """files written from a source, referenced by a new media element
+
+        Args:
+            digest (str): hash of the source file (see util.media.file_hash)
+            kind   (str): "video" or "still"
+            t_start (float, optional): see VideoElement. Defaults to 0.
+            t_end (float, optional): see VideoElement. Defaults to None.
+
+        Returns:
+            IngestResult: stored files, None if not all variants are stored
+
+        """
+        entries = [
+            self._entry(store_key(digest, kind, variant, t_start, t_end))
+            for variant in self.variants
+        ]
+        if not all(entries):
+            return None
+        for entry in entries:
+            entry.refcount += 1
+        entry_w, entry_c = entries
+        return IngestResult(entry_w.file_path, entry_c.file_path, entry_c.duration)
+
+    def add(self, digest, kind, ingest, t_start=0, t_end=None):
+        """register files written from a source for a new media element
+
+        Args:
+            digest (str): hash of the source file (see util.media.file_hash)
+            kind   (str): "video" or "still"
+            ingest (IngestResult): written files
+            t_start (float, optional): see VideoElement. Defaults to 0.
+            t_end (float, optional): see VideoElement. Defaults to None.
+
+        """
+        for variant, file_path in zip(
+            self.variants, (ingest.file_path_w, ingest.file_path_c)
+        ):
+            key = store_key(digest, kind, variant, t_start, t_end)
+            entry = self._entry(key)
+            if entry is None:
+                entry = MediaStoreEntry(key, file_path, ingest.duration)
+                self._session.add(entry)
+            entry.refcount += 1
+
+    def probe_get(self, digest, t_start=0, t_end=None):
+        """cached probe result of a video
+
+        Returns:
+            tuple: duration and content aspect ratio, None if not probed yet
+
+        """
+        key = store_key(digest, "probe", "", t_start, t_end)
+        probe = self._session.query(MediaProbe).filter(MediaProbe._key == key).first()
+        return (probe._duration, probe._aspect) if probe else None
+
+    def probe_add(self, digest, probe, t_start=0, t_end=None):
+        """cache probe result (duration, content aspect ratio) of a video"""
+        key = store_key(digest, "probe", "", t_start, t_end)
+        if self.probe_get(digest, t_start, t_end) is None:
+            self._session.add(MediaProbe(key, *probe))
+
+    def recount(self):
+        """set the reference counts to the media elements using the files"""
+        references = collections.Counter()
+        for element in self._session.query(MediaElement):
+            references.update({element._file_path_w, element._file_path_c})
+        for entry in self._session.query(MediaStoreEntry):
+            entry.refcount = references[entry.file_path]
+
+    def collect_garbage(self):
+        """remove entries and files not used by any media element
+
+        Returns:
+            list<str>: removed files relative to the project folder
+
+        """
+        self.recount()
+        removed = list()
+        for entry in self._session.query(MediaStoreEntry).filter(
+            MediaStoreEntry.refcount == 0
+        ):
+            self._session.delete(entry)
+            if entry.file_path in removed:
+                continue  # same file for both variants
+            file_path = os.path.join(MediaElement.project_path, entry.file_path)
+            if os.path.exists(file_path):
+                os.remove(file_path)
+            removed.append(entry.file_path)
+        self._session.commit()
+        return removed
+
+
 class SequenceModule(Base):
     """Object of a Playlist
 
@@ -892,6 +1408,8 @@ class SequenceModule(Base):
         logic_element
         media_element_id
         media_element
+        tracks      (dict): screen:media element played instead of media_element
+            on the screen
 
     """
 
@@ -912,6 +1430,9 @@ class SequenceModule(Base):
     _list_commands = orm.relationship(
         "ModuleCommand", back_populates="sequence_module", cascade="all, delete-orphan"
     )
+    _screen_tracks = orm.relationship(
+        "ScreenTrack", back_populates="sequence_module", cascade="all, delete-orphan"
+    )
 
     def __init__(
         self, sequence_name, position, element=None, time=None, list_commands=[]
@@ -980,6 +1501,28 @@ class SequenceModule(Base):
     def list_commands(self):
         return [command.command for command in self._list_commands]
 
+    @property
+    def tracks(self):
+        return {track.screen: track.media_element for track in self._screen_tracks}
+
+    def track_set(self, screen, element):
+        """play media element instead of the media element of module on screen"""
+        if not self._media_element:
+            raise Exception("SequenceModule contains no media element.")
+        for track in self._screen_tracks:
+            if track.screen == screen:
+                track.media_element = element
+                return
+        self._screen_tracks.append(ScreenTrack(screen, element))
+
+    def track_remove(self, screen):
+        """play the media element of the module again on screen"""
+        for track in self._screen_tracks:
+            if track.screen == screen:
+                self._screen_tracks.remove(track)
+                return True
+        return False
+
     def _element_set(self, element):
         """set element depending of class"""
         if not element:
@@ -1066,6 +1609,8 @@ class SequenceModule(Base):
         )
         for cmd in self.list_commands:
             copy.command_add(cmd)
+        for screen, element in self.tracks.items():
+            copy.track_set(screen, element)
         return copy
 
     @staticmethod
@@ -1073,6 +1618,51 @@ class SequenceModule(Base):
         return SequenceModule("None", 0, element=StartElement(), time=5)
 
 
+class ScreenTrack(Base):
+    """Media element of a SequenceModule played on one screen.
+
+    With several outputs (screens) every output plays the media element of the
+    module, unless the module has a track for its screen. All outputs switch to
+    the next module together, the duration of the module is the one of its own
+    media element: a longer track is cut, a shorter one holds its last frame.
+
+    Args:
+        screen (int): screen number of the output, see option --screen
+        element (MediaElement): element played on the screen
+
+    """
+
+    __tablename__ = "screen_track"
+    _id = Column(Integer, primary_key=True, name="id")
+    _sequence_module_id = Column(
+        Integer, ForeignKey("sequence_module.id"), name="sequence_module_id"
+    )
+    sequence_module = orm.relationship(
+        "SequenceModule", back_populates="_screen_tracks"
+    )
+    _screen = Column(Integer, name="screen")
+    _media_element_id = Column(
+        Integer, ForeignKey("media_element.id"), name="media_element_id"
+    )
+    _media_element = orm.relationship("MediaElement", foreign_keys=[_media_element_id])
+
+    def __init__(self, screen, element):
+        self._screen = screen
+        self._media_element = element
+
+    @property
+    def screen(self):
+        return self._screen
+
+    @property
+    def media_element(self):
+        return self._media_element
+
+    @media_element.setter
+    def media_element(self, element):
+        self._media_element = element
+
+
 class AssociationCommand(Base):
     """Association Table for Many to Many Relationships,
 
@@ -1142,6 +1732,7 @@ class CommandObject(Base):
     __mapper_args__ = {
         "polymorphic_on": _etype,
         "polymorphic_identity": "AssosciationCommand",
+        "with_polymorphic": "*",
     }
 
     def __init__(self, name, device, command, arguments=()):
@@ -1239,7 +1830,11 @@ class EventModule(Base):
     )
     _jump_to_target_element = orm.relationship("JumpToTarget")
 
-    __mapper_args__ = {"polymorphic_on": _etype, "polymorphic_identity": "EventModule"}
+    __mapper_args__ = {
+        "polymorphic_on": _etype,
+        "polymorphic_identity": "EventModule",
+        "with_polymorphic": "*",
+    }
 
     def __init__(self, sequence_name, name):
         self._sequence_name = sequence_name
@@ -1310,6 +1905,11 @@ class EventModule(Base):
         copy._jump_to_target_element = self._jump_to_target_element
         return copy
 
+    @property
+    def dispatch_key(self):
+        """key of the event in the EventIndex, None if never dispatched"""
+        return None
+
     @abc.abstractmethod
     def check_event(self, data):
         raise NotImplementedError()
@@ -1338,6 +1938,10 @@ class KeyEventModule(EventModule):
         )
         return self._copy_super_attributes(copy)
 
+    @property
+    def dispatch_key(self):
+        return ("KeyEvent", self.key_name, self.key_event, None)
+
     def check_event(self, data):
         if "pyinput" not in sys.modules:
             key = pynput.keyboard.Key[self.key_name]
@@ -1427,18 +2031,53 @@ class ComEventModule(EventModule):
         copy._match_regex = self._match_regex
         return self._copy_super_attributes(copy)
 
+    @property
+    def match_regex(self):
+        """compiled match regex, compiled only once per pattern"""
+        if not self._match_regex:
+            return None
+        compiled = getattr(self, "_match_regex_compiled", None)
+        if compiled is None or compiled.pattern != self._match_regex:
+            compiled = re.compile(self._match_regex)
+            self._match_regex_compiled = compiled
+        return compiled
+
+    @property
+    def dispatch_key(self):
+        # regex events are checked against all commands of the device
+        name_command = None if self._match_regex else self._name_command
+        return ("ComEvent", self._device, name_command, self.com_type)
+
     def check_event(self, data):
-        if data.combo_device == self._device:
-            if data.type == self.com_type:
-                if data.full_answer and self.match_parameters:
-                    if data.full_answer[0] == self._name_command:
-                        if list(self.match_parameters) == data.full_answer[1]:
-                            return True
-                elif self._match_regex:
-                    if re.fullmatch(self._match_regex, data.recv_answer_string):
-                        return True
+        """check if received CommandRecvItem matches event
+
+        Either the command name and all values must be equal to the match
+        parameters or the values must fully match the regex.
+
+        """
+        if data.device == self._device and data.message_type == self.com_type:
+            if self._match_regex:
+                if self.match_regex.fullmatch(ComEventModule.values_string(data)):
+                    return True
+            elif self.match_parameters and data.command == self._name_command:
+                values = data.values
+                if isinstance(values, dict):
+                    values = values.values()
+                if self.match_parameters == tuple(str(v) for v in values or ()):
+                    return True
         return False
 
+    @staticmethod
+    def values_string(data):
+        """values of CommandRecvItem as string to be matched by regex"""
+        if isinstance(data.values, str):
+            return data.values
+        elif isinstance(data.values, dict):
+            return " ".join(str(v) for v in data.values.values())
+        elif data.values:
+            return " ".join(str(v) for v in data.values)
+        return ""
+
 
 class ShowEvent(EventModule):
 
@@ -1494,6 +2133,213 @@ class EventModuleManager(ManagerBase):
         return self._session.query(EventModule).all()
 
 
+class EventIndex:
+    """Dispatch index of the event modules of a show.
+
+    Modules are indexed by their dispatch key (event type, device or key name,
+    command name or key event, ComType), so received messages are only checked
+    against the few modules which can match instead of all events of the show.
+
+    Args:
+        modules (list<EventModule>): event modules of the show
+
+    """
+
+    def __init__(self, modules):
+        self._index = dict()
+        for mod in sorted(modules, key=lambda mod: mod.id or 0):
+            key = mod.dispatch_key
+            if key is not None:
+                self._index.setdefault(key, []).append(mod)
+
+    def __len__(self):
+        return sum(len(mods) for mods in self._index.values())
+
+    @staticmethod
+    def keys_of(data):
+        """dispatch keys of received data
+
+        Args:
+            data (CommandRecvItem or tuple): received message or key event
+                tuple ("KeyEvent", key, event)
+
+        """
+        if isinstance(data, CommandRecvItem):
+            keys = [("ComEvent", data.device, None, data.message_type)]
+            if data.command is not None:
+                keys.append(("ComEvent", data.device, data.command, data.message_type))
+            return keys
+        elif isinstance(data, tuple) and data and data[0] == "KeyEvent":
+            name = getattr(data[1], "name", None)
+            return [("KeyEvent", name, data[2], None)]
+        return []
+
+    def candidates(self, data):
+        """event modules with the same dispatch key as data"""
+        mods = list()
+        for key in EventIndex.keys_of(data):
+            mods.extend(self._index.get(key, ()))
+        return mods
+
+    def match(self, data):
+        """event modules triggered by received data"""
+        return [mod for mod in self.candidates(data) if mod.check_event(data)]
+
+
+PlanItem = collections.namedtuple(
+    "PlanItem", ["module", "file_path", "duration", "still", "commands", "tracks"]
+)
+PlanItem.__doc__ = """Playable entry of a PlaybackPlan.
+
+Attributes:
+    module   (SequenceModule): module the item was compiled from
+    file_path           (str): absolute path of file to be played
+    duration   (float or None): duration of the module in seconds
+    still              (bool): True if the duration has to be enforced by the
+        player (StillElement and TextElement)
+    commands (tuple<CommandSendObject>): commands to be send with the module
+    tracks             (dict): screen:absolute path of the file played instead of
+        file_path on the screen (see ScreenTrack)
+
+"""
+
+
+class PlaybackPlan:
+    """Flat playback plan compiled from the modules of a show.
+
+    Everything that does not change during playback is resolved once at compile
+    time: file paths (including the check if the file exists), durations,
+    command lists, the LoopStart belonging to each LoopEnd and a jump table
+    indexed by the id of the JumpToTarget elements. Logic modules and modules
+    with missing files are skipped via a precomputed table, so advancing in the
+    show is an index lookup.
+
+    The plan is immutable, the playback state (position and loop counters) is
+    kept by the caller. Items are taken from and stored in item_cache, so after
+    editing a show only the changed modules must be compiled again.
+
+    Args:
+        modules (list<SequenceModule>): modules of the show sorted by position
+        item_cache (dict, optional): cache of compiled items with the module as
+            key, Defaults to None.
+
+    Attributes:
+        jump_table (dict): index of the JumpToTarget module by element id
+
+    """
+
+    _MEDIA = 0
+    _SKIP = 1
+    _LOOP_END = 2
+
+    def __init__(self, modules, item_cache=None):
+        if item_cache is None:
+            item_cache = dict()
+        ops = list()
+        loop_starts = dict()
+        self.jump_table = dict()
+        for index, module in enumerate(modules):
+            logic = module.logic_element
+            if logic is None:
+                item = item_cache.get(module)
+                if item is None:
+                    item = PlaybackPlan.compile_item(module)
+                    item_cache[module] = item
+                if os.path.exists(item.file_path):
+                    ops.append((self._MEDIA, item))
+                else:
+                    ops.append((self._SKIP, None))
+            elif isinstance(logic, LoopEnd):
+                ops.append((self._LOOP_END, (logic.key, logic.cycles)))
+            else:
+                if isinstance(logic, LoopStart):
+                    loop_starts.setdefault(logic.key, index)
+                elif isinstance(logic, JumpToTarget):
+                    self.jump_table[logic.id] = index
+                ops.append((self._SKIP, None))
+
+        # resolve loop targets after all LoopStart elements are known
+        for index, (op, arg) in enumerate(ops):
+            if op == self._LOOP_END:
+                ops[index] = (op, (loop_starts.get(arg[0]),) + arg)
+        self._ops = tuple(ops)
+
+        # index of next module which is not skipped (including itself)
+        next_index = [len(ops)] * (len(ops) + 1)
+        for index in range(len(ops) - 1, -1, -1):
+            if ops[index][0] == self._SKIP:
+                next_index[index] = next_index[index + 1]
+            else:
+                next_index[index] = index
+        self._next_index = tuple(next_index)
+        self._placeholder = None
+
+    def __len__(self):
+        return len(self._ops)
+
+    @staticmethod
+    def compile_item(module):
+        """compile a module containing a media element into a PlanItem"""
+        media = module.media_element
+        still = isinstance(media, (StillElement, TextElement))
+        tracks = {
+            screen: element.file_path for screen, element in module.tracks.items()
+        }
+        return PlanItem(
+            module,
+            media.file_path,
+            module.time,
+            still,
+            tuple(module.list_commands),
+            tracks,
+        )
+
+    @property
+    def placeholder(self):
+        """item displaying the program picture, used at the end of the show"""
+        if not self._placeholder:
+            self._placeholder = PlaybackPlan.compile_item(
+                SequenceModule.viewcontroll_placeholder()
+            )
+        return self._placeholder
+
+    def item_at(self, index):
+        """returns the PlanItem at given index or None for skipped modules"""
+        op, arg = self._ops[index]
+        if op == self._MEDIA:
+            return arg
+        return None
+
+    def resolve(self, index, loop_counters):
+        """returns index of the playable item to be played at given index
+
+        Skips logic modules and missing files and handles loops. The loop
+        counters are changed when a loop is repeated.
+
+        Args:
+            index          (int): index to be resolved
+            loop_counters (dict): repetitions of loops by key of the loop
+
+        Returns:
+            int or None: index of the item, None if the end of the show is reached
+
+        """
+        while index < len(self._ops):
+            index = self._next_index[index]
+            if index == len(self._ops):
+                break
+            op, arg = self._ops[index]
+            if op == self._MEDIA:
+                return index
+            start, key, cycles = arg
+            if start is not None and loop_counters.get(key, 0) < cycles:
+                loop_counters[key] = loop_counters.get(key, 0) + 1
+                index = start + 1
+            else:
+                index += 1
+        return None
+
+
 class Show:
     """SequenceObjectManager/PlaylistManager
 
@@ -1520,6 +2366,8 @@ class Show:
             SequenceElements in sequence)
         sequence (List<SequenceElement>): Playlist list of all SequenceElements  
         session (sqlalchemy.orm.Session): database session
+        jumped                    (bool): True if the last call of item_next
+            followed a JumpToTarget element
 
     """
 
@@ -1529,13 +2377,21 @@ class Show:
         self._session = Show.create_session(self._show_project_folder)
         MediaElement.set_project_path(self._show_project_folder)
         MediaElement.set_content_aspect_ratio(content_aspect_ratio)
+        self._media_store = MediaStore(self._session)
+        MediaElement.set_media_store(self._media_store)
         self._mm = MediaElementManager(self._session)
         self._lm = LogicElementManager(self._session)
         self._cm = CommandObjectManager(self._session)
         self._em = EventModuleManager(self._session)
         self._sequence = list()
+        self._module_name_index = dict()
         self._event_list = list()
+        self._event_index = None
         self._current_pos = 0
+        self._loop_counters = dict()
+        self.jumped = False
+        self._plan = None
+        self._plan_item_cache = dict()
         self.show_options = ShowOptions(self._session)
 
     def _find_jumptotarget_elements(self):
@@ -1556,12 +2412,19 @@ class Show:
 
     @property
     def playlist(self):
-        return sorted(self._sequence, key=lambda mod: mod.position)
+        return list(self._sequence)
 
     @property
     def eventlist(self):
         return sorted(self._event_list, key=lambda mod: mod._id)
 
+    @property
+    def event_index(self):
+        """EventIndex of the event modules of the loaded show"""
+        if self._event_index is None:
+            self._event_index = EventIndex(self._event_list)
+        return self._event_index
+
     @property
     def list_media(self):
         """list all media elements saved in db (not associated with shows)"""
@@ -1591,28 +2454,30 @@ class Show:
     @property
     def module_current(self):
         """returns current element"""
-        obj = self._module_get_at_pos(self._current_pos)
-        if not obj:
-            raise Exception("playlist at end")
-        if obj.logic_element:
-            if isinstance(obj.logic_element, LoopEnd):
-                if obj.logic_element.counter < obj.logic_element.cycles:
-                    for s in self._sequence:
-                        if (
-                            isinstance(s.logic_element, LoopStart)
-                            and s.logic_element.key == obj.logic_element.key
-                        ):
-                            self._current_pos = s.position
-                            break
-                    obj.logic_element.counter = obj.logic_element.counter + 1
-
-            return self.next()
-        else:
-            if os.path.exists(obj.media_element.file_path):
-                return obj
-            else:
-                self.next()
-                return self.module_current
+        return self.item_current.module
+
+    @property
+    def item_current(self):
+        """returns PlanItem of current element
+
+        Logic modules and modules with missing files are skipped and loops are
+        handled, see PlaybackPlan.
+
+        """
+        self._position_check(self._current_pos)
+        pos = self.plan.resolve(self._current_pos, self._loop_counters)
+        if pos is None:
+            self._current_pos = len(self._sequence) - 1
+            return self.plan.placeholder
+        self._current_pos = pos
+        return self.plan.item_at(pos)
+
+    @property
+    def plan(self):
+        """PlaybackPlan of the loaded show, compiled again after edits"""
+        if self._plan is None:
+            self._plan = PlaybackPlan(self._sequence, self._plan_item_cache)
+        return self._plan
 
     @property
     def count(self):
@@ -1657,18 +2522,57 @@ class Show:
         else:
             return False  # error code: name already exists
 
-    def show_load(self, name):
+    def show_load(self, name, detach=False):
+        """load show with all its elements and commands from database
+
+        All relationships needed for playback are loaded eagerly, so loading a
+        show issues a constant number of queries independent of its length.
+
+        Args:
+            name     (str): name of the show
+            detach (bool, optional): remove the loaded modules, elements and
+                commands from the session, so playback never touches the
+                database again. A detached show can not be edited, load it again
+                without detach to do so. Defaults to False.
+
+        """
         if name in self.show_list:
             self.show_close()
             self._show_name = name
             self._module_load_from_db()
             self._event_module_load_from_db()
+            self._event_index = EventIndex(self._event_list)
             self._find_jumptotarget_elements()
             self._happened_event_queue = queue.Queue()
+            self._current_pos = 0
+            self._loop_counters = dict()
+            self._plan_invalidate()
+            if self._sequence:
+                self._plan = PlaybackPlan(self._sequence, self._plan_item_cache)
+            if detach:
+                self._show_detach()
             return True
         else:
             return False  # error code: name already exists
 
+    def _show_detach(self):
+        """expunge loaded modules and everything they reference from session"""
+        objects = set()
+        for mod in self._sequence:
+            objects.update((mod, mod.media_element, mod.logic_element))
+            objects.update(mod._list_commands)
+            objects.update(mod.list_commands)
+            objects.update(mod._screen_tracks)
+            objects.update(mod.tracks.values())
+        for mod in self._event_list:
+            objects.update((mod, mod.jump_to_target_element))
+            objects.update(mod._list_commands)
+            objects.update(mod.list_commands)
+        objects.discard(None)
+        for obj in objects:
+            if obj in self._session:
+                self._session.expunge(obj)
+
     def show_copy(self, name_scr_show, name_new_show):
         current_show_save = None
         if not self.show_name == name_scr_show:
@@ -1718,6 +2622,10 @@ class Show:
 
     def show_close(self):
         self._sequence = list()
+        self._module_name_index = dict()
+        self._event_list = list()
+        self._event_index = None
+        self._plan_invalidate()
         self.show = None
         return True
 
@@ -1793,15 +2701,352 @@ class Show:
     def module_text_change_text(self, pos, new_text):
         return self._module_text_change_text(self._module_get_at_pos(pos), new_text)
 
+    def text_elements_render_all(self, force=False, max_workers=None):
+        """render the images of all text elements of the project in parallel
+
+        Images missing in the render cache are rendered in a pool of processes,
+        each distinct text once, then linked to the elements whose image is
+        missing or stale (e.g. after TextElement.set_font). Use after setting up
+        a show or to regenerate the whole project after a font change.
+
+        Args:
+            force (bool, optional): render all images again, even if in the
+                render cache. Defaults to False.
+            max_workers (int, optional): number of processes. Defaults to None,
+                the number of processors of the machine.
+
+        Returns:
+            list<TextElement>: elements with a new image
+
+        """
+        logger = logging.getLogger("text_render")
+        elements = [
+            element
+            for element in self._mm.elements
+            if isinstance(element, TextElement)
+            and element.text is not None
+            and (force or element.stale)
+        ]
+        texts = {element.render_key(element.text): element.text for element in elements}
+        missing = {
+            key: text
+            for key, text in texts.items()
+            if force or not os.path.exists(TextElement.cache_path(key))
+        }
+
+        failed = set()
+        if missing:
+            skip = MediaElement._skip_high_workload_functions
+            with concurrent.futures.ProcessPoolExecutor(max_workers) as pool:
+                futures = {
+                    pool.submit(
+                        _text_render_stage,
+                        skip,
+                        TextElement.cache_path(key),
+                        text,
+                        TextElement.font,
+                        TextElement.font_size,
+                        TextElement.resolution,
+                    ): key
+                    for key, text in missing.items()
+                }
+                for future in concurrent.futures.as_completed(futures):
+                    try:
+                        future.result()
+                    except Exception as ex:
+                        key = futures[future]
+                        failed.add(key)
+                        logger.error(f"rendering '{missing[key]}' failed: {ex}")
+            logger.info(f"rendered {len(missing) - len(failed)} images")
+
+        rendered = list()
+        for element in elements:
+            if TextElement.render_key(element.text) not in failed:
+                element.render()
+                rendered.append(element)
+        self._session.commit()
+        return rendered
+
     def module_add_video(self, name, file_path, t_start=0, t_end=None, **kwargs):
         """add a module coonatining a StillElement"""
         e = VideoElement(name, file_path, t_start=t_start, t_end=t_end)
         return self._module_add(e, **kwargs)
 
+    def module_add_slides(
+        self, name, file_path, time, pages=None, max_workers=None, pos=None
+    ):
+        """add a module containing a StillElement for every page of a document
+
+        The pages of a multi-page source (e.g. a PDF slide deck) are rasterized
+        in a pool of processes, both versions of a page from one decode. Pages
+        already in the media store are not rasterized again. The modules are
+        added in page order, their elements are named name_1, name_2, ...
+
+        Args:
+            name (str): name of the elements, the page number is appended
+            file_path (str): path of the document
+            time (float): display duration of every page in seconds
+            pages (iterable<int>, optional): indices of the pages to import.
+                Defaults to None, all pages.
+            max_workers (int, optional): number of processes. Defaults to None,
+                the number of processors of the machine.
+            pos (int, optional): position of the first page. Defaults to None,
+                at the end of the show.
+
+        Returns:
+            bool: True if all pages were added, pages which could not be
+                imported are skipped
+
+        """
+        logger = logging.getLogger("media_import")
+        if pages is None:
+            pages = range(StillElement.page_count(file_path))
+        skip = MediaElement._skip_high_workload_functions
+        digest = file_hash(file_path)
+        extension = StillElement.target_extension(file_path)
+        ingests = dict()  # page:IngestResult
+
+        with concurrent.futures.ProcessPoolExecutor(max_workers) as pool:
+            futures = dict()  # future:(page, targets)
+            for page in pages:
+                kind = StillElement.store_kind(page)
+                ingests[page] = self._media_store.get(digest, kind)
+                if ingests[page]:
+                    continue
+                targets = dict()
+                for variant in ("_w", "_c"):
+                    mid = StillElement.target_mid(variant, page)
+                    targets[variant] = MediaElement._reserve_abs_filepath(
+                        file_path, mid, extension
+                    )
+                future = pool.submit(
+                    _media_ingest_stage,
+                    skip,
+                    "still",
+                    file_path,
+                    {variant: target[0] for variant, target in targets.items()},
+                    page,
+                )
+                futures[future] = (page, targets)
+
+            for future in concurrent.futures.as_completed(futures):
+                page, targets = futures[future]
+                try:
+                    future.result()
+                except Exception as ex:
+                    logger.error(f"import of page {page + 1} failed: {ex}")
+                    ingests[page] = None
+                    for target, _ in targets.values():
+                        if os.path.exists(target):
+                            os.remove(target)
+                else:
+                    ingests[page] = IngestResult(
+                        targets["_w"][1], targets["_c"][1], None
+                    )
+                    self._media_store.add(
+                        digest, StillElement.store_kind(page), ingests[page]
+                    )
+
+        for page, ingest in ingests.items():
+            if ingest is None:
+                continue
+            element = StillElement(
+                f"{name}_{page + 1}", file_path, ingest=ingest, page=page
+            )
+            self._module_add(element, pos=pos, time=time)
+            if pos is not None:
+                pos += 1
+        logger.info(f"added {sum(map(bool, ingests.values()))} pages of '{file_path}'")
+        return all(ingests.values())
+
+    def media_collect_garbage(self):
+        """delete files of the media store no media element uses anymore
+
+        Returns:
+            list<str>: deleted files relative to the project folder
+
+        """
+        return self._media_store.collect_garbage()
+
+    def media_import_batch(self, paths, max_workers=None, progress=None):
+        """import media files into the project folder in parallel
+
+        Hashing of the sources, probing and detection of the content aspect
+        ratio of videos and writing the widescreen and cinescope versions of all
+        files run in a pool of processes. Sources already in the media store
+        and repeats of a source in paths are not written again but reference
+        the stored files (see MediaStore). Every element is added to the
+        database (one commit per element) as soon as its files are written.
+        Files with an extension in VideoElement.extensions are imported as
+        VideoElement, all others as StillElement; the file name is used as name
+        of the element.
+
+        Args:
+            paths (list<str>): source files to import
+            max_workers (int, optional): number of processes. Defaults to None,
+                the number of processors of the machine.
+            progress (function, optional): called after each finished file with
+                (done, total, path, element), element is None if import failed.
+
+        Returns:
+            list<MediaElement>: imported elements in the order of paths, None
+                for files which could not be imported
+
+        """
+        logger = logging.getLogger("media_import")
+        skip = MediaElement._skip_high_workload_functions
+        elements = [None] * len(paths)
+        running = dict()  # future:(index, stage)
+        items = dict()  # index:[outstanding stages, files, IngestResult, error, hash]
+        writing = dict()  # (hash, kind):index of the item writing the files
+        waiting = collections.defaultdict(list)  # index:items waiting for its files
+        done = 0
+
+        def kind(index):
+            extension = os.path.splitext(paths[index])[1].lower()
+            return "video" if extension in VideoElement.extensions else "still"
+
+        with concurrent.futures.ProcessPoolExecutor(max_workers) as pool:
+
+            def submit(index, stage, *args):
+                future = pool.submit(_media_ingest_stage, skip, stage, *args)
+                running[future] = (index, stage)
+                items[index][0] += 1
+
+            def reserve(index, mid, extension):
+                target, rel_target = MediaElement._reserve_abs_filepath(
+                    paths[index], mid, extension
+                )
+                items[index][1].append(target)
+                return target, rel_target
+
+            def write_video(index, duration, aspect):
+                adst_c, rdst_c = reserve(index, "_c", ".mp4")
+                targets = {"_c": adst_c}
+                if aspect == "21:9":
+                    rdst_w = rdst_c
+                else:
+                    adst_w, rdst_w = reserve(index, "_w", ".mp4")
+                    targets["_w"] = adst_w
+                submit(index, "video", paths[index], targets, aspect)
+                items[index][2] = IngestResult(rdst_w, rdst_c, duration)
+
+            def start(index):
+                """reference the stored files of a hashed source or write them"""
+                key = (items[index][4], kind(index))
+                items[index][2] = self._media_store.get(*key)
+                if items[index][2]:
+                    finish(index)
+                elif key in writing:
+                    waiting[writing[key]].append(index)
+                elif key[1] == "video":
+                    writing[key] = index
+                    probe = self._media_store.probe_get(key[0])
+                    if probe:
+                        write_video(index, *probe)
+                    else:
+                        submit(index, "probe", paths[index])
+                else:
+                    writing[key] = index
+                    extension = StillElement.target_extension(paths[index])
+                    adst_w, rdst_w = reserve(index, "_w", extension)
+                    adst_c, rdst_c = reserve(index, "_c", extension)
+                    items[index][2] = IngestResult(rdst_w, rdst_c, None)
+                    targets = {"_w": adst_w, "_c": adst_c}
+                    submit(index, "still", paths[index], targets)
+
+            def finish(index):
+                """add the element of a finished item, start items waiting on it"""
+                nonlocal done
+                _, files, ingest, error, digest = items.pop(index)
+                path = paths[index]
+                name = os.path.splitext(os.path.basename(path))[0]
+                key = (digest, kind(index))
+                written = writing.get(key) == index
+                if written:
+                    del writing[key]
+                if error is None:
+                    if written:
+                        self._media_store.add(digest, key[1], ingest)
+                    if ingest.duration is None:
+                        element = StillElement(name, path, ingest=ingest)
+                    else:
+                        element = VideoElement(name, path, ingest=ingest)
+                    self._mm.element_add(element)
+                    elements[index] = element
+                else:
+                    for target in files:
+                        if os.path.exists(target):
+                            os.remove(target)
+                done += 1
+                logger.info(f"imported {done}/{len(paths)}: '{path}'")
+                if progress:
+                    progress(done, len(paths), path, elements[index])
+                for waiting_index in waiting.pop(index, ()):
+                    start(waiting_index)
+
+            for index, path in enumerate(paths):
+                items[index] = [0, [], None, None, None]
+                submit(index, "hash", path)
+
+            while running:
+                finished, _ = concurrent.futures.wait(
+                    running, return_when=concurrent.futures.FIRST_COMPLETED
+                )
+                for future in finished:
+                    index, stage = running.pop(future)
+                    item = items[index]
+                    item[0] -= 1
+                    path = paths[index]
+                    try:
+                        result = future.result()
+                    except Exception as ex:
+                        item[3] = ex
+                        logger.error(f"import of '{path}' failed ({stage}): {ex}")
+                    else:
+                        if stage == "hash":
+                            item[4] = result
+                            start(index)
+                            continue
+                        if stage == "probe" and item[3] is None:
+                            self._media_store.probe_add(item[4], result)
+                            write_video(index, *result)
+                    if item[0]:
+                        continue  # other stages of the file still running
+                    finish(index)
+        return elements
+
     def module_add_media_by_id(self, id, time, **kwargs):
         e = self._mm._elements_get_by_id_from_db(id)
         return self._module_add(e, time=time, **kwargs)
 
+    def module_track_set(self, pos, screen, element):
+        """play a media element instead of the one of the module at pos on screen
+
+        Args:
+            pos (int): position of the module
+            screen (int): screen number of the output, see option --screen
+            element (MediaElement): element played on the screen, added to the
+                project if new
+
+        """
+        module = self._module_get_at_pos(pos)
+        if not element.id:
+            self._mm.element_add(element)
+        module.track_set(screen, element)
+        self._session.commit()
+        self._plan_invalidate(module)
+        return True
+
+    def module_track_remove(self, pos, screen):
+        """play the media element of the module at pos again on screen"""
+        module = self._module_get_at_pos(pos)
+        if module.track_remove(screen):
+            self._session.commit()
+            self._plan_invalidate(module)
+            return True
+        return False
+
     def module_add_jumptotarget(self, name, name_event, pos=None, **kwargs):
         """apends a jump to target sequence module"""
         jttm = JumpToTarget(name, name_event)
@@ -1850,6 +3095,7 @@ class Show:
         event_module.sequence_name = self.show_name
         if self._em.element_add(event_module):
             self._event_list.append(event_module)
+            self._event_index = None
             return True
         return False
 
@@ -1870,21 +3116,24 @@ class Show:
 
     def _module_rename(self, module, new_name):
         if module.media_element:
-            return self._mm.element_rename(module.media_element, new_name)
+            ret = self._mm.element_rename(module.media_element, new_name)
         else:
-            return self._lm.element_rename(module.logic_element, new_name)
-        # manager will commit
+            ret = self._lm.element_rename(module.logic_element, new_name)
+        # manager will commit, element can be used by several modules
+        self._module_index_rebuild()
+        return ret
 
     def _event_module_rename(self, module, new_name):
         return self._em.element_rename(module, new_name)
 
     def _module_append_to_pos(self, module, pos=None):
         """append element at given position"""
-        if not module.position:
-            module.position = len(self._sequence)
+        module.position = len(self._sequence)
         self._sequence.append(module)
+        self._module_name_index.setdefault(module.name, []).append(module)
         self._session.add(module)
         self._session.commit()
+        self._plan = None
         if pos:
             return self._module_change_position(module, pos)
         else:
@@ -1912,78 +3161,215 @@ class Show:
         return new_module
 
     def _module_remove(self, module):
-        self._module_change_position_end(module)
-        self._sequence.remove(module)
+        pos = module.position
         self._session.delete(module)
+        self._module_positions_shift(pos + 1, len(self._sequence) - 1, -1)
+        del self._sequence[pos]
+        self._module_index_sync(pos, len(self._sequence) - 1)
+        if module in self._module_name_index.get(module.name, []):
+            self._module_name_index[module.name].remove(module)
+        else:
+            self._module_index_rebuild()
         self._session.commit()
+        self._plan_invalidate(module)
         return True
 
     def _event_module_remove(self, module):
         self._event_list.remove(module)
+        self._event_index = None
         self._session.delete(module)
         self._session.commit()
         return True
 
-    def _module_change_position_end(self, module):
-        return self._module_change_position(module, self.count - 1)
-
     def _module_change_position(self, module, new_pos):
-        """change position of sequence elements"""
+        """change position of sequence elements
+
+        Moves the module in one step and shifts all modules in between by one
+        with a single update statement.
+
+        """
         cur_pos = module.position
+        if not 0 <= new_pos < len(self._sequence):
+            raise Exception("Position '{}' does not exist.".format(new_pos))
         if cur_pos < new_pos:
-            next_pos = cur_pos + 1
+            self._module_positions_shift(cur_pos + 1, new_pos, -1)
         elif cur_pos > new_pos:
-            next_pos = cur_pos - 1
-        else:
+            self._module_positions_shift(new_pos, cur_pos - 1, 1)
+        if not cur_pos == new_pos:
+            del self._sequence[cur_pos]
+            self._sequence.insert(new_pos, module)
+            self._module_index_sync(min(cur_pos, new_pos), max(cur_pos, new_pos))
+            # moved module is not part of the shifted range, write its position
+            orm.attributes.flag_modified(module, "_position")
+            self._plan = None
+        self._session.commit()
+        return True
+
+    def modules_reorder(self, module_ids):
+        """apply a new order to all modules of the show in one transaction
+
+        Args:
+            module_ids (list<int>): ids of all modules of the loaded show in the
+                new order
+
+        Returns:
+            bool: True for success, False if the ids do not match the modules of
+                the show.
+
+        """
+        modules = {mod.id: mod for mod in self._sequence}
+        if not len(module_ids) == len(modules) or not set(module_ids) == set(modules):
+            return False  # error code: ids do not match modules of show
+        self._sequence = [modules[mod_id] for mod_id in module_ids]
+        self._module_positions_write()
+        return True
+
+    def _module_positions_shift(self, first, last, step):
+        """shift position of all modules in range in database by step
+
+        Issues a single update statement, the loaded modules must be synchronized
+        with _module_index_sync after changing self._sequence.
+
+        Args:
+            first (int): first position to shift
+            last  (int): last position to shift (inclusive)
+            step  (int): value added to the positions
+
+        """
+        if first > last:
+            return
+        self._session.query(SequenceModule).filter(
+            SequenceModule._sequence_name == self._show_name,
+            SequenceModule._position >= first,
+            SequenceModule._position <= last,
+        ).update(
+            {SequenceModule._position: SequenceModule._position + step},
+            synchronize_session=False,
+        )
+
+    def _module_positions_write(self):
+        """write index of all modules in self._sequence as position to database
+
+        Only changed positions are written, using one executemany statement.
+
+        """
+        changed = [
+            {"_id": mod.id, "_position": pos}
+            for pos, mod in enumerate(self._sequence)
+            if not mod.position == pos
+        ]
+        if changed:
+            self._session.bulk_update_mappings(SequenceModule, changed)
             self._session.commit()
-            return True
+            self._plan = None
+        self._module_index_sync(0, len(self._sequence) - 1)
 
-        self._module_get_at_pos(next_pos).position = cur_pos
-        module.position = next_pos
+    def _plan_invalidate(self, module=None):
+        """invalidate playback plan after the show was edited
 
-        return self._module_change_position(module, new_pos)
+        Args:
+            module (SequenceModule, optional): module which content changed, only
+                its item is compiled again. If None, all items are dropped.
+                Defaults to None.
+
+        """
+        self._plan = None
+        if module is None:
+            self._plan_item_cache = dict()
+        else:
+            self._plan_item_cache.pop(module, None)
+
+    def _module_index_sync(self, first, last):
+        """set position of loaded modules in index range to their index
+
+        Positions are set as already committed values, since the database was
+        updated by _module_positions_shift or _module_positions_write.
+
+        Args:
+            first (int): first index of self._sequence to update
+            last  (int): last index of self._sequence to update (inclusive)
+
+        """
+        for pos in range(first, last + 1):
+            orm.attributes.set_committed_value(self._sequence[pos], "_position", pos)
+
+    def _module_index_rebuild(self):
+        """sort loaded modules by position and rebuild the name index
+
+        The position of each module equals its index in self._sequence, so
+        positions are made contiguous if the database contains gaps.
+
+        """
+        self._sequence.sort(key=lambda mod: mod.position)
+        self._module_positions_write()
+        self._module_name_index = dict()
+        for mod in self._sequence:
+            self._module_name_index.setdefault(mod.name, []).append(mod)
 
     def _module_load_from_db(self):
         """load show from database"""
         self._sequence = (
             self._session.query(SequenceModule)
+            .options(
+                orm.selectinload(SequenceModule._media_element),
+                orm.selectinload(SequenceModule._logic_element),
+                orm.selectinload(SequenceModule._list_commands).selectinload(
+                    ModuleCommand.command
+                ),
+                orm.selectinload(SequenceModule._screen_tracks).selectinload(
+                    ScreenTrack._media_element
+                ),
+            )
             .filter(SequenceModule._sequence_name == self._show_name)
+            .order_by(SequenceModule._position)
             .all()
         )
+        self._module_index_rebuild()
 
     def _event_module_load_from_db(self):
         """load show from database"""
         self._event_list = (
             self._session.query(EventModule)
+            .options(
+                orm.selectinload(EventModule._jump_to_target_element),
+                orm.selectinload(EventModule._list_commands).selectinload(
+                    EventCommand.command
+                ),
+            )
             .filter(EventModule._sequence_name == self._show_name)
             .all()
         )
 
     def _module_get_with_name(self, name):
-        for seqm in self._sequence:
-            if seqm.name == name:
-                return seqm
-        return None
+        modules = self._module_name_index.get(name)
+        if not modules:
+            return None
+        return min(modules, key=lambda mod: mod.position)
 
     def _module_get_at_pos(self, position):
         """returns object on given playlist position"""
+        self._position_check(position)
+        return self._sequence[position]
+
+    def _position_check(self, position):
+        """raise if no show is loaded, it is empty or position does not exist"""
         if not self.show_name:
             raise Exception("no show loaded")
         elif len(self._sequence) == 0:
             raise Exception("show '{}' is empty".format(self.show_name))
-        for s in self._sequence:
-            if s.position == position:
-                return s
-        raise Exception("Position '{}' does not exist.".format(position))
+        if not 0 <= position < len(self._sequence):
+            raise Exception("Position '{}' does not exist.".format(position))
 
     def _module_text_change_text(self, module, new_text):
         module.media_element.text = new_text
+        self._plan = None
         return True
 
     def _module_add_command(self, module, command_object):
         if command_object and module.command_add(command_object):
             self._cm.element_add(command_object)
             self._session.commit()
+            self._plan_invalidate(module)
             return True
         else:
             return False
@@ -1992,6 +3378,7 @@ class Show:
         for command in module.list_commands:
             if module.command_remove(command):
                 self._session.commit()
+                self._plan_invalidate(module)
                 return True
             else:
                 return False
@@ -2011,20 +3398,85 @@ class Show:
 
     def next(self):
         """returns next module and handles modules with logic elements"""
+        return self.item_next().module
+
+    def item_next(self):
+        """returns PlanItem of next module, see next()"""
 
         # loop through queue until empty
+        self.jumped = False
         while not self._happened_event_queue.empty():
             jtte = self._happened_event_queue.get()
-            for e in self.jumptotarget_elements:
-                if e.logic_element.id == jtte.id:
-                    self._current_pos = e.position
+            pos = self.plan.jump_table.get(jtte.id)
+            if pos is not None:
+                self._current_pos = pos
+                self.jumped = True
 
         # increase current position and return new current element
         if self._current_pos < len(self._sequence) - 1:
             self._current_pos = self._current_pos + 1
-            return self.module_current
+            return self.item_current
         else:
-            return SequenceModule.viewcontroll_placeholder()
+            return self.plan.placeholder
+
+    def items_upcoming(self, count):
+        """returns PlanItems of the next count calls of item_next
+
+        Loops and jumps already notified are handled as by item_next, but the
+        position in the show, the loop counters and the notified jumps are not
+        changed. The placeholder at the end of the show is not included.
+
+        Args:
+            count (int): maximal number of items
+
+        Returns:
+            list<PlanItem>: upcoming items in playback order
+
+        """
+        pos = self._current_pos
+        loop_counters = dict(self._loop_counters)
+        with self._happened_event_queue.mutex:
+            pending = list(self._happened_event_queue.queue)
+        for jtte in pending:
+            pos = self.plan.jump_table.get(jtte.id, pos)
+
+        items = list()
+        while len(items) < count and pos < len(self._sequence) - 1:
+            pos = self.plan.resolve(pos + 1, loop_counters)
+            if pos is None:
+                break
+            items.append(self.plan.item_at(pos))
+        return items
+
+    @staticmethod
+    def _schema_upgrade(engine):
+        """add columns missing in tables of a project created by an older version
+
+        create_all creates missing tables only, columns added to an existing
+        table (e.g. text and render_key of media_element) are added here. The
+        added columns are empty in the existing rows.
+
+        """
+        inspector = sqlalchemy.inspect(engine)
+        existing = set(inspector.get_table_names())
+        with engine.begin() as connection:
+            for table in Base.metadata.sorted_tables:
+                if table.name not in existing:
+                    continue
+                names = {column["name"] for column in inspector.get_columns(table.name)}
+                for column in table.columns:
+                    if column.name in names:
+                        continue
+                    column_type = column.type.compile(dialect=engine.dialect)
+                    connection.execute(
+                        sqlalchemy.text(
+                            f"ALTER TABLE {table.name} "
+                            f"ADD COLUMN {column.name} {column_type}"
+                        )
+                    )
+                    logging.getLogger("show").info(
+                        f"added column '{column.name}' to table '{table.name}'"
+                    )
 
     @staticmethod
     def create_session(project_folder, check_same_thread=False):
@@ -2044,5 +3496,8 @@ class Show:
         Base.metadata.create_all(
             some_engine, Base.metadata.tables.values(), checkfirst=True
         )
-        Session = orm.sessionmaker(bind=some_engine)
+        Show._schema_upgrade(some_engine)
+        # the show is the only writer of the project database, keep loaded objects
+        # valid after commits instead of reloading every module row by row
+        Session = orm.sessionmaker(bind=some_engine, expire_on_commit=False)
         return Session()
@@ -0,0 +1,232 @@
+import concurrent.futures
+import hashlib
+import mmap
+import os
+import subprocess
+import time
+
+import numpy
+
+HASH_ALGORITHM = "sha256"
+HASH_CHUNK_SIZE = 1 << 24  # 16 MiB
+
+
+def file_hash(path, chunk_size=HASH_CHUNK_SIZE):
+    """hex digest of the content of a file
+
+    The file is memory mapped and hashed chunk by chunk, so only the pages of
+    the current chunk are held in memory, regardless of the size of the file.
+
+    Args:
+        path (str): path of the file
+        chunk_size (int, optional): bytes passed to the hash at once. Defaults to
+            HASH_CHUNK_SIZE.
+
+    Returns:
+        str: hex digest (HASH_ALGORITHM) of the file content
+
+    """
+    digest = hashlib.new(HASH_ALGORITHM)
+    with open(path, "rb") as file:
+        size = os.fstat(file.fileno()).st_size
+        if size == 0:
+            # empty files can not be memory mapped
+            return digest.hexdigest()
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            with memoryview(mapped) as view:
+                for offset in range(0, size, chunk_size):
+                    digest.update(view[offset : offset + chunk_size])
+    return digest.hexdigest()
+
+
+def store_key(digest, kind, variant, t_start=0, t_end=None):
+    """key of a transcoded file in the media store
+
+    Args:
+        digest (str): hash of the source file (see file_hash)
+        kind (str): transcode applied to the source, e.g. "video" or "still"
+        variant (str): aspect variant of the output, "_w" or "_c"
+        t_start (float, optional): start of the used part of a video in seconds.
+            Defaults to 0.
+        t_end (float, optional): end of the used part of a video in seconds.
+            Defaults to None, end of the video.
+
+    Returns:
+        str: key unique for source content and transcode parameters
+
+    """
+    t_end = None if t_end is None else float(t_end)
+    return f"{digest}:{kind}{variant}:{float(t_start or 0)}:{t_end}"
+
+
+def ffmpeg_binary():
+    """ffmpeg executable used by moviepy"""
+    from moviepy.config import get_setting
+
+    return get_setting("FFMPEG_BINARY")
+
+
+def keyframe_luminance(path, times, width=160, height=90, max_workers=4):
+    """luminance of the keyframes of a video at the given times, scaled down
+
+    For every time a ffmpeg process seeks to the keyframe at or before it and
+    decodes only this keyframe (-skip_frame nokey), scaled down to width x height
+    and converted to gray (luminance) by ffmpeg. Nothing but the scaled frames
+    leaves ffmpeg.
+
+    Args:
+        path (str): path of the video
+        times (iterable<float>): times in seconds of the samples
+        width (int, optional): width of the scaled frames. Defaults to 160.
+        height (int, optional): height of the scaled frames. Defaults to 90.
+        max_workers (int, optional): ffmpeg processes run at the same time.
+            Defaults to 4.
+
+    Returns:
+        numpy.ndarray: uint8 array of shape (samples, height, width), samples
+            which could not be decoded are missing
+
+    """
+
+    def decode(time):
+        command = [
+            ffmpeg_binary(),
+            "-v",
+            "error",
+            "-noaccurate_seek",
+            "-copyts",  # keep the keyframe before the seek time
+            "-skip_frame",
+            "nokey",
+            "-ss",
+            f"{time:.3f}",
+            "-i",
+            path,
+            "-frames:v",
+            "1",
+            "-an",
+            "-vf",
+            f"scale={width}:{height},format=gray",
+            "-f",
+            "rawvideo",
+            "-",
+        ]
+        result = subprocess.run(
+            command, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL
+        )
+        return result.stdout
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers) as pool:
+        frames = [
+            numpy.frombuffer(frame, numpy.uint8).reshape(height, width)
+            for frame in pool.map(decode, times)
+            if len(frame) == width * height
+        ]
+    if not frames:
+        return numpy.empty((0, height, width), numpy.uint8)
+    return numpy.stack(frames)
+
+
+def letterbox(frames, threshold=16):
+    """height of the black bars above and below the content of a video
+
+    A row belongs to the content if its mean luminance reaches threshold in at
+    least one of the frames, so dark scenes do not widen the bars.
+
+    Args:
+        frames (numpy.ndarray): luminance of shape (samples, height, width)
+        threshold (int, optional): mean luminance (0-255) of a content row.
+            Defaults to 16.
+
+    Returns:
+        tuple: top and bottom bar as fraction of the frame height, (0, 0) if all
+            frames are black
+
+    """
+    profile = frames.mean(axis=2).max(axis=0)
+    content = numpy.flatnonzero(profile >= threshold)
+    if not content.size:
+        return 0.0, 0.0
+    height = len(profile)
+    return content[0] / height, (height - 1 - content[-1]) / height
+
+
+def content_aspect_ratio(path, t_start, t_end, samples=16, min_bar=0.1):
+    """aspect ratio of the content of a 16:9 video, detected by its letterbox
+
+    Args:
+        path (str): path of the video
+        t_start (float): start of the analysed part in seconds
+        t_end (float): end of the analysed part in seconds
+        samples (int, optional): keyframes analysed, evenly spread over the
+            part. Defaults to 16.
+        min_bar (float, optional): minimal height of both black bars as
+            fraction of the frame height for "21:9". Defaults to 0.1 (21:9
+            content leaves 0.125).
+
+    Returns:
+        str: "21:9" if the content is letterboxed, else "16:9"
+
+    Raises:
+        ValueError: no keyframe could be decoded
+
+    """
+    step = (t_end - t_start) / samples
+    frames = keyframe_luminance(
+        path, [t_start + step * (i + 0.5) for i in range(samples)]
+    )
+    if not len(frames):
+        raise ValueError(f"no keyframes decoded from '{path}'")
+    top, bottom = letterbox(frames)
+    return "21:9" if min(top, bottom) >= min_bar else "16:9"
+
+
+def transcode(
+    path_scr, outputs, t_start=0, t_end=None, codec="libx265", preset="superfast"
+):
+    """write several outputs of a video in one ffmpeg process
+
+    The source is decoded once, its frames are split into one branch of the
+    filter graph per output. A branch without filter passes the frames
+    unchanged to the encoder.
+
+    Args:
+        path_scr (str): path of the source video
+        outputs (list<tuple>): (path, filter) of every output, filter is a ffmpeg
+            filter chain (e.g. "scale=-2:810,pad=1920:1080:(ow-iw)/2:(oh-ih)/2")
+            or None
+        t_start (float, optional): start of the used part in seconds. Defaults
+            to 0.
+        t_end (float, optional): end of the used part in seconds. Defaults to
+            None, end of the video.
+        codec (str, optional): video codec. Defaults to "libx265".
+        preset (str, optional): preset of the codec. Defaults to "superfast".
+
+    Returns:
+        tuple: wall time and CPU time (user and system of ffmpeg) in seconds
+
+    Raises:
+        subprocess.CalledProcessError: ffmpeg failed, stderr holds its messages
+
+    """
+    branches = "".join(f"[s{i}]" for i in range(len(outputs)))
+    graph = [f"[0:v]split={len(outputs)}{branches}"]
+    encoders = list()
+    for i, (path, filters) in enumerate(outputs):
+        graph.append(f"[s{i}]{filters or 'null'}[v{i}]")
+        encoders += ["-map", f"[v{i}]", "-map", "0:a?", "-c:v", codec]
+        encoders += ["-preset", preset, "-c:a", "aac", path]
+
+    command = [ffmpeg_binary(), "-v", "error", "-y"]
+    if t_start:
+        command += ["-ss", f"{t_start:.3f}"]
+    if t_end is not None:
+        command += ["-to", f"{t_end:.3f}"]
+    command += ["-i", path_scr, "-filter_complex", ";".join(graph)] + encoders
+
+    start, times = time.perf_counter(), os.times()
+    subprocess.run(command, stderr=subprocess.PIPE, check=True)
+    end = os.times()
+    cpu = (end.children_user - times.children_user) + (
+        end.children_system - times.children_system
+    )
+    return time.perf_counter() - start, cpu
@@ -1,20 +1,278 @@
+import bisect
+import functools
+import heapq
 import inspect
+import itertools
+import math
+import operator
+import os
 import threading
 import time
 
 
+class JitterHistogram:
+    """Histogram of the delay of timers firing after their deadline.
+
+    Thread safe. The delays are counted in buckets with the upper bounds in
+    ``bounds`` (seconds), delays above the last bound in an overflow bucket.
+
+    Args:
+        bounds (iterable of float, optional): upper bounds of the buckets in
+            seconds. Defaults to 0.1ms up to 100ms.
+
+    """
+
+    default_bounds = (
+        0.0001,
+        0.00025,
+        0.0005,
+        0.001,
+        0.002,
+        0.005,
+        0.01,
+        0.025,
+        0.05,
+        0.1,
+    )
+
+    def __init__(self, bounds=None):
+        self.bounds = tuple(sorted(bounds or self.default_bounds))
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.counts = [0] * (len(self.bounds) + 1)
+            self.count = 0
+            self.total = 0.0
+            self.maximum = 0.0
+
+    def record(self, delay):
+        """count delay (actual minus target fire time) in seconds"""
+        index = bisect.bisect_left(self.bounds, delay)
+        with self._lock:
+            self.counts[index] += 1
+            self.count += 1
+            self.total += delay
+            self.maximum = max(self.maximum, delay)
+
+    @property
+    def mean(self):
+        return self.total / self.count if self.count else 0.0
+
+    def percentile(self, percent):
+        """upper bound of the bucket containing the given percentile
+
+        Returns:
+            float or None: bound in seconds, maximum if in overflow bucket or None
+                if nothing was recorded.
+
+        """
+        with self._lock:
+            if not self.count:
+                return None
+            rank = max(1, math.ceil(self.count * percent / 100))
+            for bound, cumulative in zip(
+                self.bounds, itertools.accumulate(self.counts)
+            ):
+                if cumulative >= rank:
+                    return bound
+            return self.maximum
+
+    def snapshot(self):
+        """dict of upper bound in ms ("inf" for overflow):count and statistics"""
+        with self._lock:
+            buckets = {f"{b * 1000:g}": c for b, c in zip(self.bounds, self.counts)}
+            buckets["inf"] = self.counts[-1]
+            return {
+                "buckets": buckets,
+                "count": self.count,
+                "mean": self.total / self.count if self.count else 0.0,
+                "max": self.maximum,
+            }
+
+
+class TimerScheduler:
+    """Runs the timers of a process in one thread.
+
+    Timers are kept in a heap per TimerGroup, the scheduler keeps a heap with the
+    next deadline of every group. The thread waits with a condition variable until
+    the earliest deadline or until an earlier deadline is scheduled, so the
+    precision is the same as waiting with threading.Event in a thread per timer.
+    The handlers of all timers are called by the scheduler thread, they must return
+    quickly to not delay other timers.
+
+    Each group has its own clock which stands still while the group is paused.
+    Pausing and resuming a group therefore does not depend on the number of its
+    timers: pausing only invalidates the entry of the group in the heap of the
+    scheduler, resuming pushes a new one.
+
+    Args:
+        name (str, optional): name of the thread. Defaults to "TimerScheduler".
+
+    """
+
+    _default = None
+    _default_lock = threading.Lock()
+
+    def __init__(self, name="TimerScheduler"):
+        self.name = name
+        self._condition = threading.Condition()
+        self._heap = list()
+        """list: heap of (deadline, token, TimerGroup), deadline in perf_counter"""
+        self._counter = itertools.count()
+        self._thread = None
+        self._pid = os.getpid()
+        self.group = TimerGroup(self, name="default")
+        """TimerGroup: group of the timers created without group"""
+        self.jitter = JitterHistogram()
+        """JitterHistogram: delay of all timers firing after their deadline"""
+
+    @classmethod
+    def default(cls):
+        """scheduler shared by all timers of the process, created on first use
+
+        A new scheduler is created in a forked child process, since the thread of
+        the scheduler of the parent process does not exist there.
+
+        """
+        with cls._default_lock:
+            if cls._default is None or cls._default._pid != os.getpid():
+                cls._default = cls()
+            return cls._default
+
+    def _schedule_group(self, group):
+        """push next deadline of group, must be called with condition acquired"""
+        if group.is_paused:
+            return
+        while group._heap and group._heap[0][3] != group._heap[0][2]._version:
+            heapq.heappop(group._heap)  # cancelled or paused timer
+        if not group._heap:
+            return
+        deadline = group._heap[0][0] + group._offset
+        if group._token is not None and group._deadline <= deadline:
+            return
+        group._token, group._deadline = next(self._counter), deadline
+        heapq.heappush(self._heap, (deadline, group._token, group))
+        if self._thread is None:
+            self._thread = threading.Thread(
+                target=self._run, name=self.name, daemon=True
+            )
+            self._thread.start()
+        elif self._heap[0][1] == group._token:
+            self._condition.notify()
+
+    def _run(self):
+        with self._condition:
+            while True:
+                now = time.perf_counter()
+                due = list()
+                while self._heap and self._heap[0][0] <= now:
+                    _, token, group = heapq.heappop(self._heap)
+                    if token != group._token:
+                        continue  # group paused or earlier deadline scheduled
+                    group._token = None
+                    group_time = group.time()
+                    while group._heap and group._heap[0][0] <= group_time:
+                        deadline, _, timer, version = heapq.heappop(group._heap)
+                        if version == timer._version:
+                            due.append((timer, version, deadline))
+                    self._schedule_group(group)
+                if due:
+                    self._condition.release()
+                    try:
+                        for timer, version, deadline in due:
+                            self.jitter.record(timer.group.time() - deadline)
+                            timer._fire(version)
+                    finally:
+                        self._condition.acquire()
+                    continue
+                timeout = self._heap[0][0] - now if self._heap else None
+                self._condition.wait(timeout)
+
+
+class TimerGroup:
+    """Timers which can be paused and resumed together.
+
+    Timers created with a group run on its clock (see TimerScheduler). A timer
+    paused by itself stays paused when its group is resumed.
+
+    Args:
+        scheduler (TimerScheduler, optional): scheduler running the timers.
+            Defaults to TimerScheduler.default().
+        name (str, optional): name for debugging.
+
+    """
+
+    def __init__(self, scheduler=None, name=None):
+        self.scheduler = scheduler or TimerScheduler.default()
+        self.name = name
+        self._heap = list()
+        """list: heap of (deadline, sequence, timer, version), deadline in group time"""
+        self._sequence = itertools.count()
+        self._offset = 0.0
+        self._pause_time = None
+        self._token = None
+        self._deadline = None
+
+    def time(self):
+        """clock of the group, standing still while the group is paused"""
+        if self._pause_time is not None:
+            return self._pause_time - self._offset
+        return time.perf_counter() - self._offset
+
+    @property
+    def is_paused(self):
+        return self._pause_time is not None
+
+    def pause(self):
+        """pause all timers of the group
+
+         Returns:
+             bool: true if successful
+
+        """
+        with self.scheduler._condition:
+            if self._pause_time is not None:
+                return False
+            self._pause_time = time.perf_counter()
+            self._token = None
+            return True
+
+    def resume(self):
+        """resume all timers of the group
+
+         Returns:
+             bool: true if successful
+
+        """
+        with self.scheduler._condition:
+            if self._pause_time is None:
+                return False
+            self._offset += time.perf_counter() - self._pause_time
+            self._pause_time = None
+            self.scheduler._schedule_group(self)
+            return True
+
+    def _push(self, timer):
+        """schedule timer at its deadline, must be called with condition acquired"""
+        entry = (timer._deadline, next(self._sequence), timer, timer._version)
+        heapq.heappush(self._heap, entry)
+        if self._heap[0] is entry:
+            self.scheduler._schedule_group(self)
+
+
 class RepeatedTimer:
     """Timer which restarts itself after it has run out and calls a function.
 
     Class attributes can be passed to handler function by writing theme as arg or kwarg
     inf function arguments. Function arguments will always be overwritten.
 
-    The timer has less 1 ms a precision . Using
-    a the wait function of threading.Event
-
     The timer has a precision of less than one milliseconds (depending on load an cpu
-    of course). The timer itself is an object in which a thread (daemon) is running
-    (which also calls the handler functions!).
+    of course). The timer is a handle of an entry in the TimerScheduler of the
+    process, whose thread calls the handler functions of all timers. The deadline of
+    each cycle is calculated from the start of the timer, so delays of handlers do
+    not add up.
 
     Args:
         interval(float): time between repetitions/cycles
@@ -31,6 +289,8 @@ class RepeatedTimer:
         handler_end (function or None, optional): function called at the end
             instead of function_repeat. If None, function_repeat is called.
             Default to None.
+        group (TimerGroup, optional): group to pause and resume the timer together
+            with other timers. Defaults to the group of TimerScheduler.default().
 
     Attributes:
         interval (float): time between each cycle.
@@ -39,6 +299,7 @@ class RepeatedTimer:
         handler_repeat (function): function handler to be called after each cycle
         handler_end (function or None): unction handler to be called at the end (also
             see Argument description with same name).
+        group (TimerGroup): group of the timer.
 
     """
 
@@ -64,11 +325,13 @@ class RepeatedTimer:
         cycles=None,
         duration=None,
         handler_end=None,
+        group=None,
         **kwargs,
     ):
         self.interval = interval
         self.handler_repeat = handler_repeat
         self.handler_end = handler_end
+        self.group = group or TimerScheduler.default().group
         self.rest = 0
         if not cycles and not duration:
             cycles = -1
@@ -80,41 +343,44 @@ class RepeatedTimer:
         self.cycles_left = cycles
         self._start_time = None
         self._time_offset = 0
-        self._ticker = threading.Event()
+        self._deadline = None
+        self._version = 0
         self._is_running = threading.Event()
         self._is_finished = threading.Event()
         self._is_finished.clear()
         self._is_not_paused = threading.Event()
         self._is_not_paused.set()
-        self._thread = None
         self._args = args
         self._kwargs = kwargs
-
-    def _run(self):
-
-        while not self._ticker.is_set():
-            interval = self.interval
-            if self.cycles_left == 1 and self.rest > 0:
-                interval = self.rest
-            # compensate offset of last run and/or pause
-            i = interval - (self.runtime_thread - self.runtime_cycle)
-            if i < 0:
-                i = 0
-            self._ticker.wait(i)
-            if not self._is_not_paused.is_set():
-                self._is_not_paused.wait()
-                continue
-            if not self._is_running.is_set():
-                break
+        self._calls = dict()
+        """dict: handler function:function calling it, see _compile_call"""
+        for func in (handler_repeat, handler_end):
+            if func is not None:
+                self._calls[func] = self._compile_call(func)
+
+    def _next_interval(self):
+        if self.cycles_left == 1 and self.rest > 0:
+            return self.rest
+        return self.interval
+
+    def _fire(self, version):
+        """called by the thread of the scheduler at the deadline"""
+        with self.group.scheduler._condition:
+            if version != self._version:
+                return
             self.cycles_left -= 1
-            if self.cycles_left == 0:
-                if self.handler_end:
-                    self._compose_and_call(self.handler_end)
-                else:
-                    self._compose_and_call(self.handler_repeat)
-                self._is_finished.set()
-                self._is_running.clear()
-                break
+            last = self.cycles_left == 0
+            if not last:
+                self._deadline += self._next_interval()
+                self.group._push(self)
+        if last:
+            if self.handler_end:
+                self._compose_and_call(self.handler_end)
+            else:
+                self._compose_and_call(self.handler_repeat)
+            self._is_finished.set()
+            self._is_running.clear()
+        else:
             self._compose_and_call(self.handler_repeat)
 
     def start(self):
@@ -124,14 +390,15 @@ class RepeatedTimer:
              bool: true if successful
 
         """
-        if not self._is_running.is_set():
-            self._ticker.clear()
-            self._is_running.set()
-            self._thread = threading.Thread(target=self._run, daemon=True)
-            self._start_time = time.perf_counter()
-            self._thread.start()
-            return True
-        return False
+        with self.group.scheduler._condition:
+            if not self._is_running.is_set():
+                self._is_running.set()
+                self._version += 1
+                self._start_time = self.group.time()
+                self._deadline = self._start_time + self._next_interval()
+                self.group._push(self)
+                return True
+            return False
 
     def cancel(self):
         """stop the timer
@@ -140,16 +407,24 @@ class RepeatedTimer:
              bool: true if successful
 
         """
-        if self._is_running.is_set():
-            self._is_running.clear()
-            self._ticker.set()
-            return True
-        return False
+        with self.group.scheduler._condition:
+            if self._is_running.is_set():
+                self._is_running.clear()
+                self._version += 1
+                return True
+            return False
 
-    def _compose_and_call(self, func):
+    def _compile_call(self, func):
+        """resolve the signature of func into a function calling func without args
+
+        The arguments of func are bound once: the passed args and kwargs are stored,
+        only the attributes of the timer in self_attr are read at each call.
+
+        """
         cur_arg = 0
-        args = list()
+        args = list()  # (True, attribute name) or (False, value)
         kwargs = dict()
+        attr_kwargs = list()
         for param in inspect.signature(func).parameters.values():
             if param.kind == inspect.Parameter.VAR_POSITIONAL:
                 pass
@@ -160,23 +435,49 @@ class RepeatedTimer:
                 and param.default is not param.empty
             ):
                 if param.name in self.self_attr:
-                    kwargs[param.name] = getattr(self, param.name)
+                    attr_kwargs.append(param.name)
                 elif param.name in self._kwargs.keys():
                     kwargs[param.name] = self._kwargs[param.name]
                 else:
                     pass  # do nothing use default value
             else:
                 if param.name in self.self_attr:
-                    args.append(getattr(self, param.name))
+                    args.append((True, param.name))
                 elif param.name in self._kwargs.keys():
-                    args.append(self._kwargs.get(param.name))
+                    args.append((False, self._kwargs.get(param.name)))
                 elif cur_arg < len(self._args):
-                    args.append(self._args[cur_arg])
+                    args.append((False, self._args[cur_arg]))
                     cur_arg += 1
                 else:
                     raise ValueError(f"positional argument '{param.name}' missing")
 
-        func(*args, **kwargs)
+        if not attr_kwargs and not any(is_attr for is_attr, _ in args):
+            return functools.partial(func, *(value for _, value in args), **kwargs)
+
+        attr_args = [name for is_attr, name in args if is_attr]
+        if len(attr_args) == len(args) and not kwargs and not attr_kwargs:
+            getter = operator.attrgetter(*attr_args)
+            if len(attr_args) == 1:
+                return lambda: func(getter(self))
+            return lambda: func(*getter(self))
+
+        def call():
+            func(
+                *[getattr(self, arg) if is_attr else arg for is_attr, arg in args],
+                **kwargs,
+                **{name: getattr(self, name) for name in attr_kwargs},
+            )
+
+        return call
+
+    def _compose_and_call(self, func):
+        """call func with its arguments, see _compile_call"""
+        try:
+            call = self._calls[func]
+        except KeyError:
+            # handler was replaced after the timer was created
+            call = self._calls[func] = self._compile_call(func)
+        call()
 
     def join(self):
         """block until timer has run out"""
@@ -209,7 +510,7 @@ class RepeatedTimer:
             float: time the timer has run
 
         """
-        return time.perf_counter() - self._start_time + self._time_offset
+        return self.group.time() - self._start_time + self._time_offset
 
     @property
     def time_left_thread(self):
@@ -259,7 +560,7 @@ class PausableRepeatedTimer(RepeatedTimer):
     a (not) pausable timer.
     """
 
-    self_attr = RepeatedTimer.self_attr.union("is_paused")
+    self_attr = RepeatedTimer.self_attr.union({"is_paused"})
 
     def __init__(
         self,
@@ -269,6 +570,7 @@ class PausableRepeatedTimer(RepeatedTimer):
         cycles=None,
         duration=None,
         handler_end=None,
+        group=None,
         **kwargs,
     ):
         super().__init__(
@@ -278,9 +580,11 @@ class PausableRepeatedTimer(RepeatedTimer):
             cycles=cycles,
             duration=duration,
             handler_end=handler_end,
+            group=group,
             **kwargs,
         )
         self._pause_time = None
+        self._remaining = None
 
     def pause(self):
         """pause the timer
@@ -289,12 +593,14 @@ class PausableRepeatedTimer(RepeatedTimer):
              bool: true if successful
 
         """
-        if self.is_running and not self.is_paused:
-            self._pause_time = time.perf_counter()
-            self._is_not_paused.clear()
-            self._ticker.set()
-            return True
-        return False
+        with self.group.scheduler._condition:
+            if self.is_running and not self.is_paused:
+                self._pause_time = self.group.time()
+                self._remaining = self._deadline - self._pause_time
+                self._version += 1
+                self._is_not_paused.clear()
+                return True
+            return False
 
     def resume(self):
         """resume the timer
@@ -303,12 +609,16 @@ class PausableRepeatedTimer(RepeatedTimer):
              bool: true if successful
 
         """
-        if self.is_running and self.is_paused:
-            self._time_offset += self._pause_time - time.perf_counter()
-            self._ticker.clear()
-            self._is_not_paused.set()
-            return True
-        return False
+        with self.group.scheduler._condition:
+            if self.is_running and self.is_paused:
+                now = self.group.time()
+                self._time_offset += self._pause_time - now
+                self._deadline = now + self._remaining
+                self._version += 1
+                self._is_not_paused.set()
+                self.group._push(self)
+                return True
+            return False
 
     @property
     def is_paused(self):
@@ -342,6 +652,101 @@ class PausableTimer(PausableRepeatedTimer):
         )
 
 
+class TimerRegistry:
+    """Pending timers by key, removed as soon as they fire or are cancelled.
+
+    All timers are started in one TimerGroup, so they are paused and resumed
+    together. The timers of a key (e.g. the show module which started them) can be
+    cancelled together.
+
+    Args:
+        group (TimerGroup, optional): group of the timers. Defaults to a new group
+            of the default scheduler.
+
+    Attributes:
+        fired (int): number of timers which have fired.
+        cancelled (int): number of timers which were cancelled.
+
+    """
+
+    def __init__(self, group=None):
+        self.group = group or TimerGroup(name="registry")
+        self.fired = 0
+        self.cancelled = 0
+        self._pending = dict()
+        """dict: key:set of pending timers"""
+        self._lock = threading.Lock()
+
+    def start(self, key, interval, function, *args):
+        """start a PausableTimer calling function(*args) after interval
+
+        Returns:
+            PausableTimer: the started timer
+
+        """
+
+        def fire():
+            with self._lock:
+                timers = self._pending.get(key)
+                if timers is None or timer not in timers:
+                    return  # cancelled meanwhile
+                timers.discard(timer)
+                if not timers:
+                    del self._pending[key]
+                self.fired += 1
+            function(*args)
+
+        timer = PausableTimer(interval, fire, group=self.group)
+        with self._lock:
+            self._pending.setdefault(key, set()).add(timer)
+        timer.start()
+        return timer
+
+    def cancel(self, key):
+        """cancel all pending timers of key
+
+        Returns:
+            int: number of cancelled timers
+
+        """
+        with self._lock:
+            timers = self._pending.pop(key, ())
+            self.cancelled += len(timers)
+        for timer in timers:
+            timer.cancel()
+        return len(timers)
+
+    def cancel_all(self):
+        """cancel all pending timers
+
+        Returns:
+            int: number of cancelled timers
+
+        """
+        return sum(self.cancel(key) for key in list(self._pending))
+
+    def pause(self):
+        return self.group.pause()
+
+    def resume(self):
+        return self.group.resume()
+
+    def pending(self, key=None):
+        """number of pending timers of key or of all keys if key is None"""
+        with self._lock:
+            if key is not None:
+                return len(self._pending.get(key, ()))
+            return sum(len(timers) for timers in self._pending.values())
+
+    def counts(self):
+        """dict with the number of pending, fired and cancelled timers"""
+        return {
+            "pending": self.pending(),
+            "fired": self.fired,
+            "cancelled": self.cancelled,
+        }
+
+
 def timer_handler_repeat_test(
     total_running_time,
     runtime_thread,
@@ -1,4 +1,6 @@
 import argparse
+import collections
+import functools
 import logging
 import logging.config
 import logging.handlers
@@ -17,9 +19,16 @@ if os.name == "posix" and "DISPLAY" in os.environ:
     from pynput import keyboard
 
 import viewcontrol.show as show
+from viewcontrol.playback.coordinator import PlaybackCoordinator, PlaybackState
+from viewcontrol.playback.mediaclock import CueScheduler
+from viewcontrol.playback.outputsync import SkewMeter
+from viewcontrol.playback.playlistwindow import PlaylistWindow
 from viewcontrol.playback.processmpv import ProcessMpv, ThreadMpv
+from viewcontrol.playback.readahead import Readahead
+from viewcontrol.playback.statusblock import PlayerStatus, StatusBlock
+from viewcontrol.playback.statuschannel import StatusChannel
 from viewcontrol.remotecontrol.processcmd import ProcessCmd, ThreadCmd
-from viewcontrol.remotecontrol.threadcommunicationbase import ComPackage
+from viewcontrol.util.timing import JitterHistogram
 from viewcontrol.version import __version__ as package_version
 
 
@@ -61,15 +70,74 @@ class ViewControl(object):
             "-s",
             "--screen",
             action="store",
-            default=1,
+            nargs="+",
+            default=[1],
             type=int,
-            help="screen number/id for media playback",
+            help="screen number/id for media playback, one output per screen",
+        )
+        parser.add_argument(
+            "--vo",
+            action="store",
+            default=None,
+            help="video output of mpv (e.g. null for playback without display)",
+        )
+        parser.add_argument(
+            "--sync-lead",
+            action="store",
+            default=0.25,
+            type=float,
+            help="seconds in advance several outputs are told to switch together",
         )
         parser.add_argument(
             "--threading",
             action="store_true",
             help="run program only with threading instead of multiprocessing",
         )
+        parser.add_argument(
+            "--asyncio",
+            action="store_true",
+            help="run communication of all devices in one asyncio event loop",
+        )
+        parser.add_argument(
+            "--media-clock",
+            action="store_true",
+            help="send delayed commands at the playback position of the media",
+        )
+        parser.add_argument(
+            "--status-rate",
+            action="store",
+            default=10,
+            type=float,
+            help="snapshots of the player status per second (position, remaining)",
+        )
+        parser.add_argument(
+            "--prefetch",
+            action="store",
+            default=2,
+            type=int,
+            help="upcoming media elements kept appended to the player",
+        )
+        parser.add_argument(
+            "--readahead",
+            action="store",
+            default=3,
+            type=int,
+            help="upcoming media files warmed in the page cache (0 to disable)",
+        )
+        parser.add_argument(
+            "--readahead-budget",
+            action="store",
+            default=256,
+            type=int,
+            help="MiB read ahead over all warmed files",
+        )
+        parser.add_argument(
+            "--readahead-workers",
+            action="store",
+            default=2,
+            type=int,
+            help="files warmed at the same time",
+        )
         parser.add_argument("--version", action="version", version=package_version)
         self.argpars_result = parser.parse_args(args[1:])
         self.argpars_result.project_folder = os.path.expanduser(
@@ -123,25 +191,52 @@ class ViewControl(object):
         self.lp.start()
         self.logger.info("Started '{}' with pid 'N.A.'".format(self.lp.name,))
 
+        # one player (output) per screen, with several they switch synchronized
+        screens = self.argpars_result.screen
+        self.synchronized = len(screens) > 1
         if not self.argpars_result.threading:
             self.cmd_control_queue = multiprocessing.Queue()
             self.cmd_status_queue = multiprocessing.Queue()
-            self.mpv_control_queue = multiprocessing.Queue()
-            self.mpv_status_queue = multiprocessing.Queue()
+            self.mpv_control_queues = [multiprocessing.Queue() for _ in screens]
+            self.mpv_status_queues = [multiprocessing.Queue() for _ in screens]
         else:
             self.cmd_control_queue = queue.Queue()
             self.cmd_status_queue = queue.Queue()
-            self.mpv_control_queue = queue.Queue()
-            self.mpv_status_queue = queue.Queue()
+            self.mpv_control_queues = [queue.Queue() for _ in screens]
+            self.mpv_status_queues = [queue.Queue() for _ in screens]
+        # the first output leads, its status drives the playback of the show
+        self.mpv_control_queue = self.mpv_control_queues[0]
+        self.mpv_status_queue = self.mpv_status_queues[0]
+
+        # latest status of the players, readable without draining mpv_status_queue
+        self.mpv_status_blocks = [
+            StatusBlock(shared=not self.argpars_result.threading) for _ in screens
+        ]
+        self.mpv_status_block = self.mpv_status_blocks[0]
 
         # setup event mpv
         self.sig_mpv_prop = signal("mpv_prop_changed")
-        self.t_listen_process_mpv = threading.Thread(
-            target=self.thread_listen_process_mpv,
-            name="listen_process_mpv",
-            daemon=True,
-        )
-        self.t_listen_process_mpv.start()
+        self.mpv_statuses = [
+            StatusChannel(status_queue, control_queue)
+            for status_queue, control_queue in zip(
+                self.mpv_status_queues, self.mpv_control_queues
+            )
+        ]
+        self.mpv_status = self.mpv_statuses[0]
+        self.mpv_status.signal.connect(self.subscr_status, sender=self.mpv_status)
+        for prop in ("filename", "playlist-pos"):
+            self.mpv_status.subscribe(prop, functools.partial(self.forward_prop, prop))
+        self.transition_gaps = JitterHistogram(PlaylistWindow.gap_bounds)
+        self.mpv_status.subscribe("transition-gap", self.subscr_transition_gap)
+        # time between the first and the last output showing the same item
+        self.switch_skew = SkewMeter(len(screens))
+        self._switch_index = None
+        self._snapshot_time = None
+        for output, channel in enumerate(self.mpv_statuses):
+            channel.subscribe(
+                "switched", functools.partial(self.subscr_switched, output)
+            )
+            channel.start()
         self.sig_mpv_prop.connect(self.subscr_listen_process_mpv)
 
         # setup event cmd
@@ -155,6 +250,11 @@ class ViewControl(object):
         self.sig_cmd_prop.connect(self.subscr_listen_process_cmd)
 
         self.sig_mpv_time = signal("mpv_time")
+        self.cue_scheduler = None
+        if self.argpars_result.media_clock:
+            # delayed commands are fired against the position of the media
+            self.cue_scheduler = CueScheduler(self.send_cue)
+            self.sig_mpv_time.connect(self.subscr_time_pos)
         self.sig_mpv_time_remain = signal("mpv_time_remain")
         self.sig_mpv_time_remain.connect(self.subscr_time)
 
@@ -174,12 +274,13 @@ class ViewControl(object):
         logging.info(
             "Connected to database: {}".format(self.playlist.connected_datbase)
         )
-        self.playlist.show_load(self.argpars_result.playlist_name)
+        self.playlist.show_load(self.argpars_result.playlist_name, detach=True)
         self.logger.info("loaded Show: {}".format(self.playlist.show_name))
 
+        cmd_engine = "asyncio" if self.argpars_result.asyncio else "thread"
         if not self.argpars_result.threading:
 
-            self.stop_event = threading.Event()
+            self.stop_event = multiprocessing.Event()
 
             self.process_cmd = ProcessCmd(
                 self.cmd_status_queue,
@@ -187,42 +288,85 @@ class ViewControl(object):
                 self.playlist.show_options.enabled_devices_connections,
                 self.stop_event,
                 self.config_queue_logger,
+                engine=cmd_engine,
             )
 
-            self.process_mpv = ProcessMpv(
-                self.mpv_status_queue,
-                self.mpv_control_queue,
-                self.argpars_result.screen,
-                self.stop_event,
-                self.config_queue_logger,
-            )
+            self.processes_mpv = [
+                ProcessMpv(
+                    self.mpv_status_queues[output],
+                    self.mpv_control_queues[output],
+                    screen,
+                    self.stop_event,
+                    self.config_queue_logger,
+                    status_rate=self.argpars_result.status_rate,
+                    status_block=self.mpv_status_blocks[output],
+                    synchronized=self.synchronized,
+                    video_output=self.argpars_result.vo,
+                    name=f"ProcessMPV{output or ''}",
+                )
+                for output, screen in enumerate(screens)
+            ]
         else:
 
-            self.stop_event = multiprocessing.Event()
+            self.stop_event = threading.Event()
 
             self.process_cmd = ThreadCmd(
                 self.cmd_status_queue,
                 self.cmd_control_queue,
                 self.playlist.show_options.enabled_devices_connections,
                 self.stop_event,
+                engine=cmd_engine,
             )
 
-            self.process_mpv = ThreadMpv(
-                self.mpv_status_queue,
-                self.mpv_control_queue,
-                self.argpars_result.screen,
-                self.stop_event,
-            )
+            self.processes_mpv = [
+                ThreadMpv(
+                    self.mpv_status_queues[output],
+                    self.mpv_control_queues[output],
+                    screen,
+                    self.stop_event,
+                    status_rate=self.argpars_result.status_rate,
+                    status_block=self.mpv_status_blocks[output],
+                    synchronized=self.synchronized,
+                    video_output=self.argpars_result.vo,
+                    name=f"ThreadMpv{output or ''}",
+                )
+                for output, screen in enumerate(screens)
+            ]
+        self.process_mpv = self.processes_mpv[0]
 
         self.processes = []
         self.processes.append(self.process_cmd)
-        self.processes.append(self.process_mpv)
+        self.processes.extend(self.processes_mpv)
 
         self.logger.info("Initialized __main__ with pid {}".format(os.getpid()))
 
-        # blocking functions for appending next element to mpv playlist
-        self.event_next_happened = threading.Event()
-        self.event_append = threading.Event()
+        # synchronizes appending next element to mpv playlist with playback
+        self.coordinator = PlaybackCoordinator()
+        # the player notifies at once when the remaining time falls below
+        self.mpv_status.subscribe_threshold(
+            self.coordinator.prefetch_time, self.sig_mpv_time_remain.send
+        )
+        if self.synchronized:
+            # and when the outputs must be told to switch to the next item
+            self.mpv_status.subscribe_threshold(
+                self.argpars_result.sync_lead, self.sig_mpv_time_remain.send
+            )
+        # item currently played and if it was appended after a JumpToTarget
+        self.item_playing = None
+        self.jump_appended = False
+        # (absolute playlist index, item, jumped) appended but not yet played
+        self.upcoming = collections.deque()
+        self.playlist_pos = None
+        self._player_index = 0
+        self._upcoming_lock = threading.RLock()
+
+        # warms the page cache with the files played next
+        self.readahead = None
+        if self.argpars_result.readahead > 0:
+            self.readahead = Readahead(
+                budget=self.argpars_result.readahead_budget << 20,
+                max_workers=self.argpars_result.readahead_workers,
+            )
 
         # player currently playing media or is paused
         self.playing = threading.Event()
@@ -242,35 +386,71 @@ class ViewControl(object):
         try:
             for process in self.processes:
                 process.start()
+            if self.cue_scheduler:
+                self.cue_scheduler.start()
 
             time.sleep(1)
 
             self.player_append_current_from_playlist()
-            for c in self.playlist.module_current.list_commands:
-                self.sig_cmd_command.send(c)
+            if self.synchronized:
+                self.player_schedule_switch(
+                    time.monotonic() + self.argpars_result.sync_lead
+                )
 
             while True:
-                self.event_append.wait()  # not blocking with if .is_set()
-                self.player_append_next_from_playlist()
-                self.event_append.clear()
-                self.event_next_happened.wait()
-                for c in self.playlist.module_current.list_commands:
-                    self.sig_cmd_command.send(c)
+                state = self.coordinator.wait(
+                    PlaybackState.prefetching, PlaybackState.switching
+                )
+                if state is PlaybackState.prefetching:
+                    self.player_fill_window()
+                    self.coordinator.appended()
+                else:
+                    # several items if the player switched again in the meantime
+                    items = self.player_switched()
+                    if items and self.readahead:
+                        self.player_readahead()
+                    for item, jumped in items:
+                        self.player_start_item(item, jumped)
+                    self.coordinator.switched()
+                    if len(self.upcoming) < self.argpars_result.prefetch:
+                        self.coordinator.prefetch()
 
         except KeyboardInterrupt:
             self.logger.info("KeyboardInterrupt! Stopping Program!")
             self.stop_event.set()
-
-    def send_command(self, command_obj):
+            for status_block in self.mpv_status_blocks:
+                status_block.close()
+            if self.synchronized:
+                self.logger.info(f"output skew: {self.switch_skew.skews.snapshot()}")
+            if self.readahead:
+                self.readahead.shutdown()
+
+    def send_command(self, command_obj, module=None):
         """send command object to process/thread: process_cmd
 
         Args:
             command_obj  (show.CommandSendObject): objected containing
                 command details
+            module (int, optional): id of the sequence module sending the
+                command, to cancel its delayed commands. Defaults to None.
 
         """
         self.logger.info("Sending CommandObject '{}'".format(command_obj))
-        self.cmd_control_queue.put(command_obj.command_send_item)
+        command_send_item = command_obj.command_send_item
+        command_send_item.module = module
+        self.cmd_control_queue.put(command_send_item)
+
+    def send_cue(self, command_obj):
+        """send delayed command object at once, called by the cue scheduler"""
+        self.logger.info("Sending cued CommandObject '{}'".format(command_obj))
+        command_send_item = command_obj.command_send_item
+        command_send_item.delay = 0
+        self.cmd_control_queue.put(command_send_item)
+
+    def player_cancel_commands(self, item):
+        """cancel the pending delayed commands of item (show.PlanItem)"""
+        if item is not None and item.module.id is not None:
+            self.cmd_control_queue.put(("cancel", item.module.id))
 
     def player_resume(self):
         """resume playback and timers
@@ -282,7 +462,9 @@ class ViewControl(object):
         if not self.playing.is_set():
             self.logger.info("resuming playback")
             self.playing.set()
-            self.mpv_control_queue.put("resume")
+            self.player_send("resume")
+            if self.cue_scheduler:
+                self.cue_scheduler.resume()
             self.cmd_control_queue.put("resume")
 
     def player_pause(self):
@@ -295,7 +477,12 @@ class ViewControl(object):
         if self.playing.is_set():
             self.logger.info("pausing playback")
             self.playing.clear()
-            self.mpv_control_queue.put("pause")
+            with self._upcoming_lock:
+                # the outputs cancel a scheduled switch, it is sent again
+                self._switch_index = None
+            self.player_send("pause")
+            if self.cue_scheduler:
+                self.cue_scheduler.pause()
             self.cmd_control_queue.put("pause")
 
     def player_toggle_play_pause(self):
@@ -310,12 +497,112 @@ class ViewControl(object):
             self.player_resume()
 
     def player_next(self):
-        """jump to next media element in playlist (command timers not affected!)"""
+        """jump to next media element in playlist
+
+        The pending delayed commands of the current element are cancelled.
+
+        """
         self.logger.info("playing next media")
-        self.subscr_time(0)
-        while self.event_append.is_set():
-            pass
-        self.mpv_control_queue.put("next")
+        playing = self.item_playing
+        if self.coordinator.skip():
+            if self.synchronized:
+                self.player_schedule_switch(
+                    time.monotonic() + self.argpars_result.sync_lead
+                )
+            else:
+                self.mpv_control_queue.put("next")
+            self.player_cancel_commands(playing)
+            if self.cue_scheduler:
+                self.cue_scheduler.clear()
+
+    def player_fill_window(self):
+        """Append playlist elements until the prefetch window is full
+
+        Keeps the number of elements appended to the player but not yet played
+        at the value of the option --prefetch, so the player can open and demux
+        them in advance.
+
+        """
+        with self._upcoming_lock:
+            while len(self.upcoming) < self.argpars_result.prefetch:
+                self.player_append_next_from_playlist()
+
+    def player_switched(self):
+        """Take the items the player switched to from the upcoming items
+
+        All items up to the playlist position of the player are taken, in
+        playback order. None are left if they were taken at a switch reported
+        before (the coordinator reports every switch, the position is the latest).
+
+        Returns:
+            list<tuple>: (show.PlanItem, bool) the items and if they were appended
+                after a JumpToTarget
+
+        """
+        items = list()
+        with self._upcoming_lock:
+            position = self.playlist_pos or 0
+            while self.upcoming and self.upcoming[0][0] <= position:
+                _, item, jumped = self.upcoming.popleft()
+                items.append((item, jumped))
+        return items
+
+    def player_start_item(self, item, jumped):
+        """Send the commands of the item (show.PlanItem) the player switched to
+
+        The pending delayed commands of the previous item are cancelled if the
+        item was appended after a JumpToTarget.
+
+        """
+        previous = self.item_playing
+        self.item_playing, self.jump_appended = item, jumped
+        if jumped:
+            self.player_cancel_commands(previous)
+        commands = item.commands
+        if self.cue_scheduler:
+            self.cue_scheduler.load((c.delay, c) for c in commands if c.delay)
+            commands = [c for c in commands if not c.delay]
+        for c in commands:
+            self.sig_cmd_command.send(c, module=item.module.id)
+
+    def player_readahead(self, transition=True):
+        """Warm the page cache with the files of the next media elements
+
+        The files are the upcoming items appended to the player followed by the
+        next items of the show (see Show.items_upcoming), up to the value of the
+        option --readahead. At a transition the readahead service also counts if
+        the file the player opens next is already warm.
+
+        Args:
+            transition (bool, optional): called at a transition. Defaults to True.
+
+        """
+        count = self.argpars_result.readahead
+        with self._upcoming_lock:
+            items = [item for _, item, _ in self.upcoming]
+            items += self.playlist.items_upcoming(max(0, count - len(items)))
+        paths = [path for item in items[:count] for path in self.player_paths(item)]
+        if paths and transition:
+            self.readahead.transition(paths[0])
+        self.readahead.warm(paths)
+
+    def player_jump(self, target):
+        """Jump to target (show.JumpToTarget) after the next item
+
+        The upcoming items appended after the next one are removed from the
+        player, so the target follows the next item as without prefetch window.
+
+        """
+        with self._upcoming_lock:
+            self.playlist.notify(target)
+            if len(self.upcoming) > 1:
+                while len(self.upcoming) > 1:
+                    self.upcoming.pop()
+                self._player_index = self.upcoming[0][0]
+                self.player_send(("drop", self._player_index))
+        self.coordinator.prefetch()
+        if self.readahead:
+            self.player_readahead(transition=False)
 
     def player_append_next_from_playlist(self):
         """Append next playlist element to player
@@ -324,7 +611,8 @@ class ViewControl(object):
         'player_append_element'.
 
         """
-        self.player_append_element(self.playlist.next())
+        item = self.playlist.item_next()
+        self.player_append_element(item, self.playlist.jumped)
 
     def player_append_current_from_playlist(self):
         """Append current playlist element to player
@@ -333,52 +621,118 @@ class ViewControl(object):
         'player_append_element'.
 
         """
-        self.player_append_element(self.playlist.module_current)
+        self.player_append_element(self.playlist.item_current)
 
-    def player_append_element(self, element):
-        """Append SequenceElement to player
+    def player_append_element(self, item, jumped=False):
+        """Append item of the playback plan to player
 
-        sends media file of given element to playback process/thread
-        (playback.processmpv). Also sends user defined display duration,
-        if the media type got no predefined duration, which is the case
+        sends media file of given item (show.PlanItem) to playback
+        process/thread (playback.processmpv). Also sends user defined
+        display duration, if the media type got no predefined duration,
         which is the case with all show.StillElement where a
-        user-defined time is stored.
+        user-defined time is stored. The item is added to the upcoming items
+        with its absolute index in the playlist of the player. With several
+        outputs each gets the track of its screen (see show.ScreenTrack).
+
+        """
+        with self._upcoming_lock:
+            self._player_index += 1
+            self.upcoming.append((self._player_index, item, jumped))
+            duration = item.duration if item.still else None
+            for control_queue, path in zip(
+                self.mpv_control_queues, self.player_paths(item)
+            ):
+                control_queue.put((path, duration))
+
+    def player_paths(self, item):
+        """files of item (show.PlanItem) played by the outputs, in output order"""
+        return [
+            item.tracks.get(screen, item.file_path)
+            for screen in self.argpars_result.screen
+        ]
+
+    def player_send(self, message):
+        """send a control message to the players of all outputs"""
+        for control_queue in self.mpv_control_queues:
+            control_queue.put(message)
+
+    def player_sync(self, remaining_time):
+        """Switch all outputs together at the end of the current item
+
+        Once the remaining time of the leading output falls below the option
+        --sync-lead, the end of the item is taken from its status block (time of
+        the status plus remaining time), independent of the delay of the status
+        messages, and the switch is scheduled on all outputs at that time. If the
+        block is not shared with the player, the reported remaining time is used
+        from the time it was received.
+
+        Args:
+            remaining_time (float or None): remaining time reported by the player
 
         """
-        if isinstance(element.media_element, show.StillElement) or isinstance(
-            element.media_element, show.TextElement
-        ):
-            self.mpv_control_queue.put((element.media_element.file_path, element.time))
+        status = self.player_status()
+        if self.mpv_status_block.is_shared:
+            remaining, updated = status.time_remaining, status.updated
+            position = status.playlist_pos
         else:
-            self.mpv_control_queue.put((element.media_element.file_path, None))
+            remaining, updated = remaining_time, time.monotonic()
+            position = None  # the position of the last playlist-pos change
+        if status.paused or remaining is None:
+            return
+        if remaining <= self.argpars_result.sync_lead:
+            self.player_schedule_switch(updated + remaining, position)
+
+    def player_schedule_switch(self, deadline, position=None):
+        """Schedule the switch of all outputs to the next item
+
+        The outputs switch to the item after the current one at deadline
+        (time.monotonic(), shared by all processes). Every item is scheduled
+        once.
+
+        Args:
+            deadline (float): time of the switch
+            position (int, optional): absolute index of the current item.
+                Defaults to None, the last playlist position of the leading output.
+
+        Returns:
+            bool: False if the next item is not appended or already scheduled.
+
+        """
+        with self._upcoming_lock:
+            if position is None:
+                position = self.playlist_pos
+            index = (position or 0) + 1
+            if index > self._player_index or index == self._switch_index:
+                return False
+            self._switch_index = index
+        self.player_send(("switch", deadline, index))
+        return True
 
     def subscr_time(self, remaining_time):
         """Blinker-Event subscriber: remaining playtime of media element
 
-        Set and delete threading.events which are used to synchronize
-        playlist changes with the mpv-player and control process.
+        Reports the remaining time of the current media element to the
+        playback coordinator, which allows the main loop to append the next
+        element shortly before the end. With several outputs it also schedules
+        their switch to the next element.
 
-        Responds to the remaining time of the current media element and
-        allows you to add the next element.
+        """
+        self.coordinator.time_remaining(remaining_time)
+        if self.synchronized:
+            self.player_sync(remaining_time)
+
+    def subscr_time_pos(self, position):
+        """Blinker-Event subscriber: playback position of media element
+
+        Reports the position to the cue scheduler, which fires the delayed
+        commands of the current media element at their position.
 
         """
-        if (
-            self.event_next_happened.is_set()
-            and remaining_time is not None
-            and remaining_time < 1
-        ):
-            self.event_next_happened.clear()
-            self.event_append.set()
+        self.cue_scheduler.time_pos(position)
 
     def subscr_listen_process_mpv(self, msg):
         """Blinker-Event subscriber: change of media element in player
 
-        Set and delete threading.events which are used to synchronize
-        playlist changes with the mpv-player and control process.
-
-        Responds to the remaining time of the current media element and
-        allows you to add the next element.
-
         detects the current change of the media element in the mpv-player
         and enables the sending of the commands or the starting of the
         delay timer.
@@ -386,23 +740,78 @@ class ViewControl(object):
         """
         self.logger.debug("'mpv_prop_changed' send: {}".format(msg))
         if msg[0] == "playlist-pos" and self.playlist:
-            self.event_next_happened.set()
+            with self._upcoming_lock:
+                self.playlist_pos = msg[1]
+                if msg[1] is None:
+                    # the player replaced its playlist by the start image
+                    self._player_index = 0
+                    self._switch_index = None
+                    self.switch_skew.reset()
+            self.coordinator.playlist_switched()
+
+    def subscr_transition_gap(self, gap):
+        """Status subscriber: time the player needed to switch to the next item"""
+        self.transition_gaps.record(gap)
+        self.logger.debug(f"transition gap {gap * 1000:.1f}ms")
 
-    def thread_listen_process_mpv(self):
-        """Thread: forward status information of process_mpv ...
+    def subscr_switched(self, output, switch):
+        """Status subscriber: output restarted playback after a scheduled switch
 
-        to Blinker-Event. Blinker-Event defined in init.
+        Reports the skew once all outputs switched to the item.
 
         """
-        while True:
-            data = self.mpv_status_queue.get(block=True)
-            if data[0] == "time-pos":
-                self.sig_mpv_time.send(data[1])
-            elif data[0] == "time-remaining":
-                self.sig_mpv_time_remain.send(data[1])
-                self.logger.debug(data[1])
-            else:
-                self.sig_mpv_prop.send(data)
+        index, when = switch
+        skew = self.switch_skew.switched(output, index, when)
+        if skew is None:
+            return
+        if skew > self.switch_skew.tolerance:
+            self.logger.warning(f"outputs switched with skew {skew * 1000:.1f}ms")
+        else:
+            self.logger.debug(f"outputs switched with skew {skew * 1000:.1f}ms")
+
+    def player_status(self):
+        """latest status of the player (playback.statusblock.PlayerStatus)
+
+        Read from the status block, or made from the last snapshot if the block
+        is not shared with the player.
+
+        """
+        if self.mpv_status_block.is_shared:
+            return self.mpv_status_block.read()
+        snapshot = self.mpv_status.status
+        return PlayerStatus(
+            snapshot.get("time-pos"),
+            snapshot.get("time-remaining"),
+            snapshot.get("playlist-pos"),
+            not self.playing.is_set(),
+            self._snapshot_time,
+            self.mpv_status.received,
+        )
+
+    def subscr_status(self, sender, snapshot):
+        """Blinker-Event subscriber: snapshot of the player status
+
+        Forwards position and remaining time of the current media element to
+        their Blinker-Events at the rate of the snapshots (see StatusChannel).
+        The values are read from the status block, which is more recent than the
+        snapshot once it passed the queue, if the block is shared with the player
+        (see player_status). The remaining time falling below the
+        prefetch time is notified at once by a threshold; the snapshots repeat
+        it in case the coordinator was not idle at that moment.
+
+        """
+        self._snapshot_time = time.monotonic()
+        status = self.player_status()
+        self.sig_mpv_time.send(status.time_pos)
+        self.sig_mpv_time_remain.send(status.time_remaining)
+
+    def forward_prop(self, prop, value):
+        """forward a property change of the player to Blinker-Event
+
+        Blinker-Event 'mpv_prop_changed' defined in init.
+
+        """
+        self.sig_mpv_prop.send((prop, value))
 
     def subscr_listen_process_cmd(self, msg):
         """Blinker-Event subscriber: all received communication
@@ -429,26 +838,19 @@ class ViewControl(object):
     def thread_event_system(self):
         """Thread: event system for user defined events
 
-        compares every received communication package with user defined
-        event list. If event matches, run/trigger in show.EventModule
-        specified action.
+        compares every received message (CommandRecvItem) and key event with
+        the user defined events of the show, using the dispatch index of the
+        show (show.EventIndex). If event matches, run/trigger in
+        show.EventModule specified action.
 
         """
         while True:
             data = self.event_queue.get(block=True)
-            if isinstance(data, ComPackage):  # ComEvent
-                etype = show.ComEventModule
-            elif isinstance(data, tuple) and data[0] == "KeyEvent":  # KeyEvent
-                etype = show.KeyEventModule
-            else:
-                return
-            for mod in self.playlist.eventlist:
-                if isinstance(mod, etype):
-                    if mod.check_event(data):
-                        for cmd_tpl in mod.list_commands:
-                            self.sig_cmd_command.send(cmd_tpl)
-                        if mod.jump_to_target_element:
-                            self.playlist.notify(mod.jump_to_target_element)
+            for mod in self.playlist.event_index.match(data):
+                for cmd_tpl in mod.list_commands:
+                    self.sig_cmd_command.send(cmd_tpl)
+                if mod.jump_to_target_element:
+                    self.player_jump(mod.jump_to_target_element)
 
     if "pyinput" not in sys.modules:
 